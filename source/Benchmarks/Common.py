@@ -0,0 +1,139 @@
+""" Benchmarks.Common
+
+Shared code for the benchmark suites.
+
+* Timing of individual operations and reduction to ops/sec and latency percentiles.
+* Saving and loading of benchmark results (JSON).
+* Comparison of benchmark results against a stored baseline.
+
+Benchmark results are a dictionary keyed by benchmark name::
+
+    {
+        "meta": {"python": "3.7.3", "platform": "...", "created": 1560000000.0},
+        "results": {
+            "eventbus.post": {"iterations": 20000, "ops_per_sec": 250000.0, "p50_us": 3.9, "p99_us": 6.1},
+            [...]
+        }
+    }
+"""
+
+# System imports
+import json
+import platform
+import time
+
+
+def percentile(samples, fraction):
+    """ Return the requested percentile of a sorted list of samples
+
+        :param samples: Sorted list of samples
+        :param fraction: Percentile as a fraction [0.0 .. 1.0]
+        :returns: Sample at the requested percentile
+    """
+    if not samples:
+        return 0
+    index = min(int(fraction * len(samples)), len(samples) - 1)
+    return samples[index]
+
+
+def summarize(samples_ns, elapsed_ns=None):
+    """ Reduce a list of operation latencies to a benchmark result
+
+        :param samples_ns: Operation latencies (nanoseconds)
+        :param elapsed_ns: Optional total elapsed time, defaults to the sum of the latencies
+        :returns: Benchmark result dictionary
+    """
+    samples = sorted(samples_ns)
+    if elapsed_ns is None:
+        elapsed_ns = sum(samples)
+    return {
+        'iterations': len(samples),
+        'ops_per_sec': len(samples) * 1e9 / elapsed_ns if elapsed_ns else 0.0,
+        'p50_us': percentile(samples, 0.50) / 1000,
+        'p99_us': percentile(samples, 0.99) / 1000,
+        'max_us': (samples[-1] if samples else 0) / 1000,
+    }
+
+
+def measure(func, iterations, warmup=None):
+    """ Time individual executions of *func*
+
+        :param func: Function (no arguments) to be benchmarked
+        :param iterations: Number of timed executions
+        :param warmup: Number of untimed executions, default 10% of iterations
+        :returns: Benchmark result dictionary
+    """
+    if warmup is None:
+        warmup = iterations // 10
+    for _ in range(warmup):
+        func()
+    clock = time.perf_counter_ns
+    samples = [0] * iterations
+    start = clock()
+    for i in range(iterations):
+        t0 = clock()
+        func()
+        samples[i] = clock() - t0
+    return summarize(samples, clock() - start)
+
+
+def metadata():
+    """ Describe the environment the benchmarks were run in """
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'created': time.time(),
+    }
+
+
+def save(results, filename):
+    """ Save benchmark results to a JSON file
+
+        :param results: Dictionary of benchmark results
+        :param filename: Output filename
+    """
+    with open(filename, 'w') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load(filename):
+    """ Load benchmark results from a JSON file
+
+        :param filename: Input filename
+        :returns: Dictionary of benchmark results
+    """
+    with open(filename, 'r') as f:
+        return json.load(f)['results']
+
+
+def compare(current, baseline, tolerance=0.10):
+    """ Compare benchmark results against a baseline
+
+        A benchmark has regressed when its throughput drops, or its median latency rises,
+        by more than *tolerance* relative to the baseline.
+
+        :param current: Dictionary of current benchmark results
+        :param baseline: Dictionary of baseline benchmark results
+        :param tolerance: Allowed relative change [0.0 .. 1.0]
+        :returns: (report lines, list of regressed benchmark names)
+    """
+    lines = ['{:40s} {:>14s} {:>14s} {:>8s} {:>10s} {:>10s}'.format(
+        'benchmark', 'ops/sec', 'baseline', 'change', 'p50 us', 'p99 us')]
+    regressions = []
+    for name in sorted(current.keys()):
+        result = current[name]
+        if name not in baseline:
+            lines.append('{:40s} {:14.1f} {:>14s}'.format(name, result['ops_per_sec'], 'new'))
+            continue
+        base = baseline[name]
+        change = result['ops_per_sec'] / base['ops_per_sec'] - 1.0 if base['ops_per_sec'] else 0.0
+        slower = change < -tolerance
+        if base.get('p50_us') and result['p50_us'] > base['p50_us'] * (1.0 + tolerance):
+            slower = True
+        if slower:
+            regressions.append(name)
+        lines.append('{:40s} {:14.1f} {:14.1f} {:+7.1%} {:10.2f} {:10.2f}{}'.format(
+            name, result['ops_per_sec'], base['ops_per_sec'], change,
+            result['p50_us'], result['p99_us'], '  REGRESSION' if slower else ''))
+    return lines, regressions
@@ -0,0 +1,143 @@
+""" Benchmarks.EventBus
+
+Throughput and latency of the MVC event bus:
+
+* mvc.Event.post - event lookup, validation and copy
+* mvc.MVC.prepare - event preparation prior to notification
+* mvc.Model.notify - fan-out to 0, 1, 5 and 20 registered views
+* mvc.Model.notify - publishing to a router with 0, 1, 5 and 20 subscribed views
+* PyState.StateMachine.event - end to end state transition, with and without listeners
+"""
+
+# System imports
+from enum import Enum
+
+# Project imports
+import mvc
+import exceptions
+from StateEngineCrank.modules.PyState import StateMachine
+from Benchmarks.Common import measure
+
+#: event class and actor used by the benchmarks
+CLASS_NAME = 'Bench'
+ACTOR_NAME = 'BenchActor'
+
+#: number of views for the notify fan-out benchmarks
+FAN_OUT = [0, 1, 5, 20]
+
+
+class BenchEvents(Enum):
+    PING = 1
+
+
+class States(Enum):
+    Ping = 1
+    Pong = 2
+
+
+class Events(Enum):
+    EvToggle = 1
+
+
+#: minimal two state machine, every EvToggle takes a transition
+state_transition_table = {
+    States.Ping: {Events.EvToggle: {'state2': States.Pong, 'guard': None, 'transition': None}},
+    States.Pong: {Events.EvToggle: {'state2': States.Ping, 'guard': None, 'transition': None}},
+}
+state_function_table = {
+    States.Ping: {'enter': None, 'do': None, 'exit': None},
+    States.Pong: {'enter': None, 'do': None, 'exit': None},
+}
+
+
+class NullView(mvc.View):
+    """ View which discards all events """
+
+    def update(self, event):
+        pass
+
+    def run(self):
+        pass
+
+
+class NullModel(mvc.Model):
+    """ Model used to benchmark notify() """
+
+    def update(self, event):
+        pass
+
+    def run(self):
+        pass
+
+
+def register_events():
+    """ Register the benchmark event class, event and actor
+
+        :returns: mvc.Event registry
+    """
+    events = mvc.Event()
+    try:
+        events.register_class(CLASS_NAME)
+        events.register_event(CLASS_NAME, BenchEvents.PING, 'model', text='ping', data=0)
+        events.register_actor(CLASS_NAME, ACTOR_NAME)
+    except (exceptions.ClassAlreadyRegistered, exceptions.EventAlreadyRegistered,
+            exceptions.ActorAlreadyRegistered):
+        pass
+    return events
+
+
+def state_machine(name, views):
+    """ Instantiate a benchmark state machine
+
+        :param name: State machine (actor) name, must be unique
+        :param views: Number of views to register with the state machine
+        :returns: StateMachine
+    """
+    events = mvc.Event()
+    if name in events.actors:
+        events.unregister_actor(name)
+    sm = StateMachine(sm_id=0, name=name, startup_state=States.Ping,
+                      function_table=state_function_table, transition_table=state_transition_table)
+    for v in range(views):
+        sm.register(NullView(name='%s.view%d' % (name, v)))
+    return sm
+
+
+def run(iterations):
+    """ Run the event bus benchmarks
+
+        :param iterations: Number of timed operations per benchmark
+        :returns: Dictionary of benchmark results
+    """
+    results = {}
+    events = register_events()
+    event = events.lookup_event(CLASS_NAME, BenchEvents.PING)
+
+    results['eventbus.post'] = measure(
+        lambda: events.post(class_name=CLASS_NAME, event=BenchEvents.PING, actor_name=ACTOR_NAME, data=1),
+        iterations)
+
+    model = NullModel(name='BenchModel')
+    results['eventbus.prepare'] = measure(lambda: model.prepare(event, text='ping', data=1), iterations)
+
+    for views in FAN_OUT:
+        model = NullModel(name='BenchModel%d' % views)
+        for v in range(views):
+            model.register(NullView(name='%s.view%d' % (model.name, v)))
+        results['eventbus.notify.views%02d' % views] = measure(lambda: model.notify(event, data=1), iterations)
+
+    for views in FAN_OUT:
+        router = mvc.Router(name='BenchRouter%d' % views)
+        model = NullModel(name='BenchRouted%d' % views)
+        model.attach(router)
+        for v in range(views):
+            model.register(NullView(name='%s.view%d' % (model.name, v)))
+        results['eventbus.routed.views%02d' % views] = measure(lambda: model.notify(event, data=1), iterations)
+        router.dispatch()
+
+    for views, label in [(0, 'quiet'), (5, 'listeners05')]:
+        sm = state_machine('BenchMachine%d' % views, views)
+        results['eventbus.sm_event.%s' % label] = measure(lambda: sm.event(Events.EvToggle), iterations)
+        sm.cleanup()
+
+    return results
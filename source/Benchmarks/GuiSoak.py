@@ -0,0 +1,120 @@
+""" Benchmarks.GuiSoak
+
+Soak test of the Dining Philosophers animation.
+
+Feeds a stream of philosopher state transitions, timer ticks and waiter fork events
+to the animation and draws a frame every *FRAME_EVENTS* events. Reports the frame time
+for the first and last quarter of the run together with the canvas item count, both of
+which should stay flat however many events are processed.
+
+The animation draws on a Tk canvas when a display is available, otherwise it draws
+into a headless display list (see render.HeadlessBackend) and the number of draw
+operations per event is reported as the render cost.
+"""
+
+# System imports
+import time
+from tkinter import Tk, TclError, ttk
+
+# Project imports
+import mvc
+import gui
+import render
+from journal import ReplayModel
+from StateEngineCrank.modules.PyState import StateMachineEvent
+from DiningPhilosophers.main import States, WaiterEvents
+from Benchmarks.Common import summarize
+
+#: number of philosophers in the animation
+PHILOSOPHERS = 5
+
+#: number of events drawn in each frame
+FRAME_EVENTS = 50
+
+#: philosopher state cycle
+STATES = [States.Thinking, States.Hungry, States.Eating]
+
+
+def events(count):
+    """ Generate animation events
+
+        :param count: Number of events
+        :returns: Generator of events
+    """
+    for i in range(count):
+        pid = i % PHILOSOPHERS
+        kind = i % 3
+        if kind == 0:
+            yield {'class': 'SM', 'event': StateMachineEvent.SmEvents.STATE_TRANSITION, 'type': 'model',
+                   'user.id': pid, 'data': STATES[(i // PHILOSOPHERS) % len(STATES)]}
+        elif kind == 1:
+            yield {'class': 'Mvc', 'event': mvc.Event.Events.TIMER, 'type': 'model',
+                   'user.id': pid, 'data': [i % 60, None]}
+        else:
+            yield {'class': 'Waiter', 'event': WaiterEvents.LEFTFORK, 'type': 'model', 'data': pid}
+
+
+def animation(root):
+    """ Instantiate the Dining Philosophers animation
+
+        :param root: Tk root, None to draw with a headless backend
+        :returns: gui.DiningPhilosophers
+    """
+    config = dict(gui.GuiView.philosophers_config, philosophers=PHILOSOPHERS)
+    if root is None:
+        ani = gui.DiningPhilosophers(parent=None, config=config, common=gui.GuiView.common_config,
+                                     backend=render.HeadlessBackend())
+    else:
+        ani = gui.DiningPhilosophers(parent=None, root=root, mainframe=ttk.Frame(root),
+                                     config=config, common=gui.GuiView.common_config)
+    ani.register(ReplayModel(config['model'], {'philosophers': PHILOSOPHERS}, None))
+    return ani
+
+
+def run(iterations):
+    """ Run the GUI soak benchmark
+
+        :param iterations: Number of animation events
+        :returns: Dictionary of benchmark results
+    """
+    try:
+        root = Tk()
+        root.withdraw()
+    except TclError:
+        root = None
+    ani = animation(root)
+    canvas = ani.canvas
+    operations_start = getattr(canvas, 'operations', 0)
+    items_start = len(canvas.find_all())
+
+    clock = time.perf_counter_ns
+    frames = []
+    start = clock()
+    for n, event in enumerate(events(iterations), 1):
+        ani.update(event)
+        if n % FRAME_EVENTS == 0:
+            t0 = clock()
+            ani.draw_frame()
+            if root is not None:
+                root.update_idletasks()
+            frames.append(clock() - t0)
+    elapsed = clock() - start
+    items_end = len(canvas.find_all())
+    operations = getattr(canvas, 'operations', 0) - operations_start
+    if root is not None:
+        root.destroy()
+
+    quarter = max(len(frames) // 4, 1)
+    results = {
+        'gui.soak.events': summarize(frames, elapsed),
+        'gui.soak.frame.first': summarize(frames[:quarter]),
+        'gui.soak.frame.last': summarize(frames[-quarter:]),
+    }
+    results['gui.soak.events']['iterations'] = iterations
+    results['gui.soak.events']['ops_per_sec'] = iterations * 1e9 / elapsed
+    results['gui.soak.events']['items_start'] = items_start
+    results['gui.soak.events']['items_end'] = items_end
+    results['gui.soak.events']['backend'] = type(canvas).__name__
+    if operations:
+        results['gui.soak.events']['draw_ops_per_event'] = operations / iterations
+    return results
@@ -0,0 +1,76 @@
+""" Benchmarks.Shutdown
+
+Time from stopping a running simulation to all of its threads being joined.
+
+Each sample runs a simulation in a fresh interpreter, simulation configuration and
+registrations are process wide. The simulation runs at a tenth of real time until
+barbers are cutting hair (philosophers are eating) then *MVC.stop()* is called, which
+cancels the simulation so haircuts and meals in progress finish without delay.
+
+* shutdown.barbers - Sleeping Barber simulation
+* shutdown.philosophers - Dining Philosophers simulation
+
+Each result also reports *threads_left*, the most threads still running after a stop,
+which is 0 when every simulation thread has been joined.
+"""
+
+# System imports
+import os
+import subprocess
+import sys
+
+# Project imports
+from Benchmarks.Common import summarize
+
+#: maximum number of simulation runs per benchmark
+RUNS = 5
+
+#: simulation start up, creates and starts *model*
+SETUP = {
+    'shutdown.barbers': "import SleepingBarber.main as sim; sim.ConfigData().simulation_loops = 10000; "
+                        "model = sim.SleepingBarber(exit_when_done=True)",
+    'shutdown.philosophers': "import DiningPhilosophers.main as sim; sim.ConfigData().dining_loops = 10000; "
+                             "model = sim.DiningPhilosophers(exit_when_done=True)",
+}
+
+#: runs the simulation then prints the stop time (nanoseconds) and the number of threads left
+SCRIPT = '''
+import os, threading, time, Defines
+Defines.time_scale = 0.1
+%s
+model.thread.start()
+model.set_running()
+time.sleep(3)
+start = time.perf_counter_ns()
+model.stop()
+print('shutdown', time.perf_counter_ns() - start, threading.active_count() - 1, flush=True)
+os._exit(0)
+'''
+
+
+def spawn(setup):
+    """ Run and stop a simulation in a fresh interpreter
+
+        :param setup: Python source creating the simulation *model*
+        :returns: Tuple of (stop time in nanoseconds, threads left running)
+    """
+    source = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', SCRIPT % setup], cwd=source, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    _, elapsed, threads = output.strip().splitlines()[-1].split()
+    return int(elapsed), int(threads)
+
+
+def run(iterations):
+    """ Run the shutdown benchmarks
+
+        :param iterations: Number of simulation runs, at most *RUNS*
+        :returns: Dictionary of benchmark results
+    """
+    runs = max(min(iterations, RUNS), 1)
+    results = {}
+    for name, setup in SETUP.items():
+        samples = [spawn(setup) for _ in range(runs)]
+        results[name] = summarize([elapsed for elapsed, _ in samples])
+        results[name]['threads_left'] = max(threads for _, threads in samples)
+    return results
@@ -0,0 +1,61 @@
+""" Benchmarks.Startup
+
+Import time and startup time of the StateEngineCrank main program.
+
+Each sample runs a fresh interpreter, so module caches do not hide import costs.
+The time reported covers interpreter startup, imports and, for the *main* benchmarks,
+instantiating *main.Main* with the selected views.
+
+* startup.import.main - import main, no views
+* startup.import.gui - import main and the GUI view module, tkinter is imported only by Tk views
+* startup.main.console - Main with only the console view
+* startup.main.headless - Main with the console view and a headless GUI view
+"""
+
+# System imports
+import os
+import subprocess
+import sys
+import time
+
+# Project imports
+from Benchmarks.Common import summarize
+
+#: maximum number of interpreter runs per benchmark
+RUNS = 10
+
+#: benchmark name -> script run in a fresh interpreter
+SCRIPTS = {
+    'startup.import.main': 'import os, main; os._exit(0)',
+    'startup.import.gui': 'import os, main, gui; os._exit(0)',
+    'startup.main.console': "import os, main; main.Main(views=['console']); os._exit(0)",
+    'startup.main.headless': "import os, main; main.Main(views=['console', 'gui'], headless=True); os._exit(0)",
+}
+
+
+def spawn(script):
+    """ Time a script run in a fresh interpreter
+
+        :param script: Python source to run
+        :returns: Elapsed time in nanoseconds
+    """
+    source = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter_ns()
+    subprocess.run([sys.executable, '-c', script], cwd=source, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter_ns() - start
+
+
+def run(iterations):
+    """ Run the startup benchmarks
+
+        :param iterations: Number of interpreter runs, at most *RUNS*
+        :returns: Dictionary of benchmark results
+    """
+    runs = max(min(iterations, RUNS), 1)
+    results = {}
+    for name, script in SCRIPTS.items():
+        spawn(script)   # warm the file system cache
+        samples = [spawn(script) for _ in range(runs)]
+        results[name] = summarize(samples)
+    return results
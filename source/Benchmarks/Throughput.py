@@ -0,0 +1,184 @@
+""" Benchmarks.Throughput
+
+Throughput of the threaded simulations running headless, with no console or GUI view.
+
+Each sample runs a simulation to completion in a fresh interpreter, simulation configuration
+and registrations are process wide. State machine metrics are enabled (see *metrics*) and a
+single counting view, which discards logging, takes the place of the console and GUI views.
+Simulated time runs *SCALE* times real time (see *Defines.time_scale*).
+
+* throughput.barbers - Sleeping Barber simulation
+* throughput.philosophers - Dining Philosophers simulation
+
+ops/sec is state transitions per second of the run phase, latencies are run phase wall times.
+Each result also reports:
+
+* events_per_sec - state machine events processed per second
+* notifications_per_sec - model notifications delivered to views per second
+* threads_peak - most threads running at once
+* rss_peak_kb - peak resident set size of the interpreter
+* create_ms, run_ms and shutdown_ms - wall time of each phase, creating the simulation,
+  running it until its threads are joined and stopping it
+
+Populations are configured with *ConfigData* parameters, from the command line::
+
+    python -m Benchmarks.Throughput barbers --set barbers=8 --set simulation_loops=500 --output barbers.json
+    python -m Benchmarks.Throughput philosophers --set philosophers=50 --runs 3
+
+Results are saved in the benchmark results format (see *Benchmarks.Common*) and can be
+compared against a baseline with *Benchmarks.main compare*.
+"""
+
+# System imports
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Project imports
+from Benchmarks import Common
+
+#: maximum number of simulation runs per benchmark
+RUNS = 3
+
+#: real seconds per simulated second
+SCALE = 0.001
+
+#: simulation -> (module, model class, default population)
+SIMULATIONS = {
+    'barbers': ('SleepingBarber.main', 'SleepingBarber', {'barbers': 4, 'simulation_loops': 300}),
+    'philosophers': ('DiningPhilosophers.main', 'DiningPhilosophers', {'philosophers': 7, 'dining_loops': 300}),
+}
+
+#: runs a simulation and prints its measurements as JSON on the last line
+SCRIPT = '''
+import json, resource, sys, threading, time
+import Defines, mvc
+from metrics import Metrics
+
+class Tally(mvc.View):
+    """ View counting notifications and discarding logging """
+    def __init__(self):
+        super().__init__(name='throughput.tally')
+        self.notifications = 0
+        self.joining = None
+    def update(self, event):
+        self.notifications += 1
+        if event.get('event') is mvc.Event.Events.JOINING and self.joining is None:
+            self.joining = time.perf_counter()
+    def write(self, text):
+        pass
+    def run(self):
+        pass
+
+def sample_threads(peak, done):
+    while not done.wait(0.001):
+        peak[0] = max(peak[0], threading.active_count() - 1)
+
+Defines.time_scale = %(scale)r
+Metrics().enable()
+import %(module)s as sim
+config = sim.ConfigData()
+for name, value in %(params)r.items():
+    setattr(config, name, value)
+tally = Tally()
+peak, done = [0], threading.Event()
+sampler = threading.Thread(target=sample_threads, args=(peak, done), daemon=True)
+sampler.start()
+t0 = time.perf_counter()
+model = sim.%(model)s(exit_when_done=True)
+model.register(tally)
+t1 = time.perf_counter()
+model.thread.start()
+model.set_running()
+model.thread.join()
+t2 = time.perf_counter()
+done.set()
+families = {f[0]: f[3] for f in Metrics().families()}
+print(json.dumps({
+    'create': t1 - t0, 'run': (tally.joining or t2) - t1, 'shutdown': t2 - (tally.joining or t2),
+    'transitions': sum(v for _, v in families['transitions_total']),
+    'events': sum(v for _, v in families['events_total']),
+    'notifications': tally.notifications,
+    'threads': peak[0],
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}), flush=True)
+'''
+
+
+def spawn(simulation, params, scale=SCALE):
+    """ Run a simulation in a fresh interpreter
+
+        :param simulation: Simulation name, see *SIMULATIONS*
+        :param params: Configuration parameters, override the default population
+        :param scale: Real seconds per simulated second
+        :returns: Dictionary of measurements
+        :raises: RuntimeError, including the simulation's error output, if the simulation fails
+    """
+    module, model, population = SIMULATIONS[simulation]
+    script = SCRIPT % {'scale': scale, 'module': module, 'model': model, 'params': dict(population, **params)}
+    source = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    child = subprocess.run([sys.executable, '-c', script], cwd=source,
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if child.returncode != 0:
+        raise RuntimeError('%s simulation %r failed, exit status %d\n%s'
+                           % (simulation, params, child.returncode, child.stderr.strip()))
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def result(samples):
+    """ Reduce simulation runs to a benchmark result
+
+        :param samples: List of measurements returned by *spawn()*
+        :returns: Benchmark result dictionary
+    """
+    run_s = sum(s['run'] for s in samples)
+    result_ = Common.summarize([int(s['run'] * 1e9) for s in samples])
+    result_['ops_per_sec'] = sum(s['transitions'] for s in samples) / run_s if run_s else 0.0
+    result_['events_per_sec'] = sum(s['events'] for s in samples) / run_s if run_s else 0.0
+    result_['notifications_per_sec'] = sum(s['notifications'] for s in samples) / run_s if run_s else 0.0
+    result_['threads_peak'] = max(s['threads'] for s in samples)
+    result_['rss_peak_kb'] = max(s['rss_kb'] for s in samples)
+    for phase in ('create', 'run', 'shutdown'):
+        result_[phase + '_ms'] = sum(s[phase] for s in samples) * 1000 / len(samples)
+    return result_
+
+
+def run(iterations, params=None):
+    """ Run the throughput benchmarks
+
+        :param iterations: Number of simulation runs, at most *RUNS*
+        :param params: Optional dictionary of simulation -> configuration parameters
+        :returns: Dictionary of benchmark results
+    """
+    runs = max(min(iterations, RUNS), 1)
+    params = params or {}
+    return {'throughput.%s' % simulation: result([spawn(simulation, params.get(simulation, {}))
+                                                  for _ in range(runs)])
+            for simulation in SIMULATIONS}
+
+
+if __name__ == '__main__':
+    """ Run from the command line """
+    parser = argparse.ArgumentParser(description='Headless StateEngineCrank simulation throughput.')
+    parser.add_argument('simulation', choices=SIMULATIONS.keys(), help='simulation to run')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='population parameter, may be repeated')
+    parser.add_argument('--runs', type=int, default=RUNS, help='simulation runs')
+    parser.add_argument('--scale', type=float, default=SCALE, help='real seconds per simulated second')
+    parser.add_argument('--output', help='write results to this JSON file')
+    args = parser.parse_args()
+
+    parameters = {}
+    for setting in args.set:
+        name, _, text = setting.partition('=')
+        try:
+            parameters[name] = int(text)
+        except ValueError:
+            parser.error('%s: not an integer: %s' % (name, text))
+    results = {'throughput.%s' % args.simulation: result([spawn(args.simulation, parameters, args.scale)
+                                                          for _ in range(max(args.runs, 1))])}
+    print(json.dumps(results, indent=2, sort_keys=True))
+    if args.output:
+        Common.save(results, args.output)
@@ -0,0 +1,83 @@
+""" Benchmarks.Waiter
+
+Meals per second and hunger of the Dining Philosophers waiter.
+
+Philosopher threads think, request their forks from the *Waiter*, eat and release
+their forks until the requested number of meals has been served. Thinking and eating
+take fractions of a millisecond so fork allocation dominates the run.
+
+* waiter.<policy>.meals - ops/sec is meals per second, latencies are the time spent hungry
+  (request to grant), max is the worst hunger of any philosopher
+
+Each waiter allocation policy (see *DiningPhilosophers.main.Waiter.Policies*) is benchmarked.
+"""
+
+# System imports
+import random
+import threading
+import time
+
+# Project imports
+from DiningPhilosophers.main import ConfigData, Waiter
+from Benchmarks.Common import summarize
+
+#: maximum seconds to think between meals
+THINK = 0.0004
+
+#: seconds to eat a meal
+EAT = 0.0002
+
+
+def dine(waiter, meals):
+    """ Serve meals to the philosophers
+
+        :param waiter: The Waiter
+        :param meals: Number of meals to serve
+        :returns: Tuple of (hunger latencies in nanoseconds, elapsed nanoseconds)
+    """
+    philosophers = len(waiter.forks)
+    served = [0]
+    hunger = []
+    lock = threading.Lock()
+
+    def philosopher(id_):
+        left, right = id_, (id_ + 1) % philosophers
+        clock = time.perf_counter_ns
+        while True:
+            time.sleep(random.uniform(0, THINK))
+            t0 = clock()
+            waiter.request(id_, left, right)
+            hungry = clock() - t0
+            time.sleep(EAT)
+            waiter.release(id_, left, right)
+            with lock:
+                if served[0] >= meals:
+                    return
+                served[0] += 1
+                hunger.append(hungry)
+
+    threads = [threading.Thread(target=philosopher, args=(id_,)) for id_ in range(philosophers)]
+    start = time.perf_counter_ns()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return hunger, time.perf_counter_ns() - start
+
+
+def run(iterations):
+    """ Run the waiter benchmarks
+
+        :param iterations: Number of meals per policy
+        :returns: Dictionary of benchmark results
+    """
+    ConfigData()    # configuration must exist before the waiter
+    waiter = Waiter()
+    policy = waiter.config.waiter_policy
+    results = {}
+    for name in Waiter.Policies:
+        waiter.config.set_waiter_policy(name)
+        hunger, elapsed = dine(waiter, iterations)
+        results['waiter.%s.meals' % name] = summarize(hunger, elapsed)
+    waiter.config.set_waiter_policy(policy)
+    return results
@@ -0,0 +1,152 @@
+""" Benchmarks.WaitingRoom
+
+Lock hold times and barber wake-up latency of the Sleeping Barber waiting room.
+
+A customer thread arrives at the *WaitingRoom* while barber threads take waiting
+customers, sleeping on the waiting room until a customer is handed to them when
+none is waiting. Haircuts take a fraction of a millisecond so arrivals are
+sometimes handed to a sleeping barber, sometimes seated and sometimes turned away.
+
+* waitingroom.hold - latencies are the times the waiting room lock is held,
+  ops/sec is lock acquisitions per second
+* waitingroom.handoff - latencies are the time from a customer being handed to a
+  sleeping barber to the barber waking, ops/sec is handoffs per second
+"""
+
+# System imports
+import random
+import threading
+import time
+
+# Project imports
+import mvc
+from SleepingBarber.Common import ConfigData
+from SleepingBarber.WaitingRoom import WaitingRoom
+from Benchmarks.Common import summarize
+
+#: number of barbers
+BARBERS = 4
+
+#: seconds to cut hair
+CUT = 0.0002
+
+#: maximum seconds between arrivals
+ARRIVAL = 0.0001
+
+
+class TimedLock(object):
+    """ Lock recording how long it is held """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.holds = []     #: hold times (nanoseconds)
+
+    def acquire(self, blocking=True, timeout=-1):
+        if not self.lock.acquire(blocking, timeout):
+            return False
+        self.acquired = time.perf_counter_ns()
+        return True
+
+    def release(self):
+        self.holds.append(time.perf_counter_ns() - self.acquired)
+        self.lock.release()
+
+    __enter__ = acquire
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class QuietView(mvc.View):
+    """ View which discards waiting room logging """
+
+    def write(self, text):
+        pass
+
+    def update(self, event):
+        pass
+
+    def run(self):
+        pass
+
+
+class Patron(object):
+    """ Customer arriving at the waiting room """
+
+    def __init__(self, id_):
+        self.id = id_
+        self.handed = 0     #: time handed to a sleeping barber (nanoseconds)
+
+    def set_barber(self, barber):
+        self.handed = time.perf_counter_ns()
+
+
+class Chair(object):
+    """ Barber taking customers from the waiting room """
+
+    def __init__(self, id_):
+        self.id = id_
+        self.current_customer = None
+        self.cancellation = mvc.Cancellation()
+
+
+def shop(room, arrivals):
+    """ Run customers through the waiting room
+
+        :param room: The WaitingRoom
+        :param arrivals: Number of customers arriving
+        :returns: Tuple of (wake-up latencies in nanoseconds, elapsed nanoseconds)
+    """
+    done = threading.Event()
+    wakes = []
+
+    def barber(b):
+        while not done.is_set():
+            customer = room.next_customer(b)
+            if customer is None:
+                if not room.wait_customer(b, 0.01):
+                    continue
+                wakes.append(time.perf_counter_ns() - b.current_customer.handed)
+            time.sleep(CUT)
+
+    barbers = [Chair(id_) for id_ in range(BARBERS)]
+    threads = [threading.Thread(target=barber, args=(b,)) for b in barbers]
+    start = time.perf_counter_ns()
+    for t in threads:
+        t.start()
+    for id_ in range(arrivals):
+        room.arrive(Patron(id_))
+        time.sleep(random.uniform(0, ARRIVAL))
+    done.set()
+    for t in threads:
+        t.join()
+    for b in barbers:
+        room.leave(b)
+    return wakes, time.perf_counter_ns() - start
+
+
+def run(iterations):
+    """ Run the waiting room benchmarks
+
+        :param iterations: Number of customers arriving
+        :returns: Dictionary of benchmark results
+    """
+    ConfigData()    # configuration must exist before the waiting room
+    room = WaitingRoom()
+    room.reset()
+    lock = room.lock
+    view = QuietView(name='waitingroom.quiet')
+    room.register(view)
+    room.lock = TimedLock()
+    try:
+        wakes, elapsed = shop(room, iterations)
+    finally:
+        holds = room.lock.holds
+        room.lock = lock
+        room.views.pop(view.name)
+        room.reset()
+    return {
+        'waitingroom.hold': summarize(holds, elapsed),
+        'waitingroom.handoff': summarize(wakes, elapsed),
+    }
@@ -0,0 +1,100 @@
+""" Benchmarks.main
+
+Benchmark suite command line interface.
+
+Run from the *source* directory::
+
+    python -m Benchmarks.main run [--suite eventbus] [--iterations N] [--output results.json]
+    python -m Benchmarks.main compare results.json baseline.json [--tolerance 0.10]
+
+*compare* exits with a non-zero status if any benchmark regressed against the baseline.
+"""
+
+# System imports
+import argparse
+import importlib
+import sys
+
+# Project imports
+from Benchmarks import Common
+
+#: benchmark suite modules, each suite provides run(iterations) returning a dictionary of results,
+#: suites are imported when run so a suite needing e.g. Tk does not stop the others running
+SUITES = {
+    'eventbus': 'Benchmarks.EventBus',
+    'guisoak': 'Benchmarks.GuiSoak',
+    'shutdown': 'Benchmarks.Shutdown',
+    'startup': 'Benchmarks.Startup',
+    'throughput': 'Benchmarks.Throughput',
+    'waiter': 'Benchmarks.Waiter',
+    'waitingroom': 'Benchmarks.WaitingRoom',
+}
+
+
+def run(suites, iterations):
+    """ Run benchmark suites
+
+        :param suites: List of suite names
+        :param iterations: Number of timed operations per benchmark
+        :returns: Dictionary of benchmark results
+    """
+    results = {}
+    for name in suites:
+        try:
+            suite = importlib.import_module(SUITES[name])
+        except ImportError as e:
+            print('%s: suite skipped, %s' % (name, e), file=sys.stderr)
+            continue
+        results.update(suite.run(iterations))
+    return results
+
+
+def report(results):
+    """ Format benchmark results for display
+
+        :param results: Dictionary of benchmark results
+        :returns: List of report lines
+    """
+    lines = ['{:40s} {:>14s} {:>10s} {:>10s}'.format('benchmark', 'ops/sec', 'p50 us', 'p99 us')]
+    for name in sorted(results.keys()):
+        result = results[name]
+        lines.append('{:40s} {:14.1f} {:10.2f} {:10.2f}'.format(
+            name, result['ops_per_sec'], result['p50_us'], result['p99_us']))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='StateEngineCrank benchmarks.')
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('--suite', action='append', choices=SUITES.keys(),
+                            help='suite to run, may be repeated (default: all)')
+    run_parser.add_argument('--iterations', type=int, default=20000, help='timed operations per benchmark')
+    run_parser.add_argument('--output', help='write results to this JSON file')
+
+    compare_parser = commands.add_parser('compare', help='compare results against a baseline')
+    compare_parser.add_argument('results', help='benchmark results (JSON)')
+    compare_parser.add_argument('baseline', help='baseline benchmark results (JSON)')
+    compare_parser.add_argument('--tolerance', type=float, default=0.10, help='allowed relative change')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = run(args.suite or sorted(SUITES.keys()), args.iterations)
+        print('\n'.join(report(results)))
+        if args.output:
+            Common.save(results, args.output)
+        return 0
+    if args.command == 'compare':
+        lines, regressions = Common.compare(Common.load(args.results), Common.load(args.baseline), args.tolerance)
+        print('\n'.join(lines))
+        if regressions:
+            print('%d benchmark(s) regressed' % len(regressions))
+            return 1
+        return 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
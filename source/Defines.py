@@ -1,6 +1,7 @@
 """ StateEngineCrank.Defines """
 
 import enum
+import time
 
 TITLE = 'StateEngineCrank'
 
@@ -17,3 +18,24 @@ class Times(float, enum.Enum):
     Stopping = 5.0
     LoopTime = 1.0
     Joining = 1.0
+    Routing = 0.02
+
+
+#: real seconds per simulated second, simulations run faster with values less than 1.0
+time_scale = 1.0
+
+
+def sleep(seconds):
+    """ Sleep for a number of simulated seconds
+
+        :param seconds: Simulated seconds
+    """
+    time.sleep(seconds * time_scale)
+
+
+def clock():
+    """ Simulation clock
+
+        :returns: Simulated seconds since the epoch
+    """
+    return time.time() / time_scale
@@ -0,0 +1,118 @@
+""" DiningPhilosophers.Fairness
+
+Starvation and fairness statistics of the Dining Philosophers simulation.
+
+The waiter records every request for forks as it is made and granted:
+
+* Per philosopher hunger durations, an online accumulator (see *accumulators*) giving
+  mean, percentiles and the longest completed hunger
+* Per philosopher meals eaten, counted as forks are granted
+* Starvation, the longest hunger of each philosopher including one still in progress
+* Jain fairness index of the meals eaten, 1.0 when every philosopher ate equally often
+  falling to 1/n when a single philosopher ate every meal
+
+Statistics are updated incrementally under the waiter lock and read as a snapshot, so
+they are available while the simulation runs. Meals, the longest completed hunger and the
+Jain fairness index are also kept as a *summary*, updated in O(1) as each meal is served,
+which the metrics collector reads without taking the waiter lock.
+"""
+
+# System imports
+import copy
+
+# Project imports
+from accumulators import Accumulator
+
+#: hunger histogram bucket upper bounds (simulated seconds)
+HUNGER_BOUNDS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+
+
+class Fairness(object):
+    """ Per philosopher hunger and meal statistics
+
+        Not locked, the waiter calls *hungry()* and *fed()* holding its lock and
+        reads a *snapshot()* holding it. The *summary()* may be read without the lock.
+    """
+
+    def __init__(self, philosophers):
+        """ Fairness Class Constructor
+
+            :param philosophers: Number of philosophers
+        """
+        self.reset(philosophers)
+
+    def reset(self, philosophers):
+        """ Clear all statistics, called when a simulation starts
+
+            :param philosophers: Number of philosophers
+        """
+        self.hunger = [Accumulator(HUNGER_BOUNDS) for _ in range(philosophers)]    #: hunger durations
+        self.meals = [0] * philosophers             #: meals eaten
+        self.longest = [0] * philosophers           #: longest completed hunger
+        self.hungry_since = [None] * philosophers   #: clock time hunger started, None if not hungry
+        self.meals_total = 0                        #: sum of meals eaten
+        self.meals_squares = 0                      #: sum of the squares of meals eaten
+        self.jain_index = 1.0                       #: (sum meals)^2 / (n * sum meals^2), 1.0 before any meal
+
+    def hungry(self, philosopher_id, now):
+        """ Record a philosopher asking for forks
+
+            :param philosopher_id: ID of hungry philosopher
+            :param now: Clock time of the request
+        """
+        self.hungry_since[philosopher_id] = now
+
+    def fed(self, philosopher_id, now):
+        """ Record a philosopher being granted forks
+
+            :param philosopher_id: ID of philosopher
+            :param now: Clock time forks were granted
+        """
+        hunger = now - self.hungry_since[philosopher_id]
+        self.hunger[philosopher_id].add(hunger)
+        if hunger > self.longest[philosopher_id]:
+            self.longest[philosopher_id] = hunger
+        meals = self.meals[philosopher_id]
+        self.meals[philosopher_id] = meals + 1
+        self.hungry_since[philosopher_id] = None
+        # (m + 1)^2 = m^2 + 2m + 1, the index is kept without summing over all philosophers
+        self.meals_total += 1
+        self.meals_squares += 2 * meals + 1
+        self.jain_index = self.meals_total ** 2 / (len(self.meals) * self.meals_squares)
+
+    def starvation(self, now):
+        """ Longest hunger of each philosopher, completed or in progress
+
+            :param now: Current clock time
+            :returns: List of simulated seconds
+        """
+        return [max(longest, now - since if since is not None else 0)
+                for longest, since in zip(list(self.longest), list(self.hungry_since))]
+
+    def summary(self, now):
+        """ Meals, starvation and the Jain fairness index, read without the waiter lock
+
+            Lists are copied whole, a summary read while a meal is served may count the
+            meal in some values and not in others.
+
+            :param now: Current clock time, for hunger in progress
+            :returns: Dictionary of meals, starvation and the Jain fairness index of meals
+        """
+        return {
+            'meals': list(self.meals),
+            'starvation': self.starvation(now),
+            'jain_index': self.jain_index,
+        }
+
+    def snapshot(self, now):
+        """ Copy of the statistics
+
+            :param now: Current clock time, for hunger in progress
+            :returns: Dictionary of hunger accumulators, meals, starvation and the Jain fairness index of meals
+        """
+        return {
+            'hunger': copy.deepcopy(self.hunger),
+            'meals': list(self.meals),
+            'starvation': self.starvation(now),
+            'jain_index': self.jain_index,
+        }
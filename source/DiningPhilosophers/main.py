@@ -46,6 +46,7 @@ The main module contains:
 """
 
 # System imports
+import collections
 from enum import Enum
 import random
 import threading
@@ -57,6 +58,7 @@ from StateEngineCrank.modules.PyState import StateMachine
 import mvc
 import exceptions
 import Defines
+from DiningPhilosophers.Fairness import Fairness
 
 
 class Borg(object):
@@ -109,6 +111,7 @@ class Config(object):
     Dining_Loops = 100                  #: number of main loops for dining
     Class_Name = 'philosophers'         #: class name for Event registration
     Actor_Base_Name = 'philosopher'     #: used when identifying actors
+    Waiter_Policy = 'fifo'              #: waiter fork allocation policy, see *Waiter.Policies*
 
 
 class ConfigData(Borg):
@@ -125,6 +128,7 @@ class ConfigData(Borg):
         self.dining_loops = Config.Dining_Loops
         self.class_name = Config.Class_Name
         self.actor_base_name = Config.Actor_Base_Name
+        self.waiter_policy = Config.Waiter_Policy
 
     def set_eat_max(self, value):
         self.eat_max = value
@@ -147,6 +151,9 @@ class ConfigData(Borg):
     def get_philosophers(self):
         return self.philosophers
 
+    def set_waiter_policy(self, value):
+        self.waiter_policy = value
+
 
 class ForkStatus(Enum):
     Free = 0            #: Fork is free for use
@@ -165,8 +172,24 @@ class WaiterEvents(Enum):
 class Waiter(mvc.Model, Borg):
     """ Waiter class used to provide synchronization between philosophers wanting to eat.
         Implemented as a Borg so all diners will be referencing the same waiter.
+
+        Forks are allocated under a single lock with a condition per philosopher.
+        Each fork has a queue of the philosophers waiting for it, in order of request.
+        When forks are released only the philosophers who became eligible are woken.
+
+        Allocation policies:
+
+        * fifo - a philosopher may eat when both forks are free and it is first in line
+          for both of them, requests are served in order and no philosopher starves
+        * greedy - a philosopher may eat whenever both forks are free
     """
 
+    #: fork allocation policies
+    Policies = ('fifo', 'greedy')
+
+    #: waiter state, kept apart from the configuration data shared by the other Borgs
+    _shared_state = {}
+
     def __init__(self):
         Borg.__init__(self)
         # see if we have called mvc.Model.__init__()
@@ -193,6 +216,12 @@ class Waiter(mvc.Model, Borg):
         #: Forks - 1 for each philosophers, initialized 'free'
         self.forks = [ForkStatus.Free for _ in range(self.config.philosophers)]  # type: List[ForkStatus]
         self.hungry_timers = [0 for _ in range(self.config.philosophers)]
+        #: Fork wait queues - philosopher IDs waiting for each fork, in order of request
+        self.queues = [collections.deque() for _ in range(self.config.philosophers)]
+        #: Philosopher ID -> (left fork, right fork, condition) for waiting philosophers
+        self.waiting = {}
+        #: Hunger and meal statistics, updated under *lock*
+        self.fairness = Fairness(self.config.philosophers)
 
     def run(self):
         """ Dummy function to satisfy MVC.Model need for a run() function """
@@ -202,15 +231,54 @@ class Waiter(mvc.Model, Borg):
         """ Called by views to alert us to an update - we ignore it """
         pass
 
+    def reset_fairness(self):
+        """ Clear hunger and meal statistics, called when a simulation starts """
+        with self.lock:
+            self.fairness.reset(self.config.philosophers)
+
+    def fairness_snapshot(self):
+        """ Copy of the hunger and meal statistics, see *Fairness.snapshot()* """
+        with self.lock:
+            return self.fairness.snapshot(Defines.clock())
+
+    def _eligible(self, philosopher_id, left_fork, right_fork):
+        """ Check if a philosopher may be given its forks, the lock must be held
+
+            :param philosopher_id: ID of waiting Philosopher
+            :param left_fork: ID of left fork required to eat
+            :param right_fork: ID of right fork required to eat
+            :returns: True if the philosopher may eat
+        """
+        if self.forks[left_fork] is ForkStatus.InUse or self.forks[right_fork] is ForkStatus.InUse:
+            return False
+        if self.config.waiter_policy == 'greedy':
+            return True
+        return self.queues[left_fork][0] == philosopher_id and self.queues[right_fork][0] == philosopher_id
+
+    def _wake(self, forks):
+        """ Wake the waiting philosophers who became eligible for *forks*, the lock must be held
+
+            :param forks: IDs of forks which were released
+        """
+        candidates = set()
+        for fork in forks:
+            if self.config.waiter_policy == 'greedy':
+                candidates.update(self.queues[fork])
+            elif self.queues[fork]:
+                candidates.add(self.queues[fork][0])
+        for philosopher_id in candidates:
+            left_fork, right_fork, condition = self.waiting[philosopher_id]
+            if self._eligible(philosopher_id, left_fork, right_fork):
+                condition.notify()
+
     def request(self, philosopher_id, left_fork, right_fork):
         """ Function called when a Philosopher wants to eat.
 
-            * The request will block until the waiter is available,
-              i.e. not engaged with another Philosopher.
             * The request will block until both Philosopher left and right
               forks are available, at which point the waiter grants permission.
-            * The caller is assured that both left and right forks are available
-              when this function returns.
+            * The forks are marked in use when this function returns and must be
+              handed back with *release()*.
+            * While waiting the philosopher hungry timer is posted every *LoopTime* seconds.
 
             :param philosopher_id: ID of Philosopher making the request
             :param left_fork: ID of left fork required to eat
@@ -219,61 +287,53 @@ class Waiter(mvc.Model, Borg):
         self.id_ = philosopher_id
         self.notify(self.mvc.events[self.name][WaiterEvents.IN], data=philosopher_id)
 
-        # loop until we successfully get both forks
-        got_forks = False
         self.hungry_timers[philosopher_id] = 0
-        while not got_forks:
-            if self.pause:
-                time.sleep(Defines.Times.Pausing)
-                if not self.step():
+        condition = threading.Condition(self.lock)
+        start = Defines.clock()
+        with self.lock:
+            self.fairness.hungry(philosopher_id, start)
+            self.queues[left_fork].append(philosopher_id)
+            self.queues[right_fork].append(philosopher_id)
+            self.waiting[philosopher_id] = (left_fork, right_fork, condition)
+            while (self.pause and not self.step()) or not self._eligible(philosopher_id, left_fork, right_fork):
+                timeout = Defines.Times.Pausing if self.pause else Defines.Times.LoopTime * Defines.time_scale
+                if condition.wait(timeout=timeout):
                     continue
-
-            # wait until both forks are free
-            while self.forks[left_fork] is ForkStatus.InUse or self.forks[right_fork] is ForkStatus.InUse:
-                time.sleep(Defines.Times.LoopTime)
-                self.hungry_timers[philosopher_id] += 1
-                self.notify(self.mvc.post(class_name='mvc', actor_name=self.name, user_id=philosopher_id,
-                                          event=mvc.Event.Events.TIMER,
-                                          data=[self.hungry_timers[philosopher_id], None]))
-
-            # check if we are paused
-            if self.pause:
-                continue
-
-            # acquire the waiters lock
-            if not self.lock.acquire(blocking=False):
-                time.sleep(Defines.Times.LoopTime)
-                self.hungry_timers[philosopher_id] += 1
-                self.notify(self.mvc.post(class_name='mvc', actor_name=self.name, user_id=philosopher_id,
-                                          event=mvc.Event.Events.TIMER,
-                                          data=[self.hungry_timers[philosopher_id], None]))
-                continue
-
-            # we have the waiters lock, see if both forks are still free
-            if self.forks[left_fork] is ForkStatus.Free or self.forks[right_fork] is ForkStatus.Free:
-                # we have the waiters attention and both forks are free
-                got_forks = True
-                self.notify(self.mvc.events[self.name][WaiterEvents.LEFTFORK], data=philosopher_id)
-                self.notify(self.mvc.events[self.name][WaiterEvents.RIGHTFORK], data=philosopher_id)
-                self.notify(self.mvc.events[self.name][WaiterEvents.OUT], data=philosopher_id)
-            else:
-                # both forks are not free, release the lock and try again
-                self.lock.release()
-                time.sleep(Defines.Times.LoopTime)
-                self.hungry_timers[philosopher_id] += 1
-                self.notify(self.mvc.post(class_name='mvc', actor_name=self.name, user_id=philosopher_id,
-                                          event=mvc.Event.Events.TIMER,
-                                          data=[self.hungry_timers[philosopher_id], None]))
+                seconds_ = int(Defines.clock() - start)
+                if seconds_ != self.hungry_timers[philosopher_id]:
+                    self.hungry_timers[philosopher_id] = seconds_
+                    self.notify(self.mvc.post(class_name='mvc', actor_name=self.name, user_id=philosopher_id,
+                                              event=mvc.Event.Events.TIMER,
+                                              data=[self.hungry_timers[philosopher_id], None]))
+            # we have the waiters attention and both forks are free
+            self.forks[left_fork] = ForkStatus.InUse
+            self.forks[right_fork] = ForkStatus.InUse
+            self.queues[left_fork].remove(philosopher_id)
+            self.queues[right_fork].remove(philosopher_id)
+            del self.waiting[philosopher_id]
+            self.fairness.fed(philosopher_id, Defines.clock())
+        self.notify(self.mvc.events[self.name][WaiterEvents.LEFTFORK], data=philosopher_id)
+        self.notify(self.mvc.events[self.name][WaiterEvents.RIGHTFORK], data=philosopher_id)
+        self.notify(self.mvc.events[self.name][WaiterEvents.OUT], data=philosopher_id)
+
+    def release(self, philosopher_id, left_fork, right_fork):
+        """ Function called when a Philosopher puts down its forks
+
+            :param philosopher_id: ID of Philosopher releasing the forks
+            :param left_fork: ID of left fork
+            :param right_fork: ID of right fork
+        """
+        with self.lock:
+            self.forks[left_fork] = ForkStatus.Free
+            self.forks[right_fork] = ForkStatus.Free
+            self._wake((left_fork, right_fork))
 
     def thank_you(self, philosopher_id):
         """ Philosopher thank you to the waiter
 
-            We use this opportunity to release the Waiter lock
-
             :param philosopher_id: ID of philosopher saying thank you
         """
         self.notify(self.mvc.events[self.name][WaiterEvents.RELEASE], data=philosopher_id)
-        self.lock.release()
 
 
 def seconds(minimum, maximum):
@@ -348,7 +408,7 @@ class UserCode(StateMachine):
             Called once every state machine iteration to perform processing
             for the *Eating* state.
         """
-        time.sleep(1)
+        self.sleep(1)
         self.eating_seconds += 1
         self.event_timer -= 1
         self.notify(self.sm_events.events.post(class_name='mvc', actor_name=self.name, user_id=self.id,
@@ -365,8 +425,7 @@ class UserCode(StateMachine):
             Called when the *Eating* state is exited.
         """
         self.logger('Done Eating')
-        self.waiter.forks[self.left_fork] = ForkStatus.Free
-        self.waiter.forks[self.right_fork] = ForkStatus.Free
+        self.waiter.release(self.id, self.left_fork, self.right_fork)
 
     # ===========================================================================
     # noinspection PyPep8Naming
@@ -389,9 +448,9 @@ class UserCode(StateMachine):
             Called when the *Hungry* state is entered.
         """
         self.logger('Hungry/AskPermission')
-        tstart = time.time()
+        tstart = Defines.clock()
         self.waiter.request(self.id, self.left_fork, self.right_fork)
-        tend = time.time()
+        tend = Defines.clock()
         thungry = tend-tstart
         self.hungry_seconds += thungry
         self.event(Events.EvHavePermission)
@@ -404,9 +463,7 @@ class UserCode(StateMachine):
             Called when the state transition *PickUpForks* is taken.
         """
         self.logger('Pickup Forks')
-        self.waiter.forks[self.left_fork] = ForkStatus.InUse
-        self.waiter.forks[self.right_fork] = ForkStatus.InUse
-        # thanking the waiter releases the Waiter's lock
+        # the waiter has marked our forks in use
         self.waiter.thank_you(self.id)
 
     # =========================================================
@@ -415,9 +472,10 @@ class UserCode(StateMachine):
         """ State machine state transition processing for *ThankWaiter*.
 
             Called when the state transition *ThankWaiter* is taken.
-            Thanking the waiter releases the Waiter's lock.
+            We were granted our forks but are stopping before eating, hand them back.
         """
         self.logger('Thank Waiter')
+        self.waiter.release(self.id, self.left_fork, self.right_fork)
         self.waiter.thank_you(self.id)
 
     # ===========================================================================
@@ -440,7 +498,7 @@ class UserCode(StateMachine):
             Called once every state machine iteration to perform
             processing for the *Thinking* state.
         """
-        time.sleep(1)
+        self.sleep(1)
         self.thinking_seconds += 1
         self.event_timer -= 1
         self.notify(self.sm_events.events.post(class_name='mvc', actor_name=self.name, user_id=self.id,
@@ -469,7 +527,7 @@ class UserCode(StateMachine):
         This function is called once every state machine iteration to perform processing
         for the *Finish* state.
         """
-        time.sleep(1)
+        self.sleep(1)
 
     # =========================================================
     # noinspection PyPep8Naming
@@ -577,7 +635,7 @@ class DiningPhilosophers(mvc.Model):
 
             :param exit_when_done: True, then exit when done. False, run until program exit requested.
         """
-        super().__init__(name='Philosophers', thread=threading.Thread(name='Philosophers', target=self.run))
+        super().__init__(name='Philosophers', target=self.run)
 
         #: simulation configuration data
         self.config = ConfigData()
@@ -612,6 +670,7 @@ class DiningPhilosophers(mvc.Model):
 
         #: The waiter
         self.waiter = Waiter()
+        self.waiter.adopt(self)
 
     def create_philosophers(self, first_time):
         """ Create philosophers
@@ -633,24 +692,16 @@ class DiningPhilosophers(mvc.Model):
             self.philosophers = []
             self.running = False
 
+        self.waiter.adopt(self)
+        self.waiter.reset_fairness()
         for id_ in range(self.config.philosophers):
             philosopher = Philosopher(philosopher_id=id_)
             self.philosophers.append(philosopher)
-            for vk in self.views.keys():
-                philosopher.register(self.views[vk])
+            philosopher.adopt(self)
 
-    def register(self, view):
-        """ Register all simulation actors with the specified view.
-
-            The View may be anything which can respond to view type events.
-            [e.g. console, logger, GUI, etc.]
-
-            :param view: View to register with.
-        """
-        self.views[view.name] = view
-        for p in self.philosophers:
-            p.register(view)
-        self.waiter.register(view)
+    def children(self):
+        """ Simulation actors, which share our views and router topic """
+        return self.philosophers + [self.waiter]
 
     def update(self, event):
         """ Called by Views and/or Controller to alert us to an event.
@@ -677,6 +728,7 @@ class DiningPhilosophers(mvc.Model):
         elif event['event'] is self.mvc_events.events[self.name][mvc.Event.Events.STOP]['event']:
             self.logger('[{}]: {}'.format(event['class'], event['text']))
             self.set_stopping()
+            self.cancellation.cancel()
         elif event['event'] is self.mvc_events.events[self.name][mvc.Event.Events.PAUSE]['event']:
             self.logger('[{}]: {}'.format(event['class'], event['text']))
             self.set_pause()
@@ -714,7 +766,7 @@ class DiningPhilosophers(mvc.Model):
         return left, right
 
     def statistics(self):
-        """ Calculate philosopher statistics """
+        """ Calculate philosopher statistics, including hunger and fairness """
         text = 'Statistics:'
         for p in self.philosophers:
             t = p.thinking_seconds
@@ -723,8 +775,38 @@ class DiningPhilosophers(mvc.Model):
             total = t + e + h
             text = text + \
                    '\n   Philosopher %2s thinking: %3s  eating: %3s  hungry: %3s  total: %3s' % (p.id, t, e, h, total)
+        fairness = self.waiter.fairness_snapshot()
+        text = text + '\nHunger:'
+        for id_, (hunger, meals, starvation) in enumerate(zip(fairness['hunger'], fairness['meals'],
+                                                              fairness['starvation'])):
+            text = text + \
+                '\n   Philosopher %2s meals: %3d  hunger mean: %5.1f  p50: %5.1f  p99: %5.1f  starvation: %5.1f' % \
+                (id_, meals, hunger.mean, hunger.percentile(0.50) or 0, hunger.percentile(0.99) or 0, starvation)
+        starvation = fairness['starvation']
+        if starvation:
+            text = text + '\nFairness: meals: %d  jain index: %.3f  max starvation: %.1f (philosopher %d)' % \
+                (sum(fairness['meals']), fairness['jain_index'], max(starvation), starvation.index(max(starvation)))
         return text
 
+    def metrics(self):
+        """ Metrics collector, reads the waiter hungry timers and fairness summary without locking
+
+            :returns: List of metric families
+        """
+        waiter = Waiter()
+        timers = list(waiter.hungry_timers)
+        fairness = waiter.fairness.summary(Defines.clock())
+        return [
+            ('philosopher_hungry_seconds', 'gauge', 'Seconds the philosopher has been waiting for forks',
+             [({'philosopher': p}, t) for p, t in enumerate(timers)]),
+            ('philosopher_meals_total', 'counter', 'Meals the philosopher has eaten',
+             [({'philosopher': p}, m) for p, m in enumerate(fairness['meals'])]),
+            ('philosopher_starvation_seconds', 'gauge', 'Longest time the philosopher has been hungry',
+             [({'philosopher': p}, s) for p, s in enumerate(fairness['starvation'])]),
+            ('philosophers_fairness_jain_index', 'gauge', 'Jain fairness index of meals eaten',
+             [({}, fairness['jain_index'])]),
+        ]
+
     def run(self):
         """ DiningPhilosophers Main program
 
@@ -737,13 +819,16 @@ class DiningPhilosophers(mvc.Model):
         first_time = True
         while not done:
 
+            # A new cancellation token for this simulation, adopted by the waiter and the philosophers
+            self.cancellation = mvc.Cancellation()
+
             # Instantiate and initialize all philosophers
             self.create_philosophers(first_time=first_time)
             first_time = False
 
             # Wait for simulation to start running
             while not self.running:
-                time.sleep(Defines.Times.Starting)
+                Defines.sleep(Defines.Times.Starting)
 
             # Philosophers have been instantiated and threads created
             # Start the simulation, i.e. start all philosophers eating
@@ -753,8 +838,9 @@ class DiningPhilosophers(mvc.Model):
 
             # Wait for the simulation to complete
             for loop in range(self.config.dining_loops):
-                # Sleep for 1 loop iteration time slot
-                time.sleep(Defines.Times.LoopTime)
+                # Sleep for 1 loop iteration time slot, the simulation ends if cancelled
+                if self.sleep(Defines.Times.LoopTime):
+                    break
                 # Bump loop count and notify
                 loop += 1
                 self.notify(self.mvc_events.events[self.name][mvc.Event.Events.LOOPS], data=loop)
@@ -765,6 +851,9 @@ class DiningPhilosophers(mvc.Model):
                 if self.running is False:
                     break
 
+            # Cancel the simulation, simulated time now passes without delay
+            self.cancellation.cancel()
+
             # Tell philosophers to stop
             for p in self.philosophers:
                 p.post_event(Events.EvStop)
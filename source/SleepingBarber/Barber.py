@@ -40,14 +40,13 @@ The Barber Module contains:
     @enduml
 """
 # System imports
-import time
 from enum import Enum
 
 # Project imports
 import mvc
+import Defines
 
 from StateEngineCrank.modules.PyState import StateMachine
-from SleepingBarber.Common import Config as Config
 from SleepingBarber.Common import ConfigData as ConfigData
 from SleepingBarber.Common import Statistics as Statistics
 from SleepingBarber.Customer import Events as CustomerEvents
@@ -108,10 +107,12 @@ class UserCode(StateMachine):
 
         self.customers = 0                  #: customers served
         self.cut_timer = 0                  #: cut timer, used to time the length of a haircut
+        self.service = self.config.service_times(id_)   #: haircut time generator
         self.cutting_time = 0               #: total time spent cutting
         self.sleep_timer = 0                #: sleep timer, used to time the length of a barber sleeping
         self.sleeping_time = 0              #: total time spent sleeping
         self.current_customer = None        #: current customer being served
+        self.next_customer = None           #: waiting customer taken by *take_customer()*, read by the guards
         self.waiting_room = WaitingRoom()   #: waiting room instantiation
         self.mvc_events = mvc.Event()       #: for event registration
         self.mvc_events.register_actor(class_name=self.config.class_name, actor_name=self.name)
@@ -128,7 +129,7 @@ class UserCode(StateMachine):
             This function is called once every state machine iteration to perform
             processing for the *Cutting* state.
         """
-        time.sleep(1)
+        self.sleep(1)
         # track total time cutting hair
         self.cutting_time += 1
 
@@ -141,8 +142,12 @@ class UserCode(StateMachine):
                                                data=[self.cut_timer, self.current_state, self.current_customer]))
         if self.cut_timer == 0:
             self.logger(f'Finish cutting {self.customers}')
-            self.post_event(Events.EvFinishCutting)
             self.current_customer.post_event(CustomerEvents.EvFinishCutting)
+            self.current_customer = None
+            # queued before the hand-off, a customer handed to us once we sleep follows it
+            self.post_event(Events.EvFinishCutting)
+            if self.current_state is States.Cutting:
+                self.take_customer()
 
     # ===========================================================================
     # noinspection PyPep8Naming
@@ -154,7 +159,7 @@ class UserCode(StateMachine):
         # track total customers
         self.customers += 1
         # start haircut timer
-        self.cut_timer = Config.cutting_time()
+        self.cut_timer = self.service.draw()
         self.logger(f'StartCutting {self.customers} [{self.cut_timer}]')
         # post event for view handling
         self.notify(self.sm_events.events.post(class_name='mvc', actor_name=self.name, user_id=self.id,
@@ -170,9 +175,15 @@ class UserCode(StateMachine):
             end of the SleepingBarber simulation.
         """
         self.logger('BarberDone')
-        stats = Statistics()
-        with stats.lock:
-            stats.barbers.append(self)
+        # a customer handed to us as we were told to stop is never served, its haircut ends at once
+        customer = self.waiting_room.leave(self)
+        if customer is not None:
+            customer.post_event(CustomerEvents.EvFinishCutting)
+        # a customer taken from the waiting room as we were told to stop is never served
+        if self.next_customer is not None:
+            self.next_customer.post_event(CustomerEvents.EvStop)
+            self.next_customer = None
+        Statistics().record_barber(self)
         self.running = False
 
     # ===========================================================================
@@ -183,7 +194,9 @@ class UserCode(StateMachine):
             This function is called once every state machine iteration to perform
             processing for the *Sleeping* state.
         """
-        time.sleep(1)
+        if self.waiting_room.wait_customer(self, Defines.time_scale):
+            # a customer has been handed to us, EvCustomerEnter follows
+            return
         self.sleeping_time += 1     # total time sleeping
         self.sleep_timer += 1       # current time sleeping
         # post event for view handling
@@ -222,6 +235,16 @@ class UserCode(StateMachine):
             This function is called when the *StartUp* state is entered.
         """
         self.logger('Starting')
+        self.take_customer()
+
+    def take_customer(self):
+        """ Take the next waiting customer, or join the sleeping barbers if none is waiting
+
+            Called by state functions before the event whose guards test *next_customer*
+            is processed, the guards only read the outcome. Once we are sleeping an
+            arriving customer is handed to us and sends us EvCustomerEnter.
+        """
+        self.next_customer = self.waiting_room.next_customer(self)
 
     # =========================================================
     # noinspection PyPep8Naming
@@ -231,11 +254,10 @@ class UserCode(StateMachine):
             This function is called whenever the state transition *GetCustomer*
             is taken.
 
-            A customer is obtained from the waiting room and the customer
-            event EvBarberReady is delivered.
+            The customer taken from the waiting room by *take_customer()* becomes the
+            current customer and the customer event EvBarberReady is delivered.
         """
-        with self.waiting_room.lock:
-            self.current_customer = self.waiting_room.get_customer()
+        self.current_customer, self.next_customer = self.next_customer, None
         self.logger(f'GetCustomer {self.current_customer.id}')
         self.current_customer.post_event(CustomerEvents.EvBarberReady)
         self.current_customer.set_barber(self)
@@ -246,13 +268,12 @@ class UserCode(StateMachine):
         """ State machine guard processing for *NOT_WaitingCustomer*.
 
             This function is called whenever the guard *NOT_WaitingCustomer*
-            is tested.
+            is tested, it reads the outcome of *take_customer()*.
 
             :returns: True : Guard is active/valid
             :returns: False : Guard is inactive/invalid
         """
-        with self.waiting_room.lock:
-            return not self.waiting_room.customer_waiting()
+        return self.next_customer is None
 
     # =========================================================
     # noinspection PyPep8Naming
@@ -260,13 +281,12 @@ class UserCode(StateMachine):
         """ State machine guard processing for *GetWaitingCustomer*.
 
             This function is called whenever the guard *GetWaitingCustomer*
-            is tested.
+            is tested, it reads the outcome of *take_customer()*.
 
             :returns: True : Customer waiting [Guard is active/valid]
             :returns: False : Customer NOT waiting [Guard is inactive/invalid]
         """
-        with self.waiting_room.lock:
-            return self.waiting_room.customer_waiting()
+        return self.next_customer is not None
 
     # ===========================================================================
     # noinspection PyPep8Naming
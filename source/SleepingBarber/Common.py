@@ -5,11 +5,12 @@
 # System imports
 import random
 from threading import Lock as Lock
-import time
-from pip._internal import self_outdated_check
 from contextlib import contextmanager
 
 # Project imports
+import Defines
+import distributions
+from accumulators import ShardedAccumulator
 
 
 class Borg(object):
@@ -34,6 +35,9 @@ class Config(object):
     CustomerRate = 5                    #: rate for new customers
     CustomerVariance = 2                #: variance in the customer rate
     SimulationLoops = 100               #: total number of loops (seconds) to run
+    Arrivals = None                     #: customer arrival time distribution, None for rate +/- variance
+    Service = None                      #: haircut time distribution, None for haircut minimum to maximum
+    Seed = None                         #: random number generator seed, None for an unseeded simulation
     Class_Name = 'Barbers'              #: class name for Event registration
     Actor_Base_Name = 'Barber'          #: used when identifying actors
     Customer_Class_Name = 'Customers'   #: class name for Event registration
@@ -55,11 +59,12 @@ class Config(object):
     @staticmethod
     def cutting_time():
         """ Utility function to return a random time between minimum and maximum
-            time specified in the configuration class
+            time specified in the simulation configuration data
 
             :returns: Random cutting time
         """
-        return Config.seconds(Config.HairCut_Min, Config.HairCut_Max)
+        config = ConfigData()
+        return Config.seconds(config.haircut_min, config.haircut_max)
 
 
 class ConfigData(Borg):
@@ -77,11 +82,39 @@ class ConfigData(Borg):
         self.customer_rate = Config.CustomerRate
         self.customer_variance = Config.CustomerVariance
         self.simulation_loops = Config.SimulationLoops
+        self.arrivals = Config.Arrivals
+        self.service = Config.Service
+        self.seed = Config.Seed
         self.class_name = Config.Class_Name
         self.actor_base_name = Config.Actor_Base_Name
         self.customer_class_name = Config.Customer_Class_Name
         self.customer_actor_base_name = Config.Customer_Base_Name
 
+    def arrival_times(self, customer_rate, customer_variance):
+        """ Customer inter-arrival time generator
+
+            Uniform between *customer_rate - customer_variance* and *customer_rate + customer_variance*
+            unless an *arrivals* distribution is configured (see *distributions.create()*).
+
+            :param customer_rate: rate at which customers will be generated
+            :param customer_variance: variance in the customer rate
+            :returns: Distribution drawing whole seconds between customers
+        """
+        text = self.arrivals or 'uniform:%d:%d' % (customer_rate - customer_variance, customer_rate + customer_variance)
+        return distributions.create(text, seed=distributions.derive(self.seed, 'arrivals'), integer=True)
+
+    def service_times(self, barber_id):
+        """ Haircut time generator of a barber
+
+            Uniform between *haircut_min* and *haircut_max* unless a *service* distribution
+            is configured (see *distributions.create()*).
+
+            :param barber_id: barber ID, each barber draws an independent sequence
+            :returns: Distribution drawing whole seconds to cut hair
+        """
+        text = self.service or 'uniform:%d:%d' % (self.haircut_min, self.haircut_max)
+        return distributions.create(text, seed=distributions.derive(self.seed, 'service%d' % barber_id), integer=True)
+
     def get_barbers(self):
         return self.barbers
 
@@ -99,6 +132,9 @@ class Statistics(Borg):
     """ This class is used by both barbers and customers to collect statistics.
 
         Implemented as a Borg, it can be instantiated as many times as necessary.
+
+        Customer times are recorded into online accumulators as each customer finishes,
+        no customer objects are kept and the statistics are available while the simulation runs.
     """
     def __enter__(self):
         return self
@@ -111,44 +147,53 @@ class Statistics(Borg):
         if len(self._shared_state['statistics']):
             return
         self.lock = Lock()      #: obtained by callers to ensure sole access
-        self.customers = []     #: list of customers instantiated in the simulation
-        self.barbers = []       #: list of barbers instantiated in the simulation
+        self.reset()
+
+    def reset(self):
+        self.barbers = []       #: (id, customers, cutting, sleeping) for each barber which finished
         self.max_waiters = 0    #: maximum number of waiters encountered during the simulation
         self.barber_sleeping_time = 0       #: total sleeping time for all barbers
         self.barber_cutting_time = 0        #: total cutting time for all barbers
         self.barber_total_customers = 0     #: total number of customers served
         self.lost_customers = 0             #: number of customers lost due to no chairs in waiting room
-        self.simulation_start_time = 0      #: clock time, start of simulation
+        self.simulation_start_time = Defines.clock()  #: clock time, start of simulation
         self.simulation_finish_time = 0     #: clock time, finish time of simulation
+        self.customers_cutting = ShardedAccumulator()   #: customer cutting times
+        self.customers_waiting = ShardedAccumulator()   #: customer waiting times
+        self.customers_elapsed = ShardedAccumulator()   #: customer elapsed (clock) times
         self.customers_cutting_time = 0     #: total cutting time for all customers
         self.customers_waiting_time = 0     #: total waiting time for all customers
         self.customers_elapsed_time = 0     #: total elapsed time for all customers
         self.customers_simulation_time = 0  #: total simulation time (cutting + waiting) for all customers
-        self.simulation_start_time = time.time()
 
         # Summary statistics - fetchable as strings
         self._customer_stats = ''
         self._barber_stats = ''
         self._summary_stats = ''
 
-    def reset(self):
-        self.customers = []
-        self.barbers = []
-        self.max_waiters = 0
-        self.barber_sleeping_time = 0
-        self.barber_cutting_time = 0
-        self.barber_total_customers = 0
-        self.lost_customers = 0
-        self.simulation_start_time = 0
-        self.simulation_finish_time = 0
-        self.customers_cutting_time = 0
-        self.customers_waiting_time = 0
-        self.customers_elapsed_time = 0
-        self.customers_simulation_time = 0
-        self.simulation_start_time = time.time()
-        self._customer_stats = ''
-        self._barber_stats = ''
-        self._summary_stats = ''
+    def record_customer(self, customer):
+        """ Record the times of a customer who has finished, called from the customer's thread
+
+            :param customer: Customer which has finished
+        """
+        self.customers_cutting.add(customer.cutting_time)
+        self.customers_waiting.add(customer.waiting_time)
+        self.customers_elapsed.add(customer.finish_time - customer.start_time)
+
+    def record_barber(self, barber):
+        """ Record the totals of a barber who has finished
+
+            :param barber: Barber which has finished
+        """
+        with self.lock:
+            self.barbers.append((barber.id, barber.customers, barber.cutting_time, barber.sleeping_time))
+            self.barber_sleeping_time += barber.sleeping_time
+            self.barber_cutting_time += barber.cutting_time
+            self.barber_total_customers += barber.customers
+
+    def customers(self):
+        """ Number of customers who have finished """
+        return self.customers_elapsed.snapshot().count
 
     def customer_stats(self):
         """ Compiles customer statistics for the simulation
@@ -160,34 +205,28 @@ class Statistics(Borg):
             * total customers simulation time
 
         Returns:
-            * individual customer statistics
+            * count, mean, standard deviation, min, max and percentiles of customer times
             * cumulative statistics for all customers
 
         :returns: Statistics for all customers (string)
         """
-
-        # sort customers by ID
-        customers = sorted(self.customers, key=lambda customer: customer.id)
+        elapsed = self.customers_elapsed.snapshot()
+        cutting = self.customers_cutting.snapshot()
+        waiting = self.customers_waiting.snapshot()
+        self.customers_elapsed_time = elapsed.total
+        self.customers_cutting_time = cutting.total
+        self.customers_waiting_time = waiting.total
+        self.customers_simulation_time = cutting.total + waiting.total
 
         # Compile customer statistics for the simulation
         self._customer_stats = 'Customer Statistics:'
-        for c in range(len(customers)):
-            customer = customers[c]
-            elapsed_time = customer.finish_time - customer.start_time
-            simulation_time = customer.cutting_time + customer.waiting_time
-            self.customers_elapsed_time += elapsed_time
-            self.customers_simulation_time += simulation_time
-            self.customers_cutting_time += customer.cutting_time
-            self.customers_waiting_time += customer.waiting_time
+        for name, a in (('elapsed', elapsed), ('cutting', cutting), ('waiting', waiting)):
+            if not a.count:
+                continue
             self._customer_stats = self._customer_stats + \
-                '\ncustomer[%03d] start: %4.2d  finish: %4.2d  elapsed: %3.2d  cutting: %2d  waiting: %2d  simulation: %2d' % \
-                (customer.id,
-                 customer.start_time - self.simulation_start_time,
-                 customer.finish_time - self.simulation_start_time,
-                 elapsed_time,
-                 customer.cutting_time,
-                 customer.waiting_time,
-                 simulation_time)
+                '\n%-8s count: %4d  mean: %5.1f  stddev: %5.1f  min: %3d  max: %3d  p50: %3d  p90: %3d  p99: %3d' % \
+                (name, a.count, a.mean, a.stddev, a.min, a.max,
+                 a.percentile(0.50), a.percentile(0.90), a.percentile(0.99))
 
         self._customer_stats = self._customer_stats + \
             '\n\nCustomer Totals:\nelapsed: %4.2d  cutting: %3d  waiting: %3d  simulation: %3d' % \
@@ -205,20 +244,11 @@ class Statistics(Borg):
 
             :returns: Statistics for all barbers (string)
         """
-
-        # Sort barber array by ID
-        barbers = sorted(self.barbers, key=lambda barber: barber.id)
-
-        # Compile barber statistics for the simulation
+        # Compile barber statistics for the simulation, sorted by barber ID
         self._barber_stats = 'Barber Statistics:'
-        for b in range(len(barbers)):
-            barber = barbers[b]
-            self.barber_sleeping_time += barber.sleeping_time
-            self.barber_cutting_time += barber.cutting_time
-            self.barber_total_customers += barber.customers
+        for id_, customers, cutting, sleeping in sorted(self.barbers):
             self._barber_stats = self._barber_stats + \
-                '\nbarber[%s] customers: %3d  cutting: %3d  sleeping: %3d' % \
-                (barber.id, barber.customers, barber.cutting_time, barber.sleeping_time)
+                '\nbarber[%s] customers: %3d  cutting: %3d  sleeping: %3d' % (id_, customers, cutting, sleeping)
 
         return self._barber_stats + '\n'
 
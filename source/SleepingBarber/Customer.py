@@ -39,16 +39,17 @@ The Customer Module contains:
 """
 
 # System imports
-import time
 from enum import Enum
 
 # Project imports
 import mvc
+import Defines
 from StateEngineCrank.modules.PyState import StateMachine
 from SleepingBarber.Common import Config
 from SleepingBarber.Common import ConfigData as ConfigData
 from SleepingBarber.Common import Statistics as Statistics
 import SleepingBarber.Barber
+from SleepingBarber.WaitingRoom import Arrival
 from SleepingBarber.WaitingRoom import WaitingRoom as WaitingRoom
 
 # ==============================================================================
@@ -108,7 +109,7 @@ class UserCode(StateMachine):
         self.my_class_name = self.config.customer_class_name    #: our class name
 
         # clock time of simulation from start to finish
-        self.start_time = time.time()   #: simulation clock start time
+        self.start_time = Defines.clock()   #: simulation clock start time
         self.finish_time = None         #: simulation clock stop time
 
         # simulation time spent getting a haircut
@@ -124,10 +125,36 @@ class UserCode(StateMachine):
         self.waiting_time_elapsed = None    #: waiting clock time - elapsed
         self.waiting_time = 0               #: waiting time - simulation time (seconds)
         self.my_barber = None               #: this customers barber
+        self.arrival = None                 #: what happened when we arrived at the waiting room
 
         self.mvc_events = mvc.Event()       #: for event registration
+
+    def register_actor(self):
+        """ Register our name as an actor, as a state machine and as a customer """
+        StateMachine.register_actor(self)
         self.mvc_events.register_actor(class_name=self.config.customer_class_name, actor_name=self.name)
 
+    def reset(self, sm_id=None):
+        """ Start again as a new customer, named after its customer ID
+
+            :param sm_id: customer ID of the new customer, None to keep the current ID
+        """
+        if sm_id is not None:
+            self.id = sm_id
+        StateMachine.reset(self, sm_id, name=f'{Config.Customer_Base_Name.title()}{self.id:03d}')
+        self.start_time = Defines.clock()
+        self.finish_time = None
+        self.cutting_time_start = None
+        self.cutting_time_finish = None
+        self.cutting_time_elapsed = None
+        self.cutting_time = 0
+        self.waiting_time_start = None
+        self.waiting_time_finish = None
+        self.waiting_time_elapsed = None
+        self.waiting_time = 0
+        self.my_barber = None
+        self.arrival = None
+
     def get_barber(self):
         return self.my_barber
 
@@ -141,14 +168,12 @@ class UserCode(StateMachine):
 
             This function is called when the *Finish* state is entered.
         """
-        self.finish_time = time.time()
+        self.finish_time = Defines.clock()
         elapsed_time = int(self.finish_time - self.start_time)
         simulation_time = self.waiting_time + self.cutting_time
         self.logger(f'Done [{elapsed_time}/{simulation_time}]')
         # record customer statistics
-        stats = Statistics()
-        with stats.lock:
-            stats.customers.append(self)
+        Statistics().record_customer(self)
         self.running = False
 
     # ===========================================================================
@@ -159,7 +184,7 @@ class UserCode(StateMachine):
             This function is called once every state machine iteration to perform processing
             for the *HairCut* state.
         """
-        time.sleep(1)
+        self.sleep(1)
         self.cutting_time += 1
 
     # ===========================================================================
@@ -170,7 +195,7 @@ class UserCode(StateMachine):
             This function is called when the *HairCut* state is entered.
         """
         self.logger(f'StartHairCut [{self.my_barber.id}]')
-        self.cutting_time_start = time.time()
+        self.cutting_time_start = Defines.clock()
 
     # ===========================================================================
     # noinspection PyPep8Naming
@@ -180,7 +205,7 @@ class UserCode(StateMachine):
             This function is called when the *HairCut* state is exited.
         """
         self.logger(f'StopHairCut [{self.cutting_time}]')
-        self.cutting_time_finish = time.time()
+        self.cutting_time_finish = Defines.clock()
         self.cutting_time_elapsed = self.cutting_time_finish - self.cutting_time_start
 
     # =========================================================
@@ -204,20 +229,12 @@ class UserCode(StateMachine):
         """
         self.logger('CustomerStart')
 
-        # tell barbers we are here
-        with self.waiting_room.lock:
-            for barber in self.barbers:
-                # if we find one sleeping then issue our start and
-                # send the barber a 'customer enter' event
-                if barber.current_state == SleepingBarber.Barber.States.Sleeping:
-                    self.post_event(Events.EvStart)
-                    self.my_barber = barber
-                    barber.current_customer = self
-                    barber.post_event(SleepingBarber.Barber.Events.EvCustomerEnter)
-                    return
-            # no sleeping barbers so issue our start and hopefully
-            # we end up in the waiting room
-            self.post_event(Events.EvStart)
+        # issue our start before arriving, a barber may call us from a chair at once
+        self.post_event(Events.EvStart)
+        self.arrival = self.waiting_room.arrive(self)
+        # if we were handed to a sleeping barber send the barber a 'customer enter' event
+        if self.arrival is Arrival.Barber:
+            self.my_barber.post_event(SleepingBarber.Barber.Events.EvCustomerEnter)
 
     # ===========================================================================
     # noinspection PyPep8Naming
@@ -227,7 +244,7 @@ class UserCode(StateMachine):
             This function is called when the *Waiting* state is entered.
         """
         self.logger('StartWaiting')
-        self.waiting_time_start = time.time()
+        self.waiting_time_start = Defines.clock()
         # post event for view handling
         self.notify(self.sm_events.events.post(class_name='mvc', actor_name=self.name, user_id=self.id,
                                                event=mvc.Event.Events.TIMER,
@@ -241,7 +258,7 @@ class UserCode(StateMachine):
             This function is called when the *Waiting* state is exited.
         """
         self.logger('StopWaiting')
-        self.waiting_time_finish = time.time()
+        self.waiting_time_finish = Defines.clock()
         self.waiting_time_elapsed = self.waiting_time_finish - self.waiting_time_start
 
     # ===========================================================================
@@ -252,7 +269,7 @@ class UserCode(StateMachine):
             This function is called once every state machine iteration to perform
             processing for the *Waiting* state.
         """
-        time.sleep(1)
+        self.sleep(1)
         self.waiting_time += 1
         # post event for view handling
         self.notify(self.sm_events.events.post(class_name='mvc', actor_name=self.name, user_id=self.id,
@@ -270,11 +287,7 @@ class UserCode(StateMachine):
             :returns: True : Guard is active/valid (Barber *is* sleeping)
             :returns: False : Guard is inactive/invalid (Barber *is not* sleeping)
         """
-        with self.waiting_room.lock:
-            for barber in self.barbers:
-                if barber.current_state is SleepingBarber.Barber.States.Sleeping:
-                    return True
-            return False
+        return self.arrival is Arrival.Barber
 
     # =========================================================
     # noinspection PyPep8Naming
@@ -287,11 +300,7 @@ class UserCode(StateMachine):
             :returns: False : Guard is inactive/invalid. Not all barbers are cutting, or,
                             there are no are no waiting room chairs free.
         """
-        with self.waiting_room.lock:
-            for barber in self.barbers:
-                if barber.current_state is SleepingBarber.Barber.States.Sleeping:
-                    return False
-            return self.waiting_room.full()
+        return self.arrival is Arrival.NoChair
 
     # =========================================================
     # noinspection PyPep8Naming
@@ -305,11 +314,7 @@ class UserCode(StateMachine):
             :returns: False : Guard is inactive/invalid. Not all barbers are cutting, or,
                               there are no are no waiting room chairs free.
         """
-        with self.waiting_room.lock:
-            for barber in self.barbers:
-                if barber.current_state is SleepingBarber.Barber.States.Sleeping:
-                    return False
-            return not self.waiting_room.full()
+        return self.arrival is Arrival.Chair
 
     # =========================================================
     # noinspection PyPep8Naming
@@ -317,9 +322,10 @@ class UserCode(StateMachine):
         """ State machine state transition processing for *GetChair*.
 
             This function is called whenever the state transition *GetChair* is taken.
+
+            Our chair was assigned when we arrived at the waiting room.
         """
-        with self.waiting_room.lock:
-            self.waiting_room.get_chair(self)
+        self.logger(f'GetChair [{self.waiting_room.customers_waiting}]')
 
 # ==============================================================================
 # ===== USER STATE CODE = END ==================================================
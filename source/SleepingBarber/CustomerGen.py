@@ -6,19 +6,25 @@ Customers are generated:
 
 * At a specified rate (e.g. 5 customers per unit of time)
 * With a randomization provided at the start of the simulation.
+* Or with a configured arrival time distribution (see *distributions*).
 
 This provides a random nature to the arrival of customers to the barber shop.
+
+Customers are recycled, a customer who has finished is unregistered, then reset and
+reused for a later arrival under the new arrival's customer ID, so however long the
+simulation runs the number of customer state machines is bounded by the number of
+customers active at the same time.
 """
 
 # System imports
 import time
+from collections import deque
 from queue import Queue
 from threading import Thread
 
 # Project imports
 import mvc
 import Defines
-from SleepingBarber.Common import Config as Config
 from SleepingBarber.Common import ConfigData as ConfigData
 from SleepingBarber.Customer import UserCode as Customer
 
@@ -33,7 +39,12 @@ class Worker(Thread):
 
     def run(self):
         while True:
-            func, args, kargs = self.tasks.get()
+            task = self.tasks.get()
+            if task is None:
+                # the pool is stopping
+                self.tasks.task_done()
+                return
+            func, args, kargs = task
             try:
                 func(*args, **kargs)
             except Exception as e:
@@ -48,8 +59,7 @@ class ThreadPool:
     """ Pool of threads consuming tasks from a queue """
     def __init__(self, num_threads):
         self.tasks = Queue(num_threads)
-        for _ in range(num_threads):
-            Worker(self.tasks)
+        self.workers = [Worker(self.tasks) for _ in range(num_threads)]
 
     def add_task(self, func, *args, **kargs):
         """ Add a task to the queue """
@@ -60,9 +70,70 @@ class ThreadPool:
         for args in args_list:
             self.add_task(func, args)
 
-    def wait_completion(self):
-        """ Wait for completion of all the tasks in the queue """
-        self.tasks.join()
+    def wait_completion(self, timeout=None):
+        """ Wait for completion of all the tasks in the queue
+
+            :param timeout: Maximum seconds to wait, None to wait forever
+            :returns: True if all the tasks completed
+        """
+        with self.tasks.all_tasks_done:
+            return self.tasks.all_tasks_done.wait_for(lambda: not self.tasks.unfinished_tasks, timeout)
+
+    def stop(self):
+        """ Stop the pool threads once the queued tasks are complete and join them """
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join()
+
+
+class CustomerPool(object):
+    """ Customers available for reuse
+
+        Customers are created when no finished customer is available. A customer is
+        unregistered when it finishes and registered again, named after its new customer
+        ID, when it is reused.
+    """
+
+    def __init__(self, barbers, parent):
+        """ CustomerPool Class Constructor
+
+            :param barbers: list of barbers cutting hair
+            :param parent: model whose views and router topic customers share
+        """
+        self.barbers = barbers      #: list of barbers cutting hair
+        self.parent = parent        #: model adopting customers
+        self.customers = []         #: every customer created
+        self.free = deque()         #: finished customers available for reuse
+
+    def acquire(self, id_):
+        """ Get a customer ready to run
+
+            :param id_: customer ID of the new customer
+            :returns: Customer in its startup state
+        """
+        if self.free:
+            customer = self.free.popleft()
+            customer.reset(id_)
+        else:
+            customer = Customer(id_=id_, barbers=self.barbers)
+            customer.adopt(self.parent)
+            self.customers.append(customer)
+        return customer
+
+    def release(self, customer):
+        """ Return a finished customer for reuse
+
+            :param customer: Customer whose thread has finished
+        """
+        self.free.append(customer)
+
+    def cleanup(self):
+        """ Cleanup customer registrations """
+        for customer in self.customers:
+            customer.cleanup()
+        self.customers = []
+        self.free.clear()
 
 
 class CustomerGenerator(mvc.Model):
@@ -71,14 +142,18 @@ class CustomerGenerator(mvc.Model):
     def cleanup(self):
         """ Cleanup threads and registrations """
 
+        # Join threads, customers finish at once once the simulation is cancelled,
+        # pool threads are daemons so a customer which never finishes is left behind
+        if self.pool.wait_completion(timeout=Defines.Times.Stopping):
+            self.pool.stop()
+        else:
+            self.logger('Customers have not finished')
+
         # Cleanup registrations
-        for c in self.customer_list:
-            c.sm_events.events.unregister_actor(c.name)
+        self.retire()
+        self.customers.cleanup()
         self.mvc_events.unregister_class(self.config.customer_class_name)
 
-        # Join threads
-        self.pool.wait_completion()
-
     def __init__(self, customer_rate, customer_variance, barbers):
         """ CustomerGenerator Class Constructor
 
@@ -90,19 +165,48 @@ class CustomerGenerator(mvc.Model):
         self.customer_rate = customer_rate          #: rate at which customers will be generated
         self.customer_variance = customer_variance  #: variance in rate, used by random number generator
         self.customer_count = 0                     #: total customers
-        self.customer_list = []                     #: list of customer objects
+        self.customer_list = []                     #: list of active customer objects
+        self.finished = deque()                     #: customers whose thread has finished, to be retired
         self.barbers = barbers                      #: list of barbers cutting hair
         self.config = ConfigData()                  #: simulation configuration data
+        self.arrivals = self.config.arrival_times(customer_rate, customer_variance)    #: arrival time generator
         self.mvc_events = mvc.Event()               #: for event registration
         self.mvc_events.register_class(self.config.customer_class_name)
 
         #: maximum number of customers active simultaneously
         self.customer_max = self.config.waiting_chairs + self.config.barbers_max + 1
         self.pool = ThreadPool(self.customer_max)   #: a thread pool for customers
+        self.customers = CustomerPool(barbers, self)    #: customers available for reuse
 
     def update(self, event):
         pass
 
+    def children(self):
+        """ Customers, which share our views and router topic """
+        return list(self.customer_list)
+
+    def serve(self, customer):
+        """ Run a customer in a pool thread, the customer is retired when finished
+
+            :param customer: Customer to run
+        """
+        try:
+            customer.run()
+        finally:
+            customer.unregister_actor()
+            self.finished.append(customer)
+
+    def retire(self):
+        """ Return customers who have finished to the customer pool
+
+            Customer statistics are recorded when a customer finishes, so finished customers
+            are reused and memory stays constant however long the simulation runs.
+        """
+        while self.finished:
+            customer = self.finished.popleft()
+            self.customer_list.remove(customer)
+            self.customers.release(customer)
+
     def run(self):
         """ Customer generator main thread
 
@@ -112,7 +216,8 @@ class CustomerGenerator(mvc.Model):
         self.logger('run.wait')
         # wait until the simulation is running
         while not self.running:
-            time.sleep(Defines.Times.Starting)
+            if self.sleep(Defines.Times.Starting):
+                return
         self.logger('running')
 
         # run until the simulation is stopped or we are done
@@ -120,21 +225,17 @@ class CustomerGenerator(mvc.Model):
             # generate a new customer
             self.customer_count += 1
             self.logger(f'New customer [{self.customer_count}]')
-            next_customer = Customer(id_=self.customer_count, barbers=self.barbers)
-            self.pool.add_task(next_customer.run)
-            for v in self.views:
-                next_customer.register(self.views[v])
-
+            next_customer = self.customers.acquire(self.customer_count)
             next_customer.running = True
             self.customer_list.append(next_customer)
+            self.pool.add_task(self.serve, next_customer)
+            self.retire()
 
             # delay between generating new customers
-            sleep = Config.seconds(
-                self.customer_rate - self.customer_variance,
-                self.customer_rate + self.customer_variance
-            )
+            sleep = self.arrivals.draw()
             self.logger(f'[{self.customer_count}] Zzzz [{sleep}]')
-            time.sleep(sleep)
+            if self.sleep(sleep):
+                break
 
             # pause if requested, keep monitoring the running flag
             while self.pause and self.running:
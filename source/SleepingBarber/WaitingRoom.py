@@ -2,28 +2,45 @@
 
 The Waiting Room module provides accommodations for customers who are waiting
 for a barber to be available to cut hair.
-The waiting room module utilizes a lock to ensure synchronized access to waiting
-room for barber(s) and customer(s).
-The waiting room lock must be obtained by anyone wanting access to the waiting room.
+The waiting room is a monitor, every operation obtains the waiting room lock
+itself so barbers and customers always see a consistent waiting room.
 
 * The waiting room has a fixed number of chairs.
-* If there is an empty chair, a customer arriving at the waiting room is assigned a chair and entered into a waiting queue.
+* A customer arriving at the waiting room is handed directly to a sleeping barber if there is one.
+* Otherwise, if there is an empty chair, the customer is assigned a chair and entered into a waiting queue.
 * If there are no empty chairs the customer leaves the barber shop without a haircut.
-* A barber that finishes cutting a customers hair checks the waiting room for a waiting customer.
+* A barber that finishes cutting a customers hair takes the next waiting customer, if there is
+  no customer waiting the barber goes to sleep until a customer is handed to it. Each barber
+  sleeps on its own bell, only the barber handed a customer is woken.
+
+Only the waiting room update is made under the lock, log lines are formatted and
+published, and statistics updated, after the lock is released. Log lines report the
+number of waiting customers, views which want the waiting customers themselves ask for
+them with *get_waiting_list()*. When metrics are enabled the time *arrive()* and
+*next_customer()* hold the lock, timed inside the lock, is recorded in *hold_times*.
 """
 
 # System imports
-from threading import Lock as Lock
+import time
+from enum import Enum
+from threading import Event, Lock
 from collections import deque
 
 # Project imports
 from SleepingBarber import Common
 from mvc import Model
+from metrics import Metrics
+from accumulators import ShardedAccumulator
 
+#: lock hold time histogram bucket upper bounds (microseconds)
+HOLD_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
 
-class CustomerWaitingError(Exception):
-    """ No customer waiting to return """
-    pass
+
+class Arrival(Enum):
+    """ What happened to a customer arriving at the waiting room """
+    Barber = 1      #: customer was handed to a sleeping barber
+    Chair = 2       #: customer was given a chair
+    NoChair = 3     #: waiting room was full
 
 
 class Borg(object):
@@ -42,8 +59,11 @@ class WaitingRoom(Borg, Model):
         utilize the same data for waiting customers
 
         * Implements a Queue (FIFO) for customers waiting for a haircut.
-        * Implements a Lock to prevent deadlock and race conditions between barbers and customers.
-        * Anyone calling a WaitingRoom function needs to obtain the lock before calling.
+        * Implements a stack of sleeping barbers, the most recently sleeping barber is woken first.
+        * Implements a bell (Event) per barber, a sleeping barber waits on its bell until a customer
+          is handed to it.
+        * WaitingRoom functions obtain the lock themselves, each holds it for a single O(1) update
+          and logs after releasing it.
     """
     def __init__(self):
         """ WaitingRoom Class Constructor
@@ -54,95 +74,191 @@ class WaitingRoom(Borg, Model):
         if self._shared_state:
             return
         Model.__init__(self, name='WaitingRoom')
-        self.lock = Lock()  #: waitingroom lock, needs to be obtained before calling WaitingRoom methods
+        self.lock = Lock()                      #: waitingroom lock
+        self.idle = []                          #: stack of sleeping barbers, may hold barbers no longer sleeping
+        self.sleeping = set()                   #: sleeping barbers
+        self.bells = {}                         #: barber -> Event, set when a customer is handed to the barber
         self.chairs = Common.ConfigData().waiting_chairs
         self.stats = Common.Statistics()        #: statistics module, used to gather simulation statistics
         self.deque = deque(maxlen=self.chairs)  #: a queue of waiting room chairs
         self.customers_waiting = 0              #: number of customers waiting
+        self.hold_times = None                  #: lock hold times (microseconds), None when not instrumented
+        self.instrument(Metrics().active)
 
     def reset(self):
         self.chairs = Common.ConfigData().waiting_chairs
         self.deque = deque(maxlen=self.chairs)
+        self.idle = []
+        self.sleeping = set()
+        self.bells = {}
         self.customers_waiting = 0
         self.stats.reset()
+        self.instrument(Metrics().active)
+
+    def instrument(self, enable=True):
+        """ Start, or stop, recording waiting room lock hold times
+
+            :param enable: True to record lock hold times in a new *hold_times* accumulator
+        """
+        self.hold_times = ShardedAccumulator(HOLD_BOUNDS) if enable else None
+
+    def arrive(self, customer):
+        """ Function called by a customer arriving at the barber shop.
 
-    def get_chair(self, customer):
-        """ Function called by a customer to get a chair in the waiting room.
-            It is assumed that the caller has obtained the WaitingRoom lock.
+            The customer is handed to the most recently sleeping barber, the barber's
+            *current_customer* is set and the customer's barber is set. Otherwise the
+            customer is given a chair if one is free.
 
-            :param customer: Customer class object of the customer needing a chair
+            :param customer: Customer class object of the arriving customer
 
-            :returns: True : Chair available, customer added to the waiting queue
-            :returns: False : No chair available
+            :returns: Arrival.Barber : Customer handed to a sleeping barber
+            :returns: Arrival.Chair : Chair available, customer added to the waiting queue
+            :returns: Arrival.NoChair : No chair available
         """
-        if len(self.deque) == self.deque.maxlen:
-            chair = False
-        else:
-            self.deque.append(customer)
-            self.customers_waiting += 1
-            chair = True
+        hold_times = self.hold_times
+        with self.lock:
+            start = time.perf_counter_ns()
+            barber = self._pop_sleeping()
+            if barber is not None:
+                barber.current_customer = customer
+                customer.set_barber(barber)
+                bell = self.bells[barber]
+                arrival = Arrival.Barber
+            elif len(self.deque) == self.deque.maxlen:
+                arrival = Arrival.NoChair
+            else:
+                self.deque.append(customer)
+                self.customers_waiting += 1
+                arrival = Arrival.Chair
+            waiting = len(self.deque)
+            held = time.perf_counter_ns() - start
+        if hold_times is not None:
+            hold_times.add(held / 1000)
+        if arrival is Arrival.Barber:
+            bell.set()      # wakes this barber alone, rung after the lock is released
+        elif arrival is Arrival.Chair:
             with self.stats.lock:
-                self.stats.max_waiters = max(self.stats.max_waiters, len(self.deque))
-        self.logger(f'get_chair [{chair}[{self.customers_waiting}][{self.get_waiting_list_ids()}]')
-        return chair
+                self.stats.max_waiters = max(self.stats.max_waiters, waiting)
+        self.logger(f'arrive [{customer.id}][{arrival.name}][{waiting}]')
+        return arrival
+
+    def _pop_sleeping(self):
+        """ Take the most recently sleeping barber, called holding the lock
+
+            Barbers which have left are skipped, each is skipped once. Barbers share the
+            simulation's cancellation token, once it is cancelled no barber is taken.
+
+            :returns: Barber class object, None if no barber is sleeping or the simulation is cancelled
+        """
+        idle = self.idle
+        while idle:
+            barber = idle[-1]
+            if barber not in self.sleeping:
+                idle.pop()
+            elif barber.cancellation.cancelled:
+                return None
+            else:
+                idle.pop()
+                self.sleeping.remove(barber)
+                return barber
+        return None
+
+    def next_customer(self, barber):
+        """ Function called by a barber who is ready to cut hair.
+
+            If no customer is waiting the barber is added to the sleeping barbers,
+            see *sleep()*.
+
+            :param barber: Barber class object of the barber
+            :returns: Customer object of the next waiting customer, None if no customer is waiting
+        """
+        hold_times = self.hold_times
+        with self.lock:
+            start = time.perf_counter_ns()
+            if self.deque:
+                customer = self.deque.popleft()
+                self.customers_waiting -= 1
+            else:
+                customer = None
+                if barber not in self.sleeping:
+                    self.sleeping.add(barber)
+                    self.idle.append(barber)
+                    bell = self.bells.get(barber)
+                    if bell is None:
+                        bell = self.bells[barber] = Event()
+                    bell.clear()
+            waiting = len(self.deque)
+            held = time.perf_counter_ns() - start
+        if hold_times is not None:
+            hold_times.add(held / 1000)
+        self.logger(f'next_customer [{customer.id if customer else None}][{waiting}]')
+        return customer
 
-    def get_customer(self):
-        """ Function called by a barber to get a customer from the waiting room.
-            It is assumed that the caller has obtained the WaitingRoom lock.
+    def wait_customer(self, barber, timeout):
+        """ Function called by a sleeping barber to wait for a customer
 
-            :returns: Customer object of the next waiting customer from the queue.
+            The wait ends early when the barber's cancellation token is cancelled, see *wake()*.
 
-            :raises: CustomerWaitingError : no customer waiting.
+            :param barber: Barber class object of a barber added to the sleeping barbers by *next_customer()*
+            :param timeout: Maximum seconds to wait
+            :returns: True if a customer was handed to the barber
         """
-        if len(self.deque) == 0:
-            raise CustomerWaitingError
-        else:
-            customer = self.deque.popleft()
-            self.customers_waiting -= 1
-        self.logger(f'get_customer [{customer.id}[{self.customers_waiting}][{self.get_waiting_list_ids()}]')
+        if not barber.cancellation.cancelled:
+            self.bells[barber].wait(timeout)
+        # set membership is read atomically, a barber is removed before its bell is rung
+        return barber not in self.sleeping
+
+    def wake(self):
+        """ Wake all sleeping barbers, e.g. when the simulation is cancelled """
+        with self.lock:
+            for barber in self.sleeping:
+                self.bells[barber].set()
+
+    def leave(self, barber):
+        """ Function called by a barber who has stopped, no more customers are handed to it
+
+            A customer handed to the barber is the barber's *current_customer* until its
+            haircut is finished. A customer handed just before the simulation was cancelled
+            may never have been served, it is returned to the barber to be stopped.
+
+            :param barber: Barber class object of the barber
+            :returns: Customer handed to the barber and never served, None if there is none
+        """
+        with self.lock:
+            self.sleeping.discard(barber)
+            customer, barber.current_customer = barber.current_customer, None
         return customer
 
     def get_waiting_list_ids(self):
-        waiting_list = []
-        for c in range(len(self.deque)):
-            waiting_list.append(self.deque[c].id)
-        return waiting_list
+        """ Returns a list of the IDs of the waiting customers """
+        return [c.id for c in self.get_waiting_list()]
 
     def get_waiting_list(self):
         """ Returns a list of the waiting customers
 
-            In general, anyone calling a WaitingRoom function needs to obtain the lock before calling.
-            This is one case where we will acquire the lock on behalf of the caller.
+            The waiting queue is copied under the lock, the copy is returned.
 
             :returns: current state of the waiting queue
         """
         with self.lock:
-            waiting_list = []
-            for c in range(len(self.deque)):
-                waiting_list.append(self.deque[c])
-            return waiting_list
+            return list(self.deque)
 
     def customer_waiting(self):
         """ Function to test if a customer is waiting.
-            It is assumed that the caller has obtained the WaitingRoom lock.
 
             :returns: True : Customer is waiting
             :returns: False : No customer is waiting
         """
-        if len(self.deque) > 0:
-            self.logger('customer_waiting [TRUE]')
-            return True
-        else:
-            self.logger('customer_waiting [FALSE]')
-            return False
+        with self.lock:
+            return len(self.deque) > 0
 
     def full(self):
         """ Function to return state of waitingroom
-            It is assumed that the caller has obtained the WaitingRoom lock.
 
             :returns: True if waitingroom is full
         """
-        return len(self.deque) == self.deque.maxlen
+        with self.lock:
+            return len(self.deque) == self.deque.maxlen
 
     def update(self, event):
         """ Called by views or controllers to tell us to update
@@ -11,7 +11,6 @@ The main module contains:
 
 # System imports
 import time
-import threading
 
 # Project imports
 import mvc
@@ -26,6 +25,9 @@ from SleepingBarber.Customer import Events as CustomerEvents
 from SleepingBarber.CustomerGen import CustomerGenerator
 from SleepingBarber.WaitingRoom import WaitingRoom
 
+#: quantiles of the customer waiting time and waiting room lock hold time summaries
+QUANTILES = (0.5, 0.9, 0.99)
+
 
 class Borg(object):
     """ The Borg class ensures that all instantiations refer to the same state and behavior. """
@@ -47,7 +49,7 @@ class SleepingBarber(mvc.Model):
     """ Main SleepingBarber(s) Class """
 
     def __init__(self, exit_when_done=None):
-        super().__init__('Barbers', thread=threading.Thread(name='Barbers', target=self.run))
+        super().__init__('Barbers', target=self.run)
 
         #: simulation configuration data
         self.config = ConfigData()
@@ -103,15 +105,13 @@ class SleepingBarber(mvc.Model):
         for id_ in range(self.config.barbers):
             barber = Barber(id_)
             self.barbers.append(barber)
-            for vk in self.views.keys():
-                barber.register(self.views[vk])
+            barber.adopt(self)
 
-    def register(self, view):
-        self.views[view.name] = view
-        for b in self.barbers:
-            b.register(view)
-        if self.cg is not None:
-            self.cg.register(view)
+    def children(self):
+        """ Simulation actors, which share our views and router topic """
+        if self.cg is None:
+            return list(self.barbers)
+        return self.barbers + [self.cg]
 
     def update(self, event):
         """ Called by Views and/or Controller to alert us to an event """
@@ -131,6 +131,7 @@ class SleepingBarber(mvc.Model):
             self.logger('[{}]: {}'.format(event['class'], event['text']))
             self.set_stopping()
             self.cg.set_stopping()
+            self.cancellation.cancel()
         elif event['event'] is self.mvc_events.events[self.name][mvc.Event.Events.PAUSE]['event']:
             self.logger('[{}]: {}'.format(event['class'], event['text']))
             self.set_pause()
@@ -187,12 +188,16 @@ class SleepingBarber(mvc.Model):
         first_time = True
         while not done:
 
+            # A new cancellation token for this simulation, adopted by barbers, customer generator and customers
+            self.cancellation = mvc.Cancellation()
+
             # Instantiate the waiting room
             # nb: barbers and customers require a newly instantiated waiting room
             if self.waiting_room is None:
                 self.waiting_room = WaitingRoom()
             else:
                 self.waiting_room.reset()
+            self.cancellation.on_cancel(self.waiting_room.wake)
 
             # Instantiate and initialize all barbers
             self.create_barbers(first_time=first_time)
@@ -203,20 +208,19 @@ class SleepingBarber(mvc.Model):
                 self.cg.cleanup()
                 del self.cg
             self.cg = CustomerGenerator(self.config.customer_rate, self.config.customer_variance, self.barbers)
-            for v in self.views.keys():
-                self.cg.register(self.views[v])
+            self.cg.adopt(self)
 
             # Reset simulation components
             self.statistics.reset()
 
             # Wait for simulation to start running
             while not self.running:
-                time.sleep(Defines.Times.Starting)
+                Defines.sleep(Defines.Times.Starting)
 
             # Start the simulation, i.e. start all barbers and the customer generator
             for b in self.barbers:
                 b.running = True
-                b.event(BarberEvents.EvStart)
+                b.post_event(BarberEvents.EvStart)
 
             # Start the customer generator
             self.cg.thread.start()
@@ -224,8 +228,9 @@ class SleepingBarber(mvc.Model):
 
             # Wait for the simulation to complete
             for loop in range(self.config.simulation_loops):
-                # Sleep for 1 loop iteration time slot
-                time.sleep(Defines.Times.LoopTime)
+                # Sleep for 1 loop iteration time slot, the simulation ends if cancelled
+                if self.sleep(Defines.Times.LoopTime):
+                    break
                 # Bump loop count and notify
                 loop += 1
                 self.notify(self.mvc_events.events[self.name][mvc.Event.Events.LOOPS], data=loop)
@@ -236,23 +241,26 @@ class SleepingBarber(mvc.Model):
                 if self.running is False:
                     break
 
-            # Stop the customer generator
+            # Stop the customer generator and cancel the simulation,
+            # simulated time now passes without delay so haircuts in progress finish at once
             self.cg.running = False
+            self.cancellation.cancel()
+
+            # Join the customer generator, no customers arrive after this
+            self.join_thread(self.cg.thread)
 
             # Tell the barber(s) to stop
             for barber in self.barbers:
-                barber.event(BarberEvents.EvStop)
+                barber.post_event(BarberEvents.EvStop)
 
             # Tell any waiting customers to stop
-            for c in self.cg.customer_list:
+            for c in list(self.cg.customer_list):
                 c.post_event(CustomerEvents.EvStop)
 
             # Wait for barber(s) to stop
-            for barber in self.barbers:
-                if barber.running:
-                    self.logger(f'Waiting for {barber.name}')
-                    while barber.running:
-                        time.sleep(1)
+            self.logger('Waiting for barbers')
+            for barber in mvc.wait(self.barbers, timeout=Defines.Times.Stopping):
+                self.logger(f'{barber.name} has not stopped')
 
             # Joining threads
             self.notify(self.mvc_events.events[self.name][mvc.Event.Events.JOINING])
@@ -264,8 +272,7 @@ class SleepingBarber(mvc.Model):
             if barbers:
                 self.logger('Failure joining barber threads')
 
-            # Cleanup and Join customer generator
-            self.join_thread(self.cg.thread)
+            # Cleanup customer generator
             self.cg.cleanup()
             del self.cg
             self.cg = None
@@ -283,6 +290,30 @@ class SleepingBarber(mvc.Model):
                 self.set_stopping()
                 done = True
 
+    def metrics(self):
+        """ Metrics collector, reads the pre-aggregated simulation statistics without locking
+
+            :returns: List of metric families
+        """
+        s = self.statistics
+        waiting = s.customers_waiting.peek()
+        families = [
+            ('barber_customers', 'gauge', 'Customers who finished in the simulation', [({}, waiting.count)]),
+            ('barber_lost_customers', 'gauge', 'Customers lost due to a full waiting room', [({}, s.lost_customers)]),
+            ('barber_max_waiters', 'gauge', 'Maximum number of customers waiting', [({}, s.max_waiters)]),
+            ('barber_barbers', 'gauge', 'Barbers in the simulation', [({}, len(s.barbers))]),
+            ('barber_customer_waiting_seconds', 'summary', 'Customer waiting time',
+             [({}, waiting.total)], [({}, waiting.count)],
+             [({'quantile': q}, waiting.percentile(q) or 0) for q in QUANTILES]),
+        ]
+        room = self.waiting_room
+        if room is not None and room.hold_times is not None:
+            hold = room.hold_times.peek()
+            families.append(('barber_waiting_room_lock_hold_microseconds', 'summary', 'Waiting room lock hold time',
+                             [({}, hold.total)], [({}, hold.count)],
+                             [({'quantile': q}, hold.percentile(q) or 0) for q in QUANTILES]))
+        return families
+
 
 if __name__ == '__main__':
     """ Execute main code if run from the command line """
@@ -7,13 +7,15 @@ This is the main processing for The State Engine Crank aka *The Crank*
 Processing consists of the following steps:
 
     #. Configuration file processing
-    #. Instantiate some support classes (File, Uml, Error)
-    #. Process input source files.
-    #. Based on input source file type (Python or Ansi-C):
+    #. Process input source files, each in its own processing context (CrankContext),
+       one at a time or, in batch mode (*--jobs N*), on a pool of worker processes
+    #. Skip files which are up to date in the cache (CrankCache), with *--cache* or *--cache-dir*
+    #. Based on input source file type (Python or Ansi-C) the context instantiates:
 
-        * Instantiate signature scanner
-        * Instantiate code scanner
-        * Instantiate code generator
+        * File buffer and UML parser
+        * Signature scanner
+        * Code scanner
+        * Code generator
 
     #. Read source file into memory for processing
     #. Scan for PlantUML
@@ -39,19 +41,10 @@ logging.basicConfig(level=logging.DEBUG, format='%(message)s')
 logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 
 # Project imports
+import modules.Cache as Cache                       # noqa e408
 import modules.Config as Config                     # noqa e408
-
-import modules.ansi_c.Signature as c_Sig            # noqa e408
-import modules.ansi_c.CodeGeneration as c_CodeGen   # noqa e408
-import modules.ansi_c.CodeScan as c_CodeScan        # noqa e408
-
-import modules.python.Signature as py_Sig           # noqa e408
-import modules.python.CodeGeneration as py_CodeGen  # noqa e408
-import modules.python.CodeScan as py_CodeScan       # noqa e408
-
-import modules.ErrorHandling as Error           # noqa e408
-import modules.FileSupport as File              # noqa e408
-import modules.UMLParse as Uml                  # noqa e408
+import modules.Context as Context                   # noqa e408
+import modules.ErrorHandling as Error               # noqa e408
 
 # =========================================================
 #  DEBUG *** DEBUG *** DEBUG *** DEBUG *** DEBUG *** DEBUG
@@ -73,9 +66,7 @@ if __name__ == '__main__':
 
     # instantiate configuration first to parse command line and configuration file
     config = Config.TheConfig()
-    files = File.File()
-    uml = Uml.UML()
-    err = Error.Error()
+    status = 1      # exit status, 0 once every input file is processed without failure
 
     # =========================================================================
     # the big try for all of our processing
@@ -85,67 +76,46 @@ if __name__ == '__main__':
         num_files = len(input_files)
         if num_files == 0:
             logging.info('Nothing to do: no input files')
+            status = 0
             exit()
 
         # display invocation information
         logging.debug('Begin execution: %s' % __name__)
         logging.debug('Processing %s input files' % num_files)
 
+        # files unchanged since they were last brought up to date are skipped
+        cache = Cache.CrankCache(config.cache_dir) if config.cache_dir is not None else None
+
+        # =====================================================================
+        # batch mode, process all input files on a process pool
+        #   a file which fails is reported, the remaining files are still processed
+        if config.jobs > 1:
+            logging.info('Batch mode: %s input files, %s jobs' % (num_files, config.jobs))
+            level = logging.DEBUG if config.debug else logging.WARNING
+            results = Context.process_files(input_files, config.jobs, level, cache)
+            for input_file, updated, error in results:
+                if error is not None:
+                    logging.critical('%s: %s' % (input_file, error))
+                else:
+                    logging.info('%s: %s' % (input_file, 'updated' if updated else 'unchanged'))
+            failed = sum(1 for result in results if result[2] is not None)
+            logging.info('Processed %s files: %s updated, %s failed' %
+                         (len(results), sum(1 for result in results if result[1]), failed))
+
         # =====================================================================
         # process all input files
-        for input_file in input_files:
-            logging.debug('Input file: %s' % input_file)
-
-            if files.file_type(input_file) is files.FileType.c:
-                sig = c_Sig.Signature()
-                scan = c_CodeScan.CodeScan()
-                gen = c_CodeGen.CodeGen()
-            elif files.file_type(input_file) is files.FileType.py:
-                sig = py_Sig.Signature()
-                scan = py_CodeScan.CodeScan()
-                gen = py_CodeGen.CodeGen()
-            else:
-                err.file_type_error(input_file)
-
-            # read source file into memory
-            files.open(input_file)
-            files.read()
-            files.close()
-
-            # scan for UML and parse
-            # initialize UML module before parsing
-            uml.init()
-            if uml.find_start_plant_uml() is False:
-                logging.debug('UML Start NOT FOUND: Ignoring')
-                continue
-            if uml.find_end_plant_uml() is False:
-                logging.debug('UML End NOT FOUND: Ignoring')
-                continue
-            if uml.parse_plant_uml() is False:
-                exit()
-
-            # scan for StateEngineCrank signatures
-            # Note:
-            #    We either find ALL of the signatures or we find NONE of the signatures.
-            #    If we only find SOME of the signatures then something is BROKEN.
-            #    If the signatures are NOT found then we create them
-            if sig.find_signatures() is False:
-                sig.create_signatures()
-
-            # Scan and create list of current user state functions
-            scan.scan_code()
-
-            # Signatures (now) exist so update code based on current UML
-            gen.update_code()
-
-            # Process files if any state machine changes were detected
-            #    If the file changed then backup (rename) the original/
-            #    And write the updated contents.
-            if files.compare_files() is False:
-                files.backup(input_file)
-                files.update(input_file)
-
-            uml.dump_uml()
+        #   processing stops at the first file which fails
+        else:
+            failed = 0
+            for input_file in input_files:
+                logging.debug('Input file: %s' % input_file)
+                if cache is not None and cache.fresh(input_file):
+                    logging.info('Up to date: %s' % input_file)
+                    continue
+                Context.CrankContext(input_file).process()
+                if cache is not None:
+                    cache.store(input_file)
+        status = 1 if failed else 0
 
     # =========================================================================
     except Error.UnimplementedCodeError as e:
@@ -174,4 +144,4 @@ if __name__ == '__main__':
         # exit processing and cleanup
         # =========================================================
         logging.info('Execution complete ... exiting ...')
-        exit(0)
+        exit(status)
@@ -0,0 +1,129 @@
+""" StateEngineCrank.modules.Cache
+
+Content hash cache for StateEngineCrank
+
+The crank records each file it has brought up to date, a later run skips a file
+whose key is unchanged without reading, parsing or regenerating it. The key of a
+file is the hash of:
+
+* the file content
+* the file's @startuml .. @enduml block
+* the crank version, *Defines.VERSION* and a digest of the crank's own source,
+  so a changed crank regenerates every file
+
+The cache is opt-in, enabled with *--cache* or *--cache-dir* (see *Config*). It is a
+directory holding an entry per source file, entries are written atomically so batch
+mode workers never contend.
+
+Usage::
+
+    cache = CrankCache('.crank-cache')
+    if not cache.fresh(filename):
+        CrankContext(filename).process()
+        cache.store(filename)
+"""
+# System imports
+import logging
+logging.debug('Loading modules: %s as %s' % (__file__, __name__))
+
+import hashlib      # noqa e408
+import json         # noqa e408
+import os           # noqa e408
+import threading    # noqa e408
+
+# Project imports
+import modules.Defines as Defines   # noqa e408
+
+# =========================================================================
+def crank_version():
+    """ Version of the crank, *Defines.VERSION* and a digest of the crank source files
+
+        :returns: Version string
+    """
+    crank = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for directory, dirs, files in os.walk(crank):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                with open(os.path.join(directory, name), 'rb') as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+    return '%s-%s' % (Defines.VERSION, digest.hexdigest()[:16])
+
+
+# =========================================================================
+def uml_block(text):
+    """ Extract the PlantUML block from source text
+
+        :param text: source file text
+        :returns: text from @startuml to @enduml, '' if there is no UML
+    """
+    start = text.find('@startuml')
+    if start < 0:
+        return ''
+    end = text.find('@enduml', start)
+    return text[start:] if end < 0 else text[start:end + len('@enduml')]
+
+
+class CrankCache(object):
+    """ Persistent record of the files the crank has brought up to date """
+
+    # =========================================================================
+    def __init__(self, directory):
+        """ CrankCache Class Constructor
+
+            :param directory: cache directory, created when the first entry is stored
+        """
+        self.directory = directory          #: cache directory
+        self.version = crank_version()      #: crank version, part of every key
+
+    # =========================================================================
+    def key(self, filename):
+        """ Cache key of a file
+
+            :param filename: source file
+            :returns: key, the hash of the file content, its UML block and the crank version
+        """
+        with open(filename, 'rb') as f:
+            content = f.read()
+        uml = uml_block(content.decode('utf-8', errors='replace'))
+        parts = [self.version, hashlib.sha256(content).hexdigest(), hashlib.sha256(uml.encode()).hexdigest()]
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+    # =========================================================================
+    def entry(self, filename):
+        """ Cache entry file of a source file
+
+            :param filename: source file
+            :returns: path of the entry file
+        """
+        name = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()
+        return os.path.join(self.directory, name + '.json')
+
+    # =========================================================================
+    def fresh(self, filename):
+        """ Check if a file is up to date, unchanged since it was stored
+
+            :param filename: source file
+            :returns: True if the file may be skipped
+        """
+        try:
+            with open(self.entry(filename), 'r') as f:
+                stored = json.load(f)
+            return stored.get('key') == self.key(filename)
+        except (OSError, ValueError):
+            return False
+
+    # =========================================================================
+    def store(self, filename):
+        """ Record a file as up to date, called after the file has been processed
+
+            :param filename: source file
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self.entry(filename)
+        temp = '%s.%s.%s.tmp' % (entry, os.getpid(), threading.get_ident())
+        with open(temp, 'w') as f:
+            json.dump({'file': os.path.abspath(filename), 'key': self.key(filename)}, f)
+        os.replace(temp, entry)
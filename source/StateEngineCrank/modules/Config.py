@@ -16,6 +16,9 @@ import configparser     # noqa 408
 import modules.Defines as Defines       # noqa 408
 import modules.ErrorHandling as Error   # noqa 408
 
+#: cache directory used with --cache, see *Cache.CrankCache*
+DEFAULT_CACHE_DIR = '.crank-cache'
+
 
 class Borg(object):
     """ The Borg class ensures that all instantiations refer to the same
@@ -48,6 +51,8 @@ class TheConfig(Borg):
         self.quiet = False      #: True - enable quiet execution
         self.version = False    #: True - display version information
         self.files = []         #: List of files to process
+        self.jobs = 1           #: Number of files processed in parallel
+        self.cache_dir = None   #: Cache directory, None if the cache is disabled
 
         self.cmd = ArgParser()  #: parse command line first first, may override config file
         self.cfg = CfgParser()  #: parse configuration file last
@@ -59,6 +64,8 @@ class TheConfig(Borg):
         self.version = self.cmd.version or self.cfg.version
         self.files.extend(self.cfg.files)
         self.files.extend(self.cmd.files)
+        self.jobs = self.cmd.jobs
+        self.cache_dir = self.cmd.cache_dir
         logging.debug('files: %s' % self.files)
 
 
@@ -72,6 +79,9 @@ class ArgParser(argparse.ArgumentParser):
         * -d, --debug : enables debug output
         * -V, --version : displays program version
         * -c, --config : optional configuration file to process
+        * -j, --jobs : number of files processed in parallel (batch mode)
+        * --cache : skip files which are up to date in the cache, kept in .crank-cache
+        * --cache-dir : skip files which are up to date in the cache, kept in this directory
         * file1 [file2 ... filen] : list of files to process
     """
 
@@ -92,6 +102,14 @@ class ArgParser(argparse.ArgumentParser):
         # configuration file is optional
         parser.add_argument('-c', '--config',  nargs='?', help='optional configuration file')
 
+        # batch mode, files are processed on a pool of worker processes
+        parser.add_argument('-j', '--jobs', type=int, default=1, help='number of files processed in parallel')
+
+        # optionally, files unchanged since they were last brought up to date are skipped
+        parser.add_argument('--cache', action='store_true',
+                            help='skip files which are up to date in the cache, kept in %s' % DEFAULT_CACHE_DIR)
+        parser.add_argument('--cache-dir', help='skip files which are up to date in the cache, kept in this directory')
+
         # gather up the rest of the command line as file to process
         parser.add_argument('files', nargs='*', help='list of files to process')
 
@@ -100,8 +118,16 @@ class ArgParser(argparse.ArgumentParser):
         self.debug = False
         self.version = False
         self.files = []
+        self.jobs = 1
+        self.cache_dir = None
 
         self.args = parser.parse_args()
+        self.files = self.args.files
+        self.jobs = max(self.args.jobs, 1)
+        if self.args.cache_dir is not None:
+            self.cache_dir = self.args.cache_dir
+        elif self.args.cache:
+            self.cache_dir = DEFAULT_CACHE_DIR
         if hasattr(self.args, 'verbose'):
             self.verbose = self.args.verbose
         if hasattr(self.args, 'quiet'):
@@ -111,9 +137,9 @@ class ArgParser(argparse.ArgumentParser):
 
         # if user specifies a configuration file then update
         # TheConfig.config_file for config file parsing
-        if hasattr(self.args, 'config'):
-            # cfg = TheConfig()
-            TheConfig.config_file = self.args.config
+        if self.args.config is not None:
+            cfg = TheConfig()
+            cfg.config_file = self.args.config
 
 
 class CfgParser(configparser.ConfigParser):
@@ -143,13 +169,14 @@ class CfgParser(configparser.ConfigParser):
             :raises: ConfigFileError
         """
         super().__init__()
-        # cfg = TheConfig()
+        cfg = TheConfig()
         self.error = Error.Error()
-        self.config_file = TheConfig.config_file
+        self.config_file = cfg.config_file
         self.config = configparser.ConfigParser()
+        # the default configuration file is optional, one given with -c must exist
         if os.path.isfile(self.config_file):
             self.config.read(self.config_file)
-        else:
+        elif self.config_file != Defines.DEFAULT_CONFIG_FILE:
             raise self.error.config_file_missing_error(self.config_file)
 
         self.verbose = False
@@ -0,0 +1,204 @@
+""" StateEngineCrank.modules.Context
+
+Per-file processing context for StateEngineCrank
+
+A *CrankContext* holds everything the crank knows about a single source file:
+the file buffer, the UML model, the signatures, the code scan results and the
+code generator which updates the file. The support classes are created by the
+context and reach their collaborators through it, nothing is shared between
+contexts. Files may be processed concurrently, in threads or processes, and the
+crank may be embedded in a long lived tool without state leaking between files.
+
+Usage::
+
+    context = CrankContext('DiningPhilosophers/main.py')
+    context.process()
+
+Batch mode processes many files on a pool of worker processes, a file which fails
+is reported and does not stop the others. Files which are up to date in the cache
+(see *CrankCache*) are skipped::
+
+    for filename, updated, error in process_files(filenames, jobs=8, cache=CrankCache()):
+        ...
+"""
+# System imports
+import logging
+logging.debug('Loading modules: %s as %s' % (__file__, __name__))
+
+from concurrent.futures import ProcessPoolExecutor   # noqa e408
+import functools                                    # noqa e408
+
+# Project imports
+import modules.ansi_c.Signature as c_Sig            # noqa e408
+import modules.ansi_c.CodeGeneration as c_CodeGen   # noqa e408
+import modules.ansi_c.CodeScan as c_CodeScan        # noqa e408
+
+import modules.python.Signature as py_Sig           # noqa e408
+import modules.python.CodeGeneration as py_CodeGen  # noqa e408
+import modules.python.CodeScan as py_CodeScan       # noqa e408
+
+import modules.ErrorHandling as Error           # noqa e408
+import modules.FileSupport as File              # noqa e408
+import modules.UMLParse as Uml                  # noqa e408
+
+
+class CrankContext(object):
+    """ Processing context of a single source file """
+
+    #: file type -> (signature, code scan, code generation) classes
+    LANGUAGES = {
+        File.File.FileType.c: (c_Sig.Signature, c_CodeScan.CodeScan, c_CodeGen.CodeGen),
+        File.File.FileType.py: (py_Sig.Signature, py_CodeScan.CodeScan, py_CodeGen.CodeGen),
+    }
+
+    # =========================================================================
+    def __init__(self, filename):
+        """ CrankContext Class Constructor
+
+            :param filename: source file to process
+            :raises: Exception if the file type is not supported
+        """
+        self.filename = filename            #: source file being processed
+        self.error = Error.Error()
+        file_type = File.File.file_type(filename)
+        if file_type not in self.LANGUAGES:
+            self.error.file_type_error(filename)
+        signature, code_scan, code_gen = self.LANGUAGES[file_type]
+
+        # collaborators are created in dependency order, each refers to those created before it
+        self.file = File.File()             #: file buffer
+        self.uml = Uml.UML(self)            #: UML model
+        self.sig = signature(self)          #: signatures
+        self.scan = code_scan(self)         #: code scan results
+        self.gen = code_gen(self)           #: code generator
+        logging.debug('CrankContext ID: %s %s' % (id(self), filename))
+
+    # =========================================================================
+    def process(self):
+        """ Process the source file
+
+            #. Read source file into memory for processing
+            #. Scan for and parse PlantUML
+            #. Scan for State Engine Crank :term:`signatures`, create them if not found
+            #. Scan for existing user state functions
+            #. Update code based on current PlantUML
+            #. Backup and write the source file if changed
+
+            :returns: True if the source file was updated
+            :raises: UMLParseError if the UML could not be parsed
+        """
+        # read source file into memory
+        self.file.open(self.filename)
+        self.file.read()
+        self.file.close()
+
+        # scan for UML and parse
+        # initialize UML module before parsing
+        self.uml.init()
+        if self.uml.find_start_plant_uml() is False:
+            logging.debug('UML Start NOT FOUND: Ignoring')
+            return False
+        if self.uml.find_end_plant_uml() is False:
+            logging.debug('UML End NOT FOUND: Ignoring')
+            return False
+        if self.uml.parse_plant_uml() is False:
+            self.error.uml_statemachine_not_found()
+
+        # scan for StateEngineCrank signatures
+        # Note:
+        #    We either find ALL of the signatures or we find NONE of the signatures.
+        #    If we only find SOME of the signatures then something is BROKEN.
+        #    If the signatures are NOT found then we create them
+        if self.sig.find_signatures() is False:
+            self.sig.create_signatures()
+
+        # Scan and create list of current user state functions
+        self.scan.scan_code()
+
+        # Signatures (now) exist so update code based on current UML
+        self.gen.update_code()
+
+        # Process files if any state machine changes were detected
+        #    If the file changed then backup (rename) the original/
+        #    And write the updated contents.
+        updated = self.file.compare_files() is False
+        if updated:
+            self.file.backup(self.filename)
+            self.file.update(self.filename)
+
+        self.uml.dump_uml()
+        return updated
+
+
+#: crank errors and their descriptions, most specific first
+ERRORS = (
+    (Error.UnimplementedCodeError, 'Unimplemented code encountered'),
+    (Error.SourceFileError, 'Error processing source file'),
+    (Error.UMLParseError, 'Error parsing UML'),
+    (Error.SignatureError, 'Error processing signatures'),
+    (Error.ScanCodeError, 'Error scanning user state functions'),
+    (Error.UpdateCodeError, 'Error updating code'),
+    (Error.FileBackupError, 'Error processing file updates'),
+    (Error.FileWriteError, 'Error writing file'),
+)
+
+
+# =========================================================================
+def describe(exception):
+    """ Describe an error raised while processing a file
+
+        :param exception: Exception raised
+        :returns: Description of the error
+    """
+    for error, text in ERRORS:
+        if isinstance(exception, error):
+            return '%s --> %s' % (text, exception)
+    return 'Uncategorized error encountered --> %r' % exception
+
+
+# =========================================================================
+def process_file(filename, cache=None):
+    """ Process a source file in its own context, errors are reported rather than raised
+
+        :param filename: source file to process
+        :param cache: CrankCache, None to process the file even if it is up to date
+        :returns: Tuple of (filename, True if the file was updated, error description or None)
+    """
+    try:
+        if cache is not None and cache.fresh(filename):
+            logging.debug('Up to date: %s' % filename)
+            return filename, False, None
+        updated = CrankContext(filename).process()
+        if cache is not None:
+            cache.store(filename)
+        return filename, updated, None
+    except Exception as e:
+        return filename, False, describe(e)
+
+
+# =========================================================================
+def _worker_init(level):
+    """ Batch mode worker process initialization
+
+        :param level: logging level of the worker
+    """
+    logging.getLogger().setLevel(level)
+
+
+# =========================================================================
+def process_files(filenames, jobs, level=logging.WARNING, cache=None):
+    """ Process source files on a pool of worker processes (batch mode)
+
+        Each file is processed in its own context by *process_file()*, a file named
+        more than once is processed once.
+
+        :param filenames: source files to process
+        :param jobs: number of worker processes
+        :param level: logging level of the worker processes
+        :param cache: CrankCache, None to process files even if they are up to date
+        :returns: List of (filename, updated, error) tuples, in file order
+    """
+    filenames = list(dict.fromkeys(filenames))
+    chunksize = max(1, len(filenames) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init, initargs=(level,)) as pool:
+        return list(pool.map(functools.partial(process_file, cache=cache), filenames, chunksize=chunksize))
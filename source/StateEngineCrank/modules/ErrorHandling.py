@@ -223,6 +223,17 @@ class Error(Borg):
         logging.fatal('ERROR: Invalid UML: start=%s end=%s' % (start, end))
         raise UMLParseError
 
+    # =========================================================================
+    @staticmethod
+    def invalid_uml(text):
+        """ UML line not recognized - display message and punt
+
+            :param text: UML line
+            :raises: UMLParseError(text)
+        """
+        logging.fatal('ERROR: Invalid UML: %s' % text)
+        raise UMLParseError(text)
+
     # =========================================================================
     @staticmethod
     def file_index_error(index):
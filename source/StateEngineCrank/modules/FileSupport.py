@@ -10,12 +10,13 @@ import re               # noqa 408
 import shutil           # noqa 408
 
 import modules.ErrorHandling    # noqa 408
-import modules.Singleton        # noqa 408
 
 
-class File(modules.Singleton.Singleton):
+class File(object):
     """ File support for StateEngineCrank
         (open, read, write, close, etc...)
+
+        Holds the in-memory copy of a single source file, see *CrankContext*.
     """
 
     EOF = -1    #: end of file reached
@@ -8,6 +8,8 @@ import time
 import queue
 import mvc
 import Defines
+from metrics import Metrics
+from StateEngineCrank.modules.StateBoard import StateBoard
 
 
 class Borg(object):
@@ -98,8 +100,11 @@ class StateMachine(mvc.Model):
 
     def cleanup(self):
         """ Do some cleanup """
-        self.sm_events.events.unregister_actor(actor_name=self.name)
-        self.mvc_events.unregister_actor(actor_name=self.name)
+        self.unregister_actor()
+        StateBoard().detach(self.board)
+        self.board = None
+        Metrics().retire(self.metrics)
+        self.metrics = None
 
     def __init__(self, sm_id=None, name=None, startup_state=None,
                  function_table=None, transition_table=None, **kwargs):
@@ -117,9 +122,9 @@ class StateMachine(mvc.Model):
         self.id = sm_id
         self.name = name
         self.sm_events = StateMachineEvent()
-        self.sm_events.events.register_actor(class_name=self.sm_events.class_name, actor_name=self.name)
         self.mvc_events = mvc.Event()
-        self.mvc_events.register_actor(class_name='mvc', actor_name=self.name)
+        self.registered = False     #: True while our name is registered as an actor
+        self.register_actor()
         self.startup_state = startup_state
         self.state_function_table = function_table
         self.state_transition_table = transition_table
@@ -127,12 +132,65 @@ class StateMachine(mvc.Model):
         self.current_state = startup_state
         self.enter_func = function_table[startup_state]['enter']
         self.do_func = function_table[startup_state]['do']
+        self.board = StateBoard().attach(sm_id)     #: state board slot, None if the board is inactive
+        if self.board is not None:
+            self.board.publish(startup_state)
+        self.metrics = Metrics().machine(type(self).__name__, startup_state)   #: counters, None if not enabled
         self.logger('StateMachine thread start')
 
         # optional start if there is a thread to start
         if self.thread is not None:
             self.start()
 
+    def register_actor(self):
+        """ Register our name as an actor posting events, see *unregister_actor()* """
+        self.sm_events.events.register_actor(class_name=self.sm_events.class_name, actor_name=self.name)
+        self.mvc_events.register_actor(class_name='mvc', actor_name=self.name)
+        self.registered = True
+
+    def unregister_actor(self):
+        """ Unregister our name as an actor, e.g. when a state machine kept for reuse finishes
+
+            *reset()* registers the state machine again.
+        """
+        self.sm_events.events.unregister_actor(actor_name=self.name)
+        self.mvc_events.unregister_actor(actor_name=self.name)
+        self.registered = False
+
+    def reset(self, sm_id=None, name=None):
+        """ Return the state machine to its startup state so it can be run again
+
+            The state board slot and metrics counters are kept, reusing a state machine
+            avoids the cost of creating a new one. A state machine which was unregistered,
+            or is renamed, is registered under its name.
+
+            :param sm_id: new state machine ID, None to keep the current ID
+            :param name: new state machine name, None to keep the current name
+        """
+        if name is not None and name != self.name:
+            if self.registered:
+                self.unregister_actor()
+            self.name = name
+        if not self.registered:
+            self.register_actor()
+        if sm_id is not None:
+            self.id = sm_id
+        self.starting = True
+        self.running = False
+        self.stopping = False
+        self.pause = False
+        self._step_event.clear()
+        self._stop_event.clear()
+        self.event_queue = queue.Queue()
+        self.current_state = self.startup_state
+        self.enter_func = self.state_function_table[self.startup_state]['enter']
+        self.do_func = self.state_function_table[self.startup_state]['do']
+        if self.board is not None:
+            self.board.reset(self.id)
+            self.board.publish(self.startup_state)
+        if self.metrics is not None:
+            self.metrics.state = self.startup_state
+
     def run(self):
         """ Function to run the state machine.
 
@@ -142,7 +200,9 @@ class StateMachine(mvc.Model):
         # wait until our state machine has been activated
         self.logger(f'StateMachine activating [{self.current_state}]')
         while not self.running:
-            time.sleep(Defines.Times.Starting)
+            if self.sleep(Defines.Times.Starting):
+                self.logger(f'StateMachine cancelled [{self.current_state}]')
+                return
         self.logger(f'StateMachine activated [{self.current_state}]')
 
         # check for an enter function
@@ -169,6 +229,16 @@ class StateMachine(mvc.Model):
             self.do_func(self)
         time.sleep(Defines.Times.Do)
 
+    def guard(self, guard_func):
+        """ Call a transition **guard** function, timing it when metrics are enabled
+
+            :param guard_func: guard function to call
+            :returns: guard function result
+        """
+        if self.metrics is None:
+            return guard_func(self)
+        return self.metrics.guard(guard_func, self)
+
     def post_event(self, event):
         """ Posts **event** to the state machine event queue
 
@@ -191,6 +261,10 @@ class StateMachine(mvc.Model):
         """
         if event is None:
             return
+        if self.board is not None:
+            self.board.publish(self.current_state, event, self.event_queue.qsize())
+        if self.metrics is not None:
+            self.metrics.event(self.event_queue.qsize())
 
         # notify any who are registered with us for events
         text = '%s %s [%s]' % (self.name, event, self.current_state)
@@ -218,7 +292,7 @@ class StateMachine(mvc.Model):
                 text = '%s %s [%s]' % (self.name, event, self.current_state)
                 self.notify(self.sm_events.events.post(class_name='SM', actor_name=self.name, user_id=self.id,
                                                        event=StateMachineEvent.SmEvents.GUARD_FUNCTION, text=text))
-                if not guard_func(self):
+                if not self.guard(guard_func):
                     self.notify(self.sm_events.events.post(class_name='SM', actor_name=self.name, user_id=self.id,
                                                            event=StateMachineEvent.SmEvents.GUARD_FALSE, text=text))
                     return
@@ -234,7 +308,7 @@ class StateMachine(mvc.Model):
                 if guard_func is not None:
                     self.notify(self.sm_events.events.post(class_name='SM', actor_name=self.name, user_id=self.id,
                                                            event=StateMachineEvent.SmEvents.GUARD_FUNCTION, text=text))
-                    if guard_func(self):
+                    if self.guard(guard_func):
                         transition = trans
                         self.notify(self.sm_events.events.post(class_name='SM', actor_name=self.name, user_id=self.id,
                                                                event=StateMachineEvent.SmEvents.GUARD_TRUE, text=text))
@@ -273,6 +347,10 @@ class StateMachine(mvc.Model):
 
         # Enter next state
         self.current_state = transition['state2']
+        if self.board is not None:
+            self.board.publish(self.current_state, queue_depth=self.event_queue.qsize(), transition=True)
+        if self.metrics is not None:
+            self.metrics.transition(self.current_state)
         text = '%s %s [%s]' % (self.name, event, self.current_state)
         self.notify(self.sm_events.events.post(class_name='SM', actor_name=self.name, user_id=self.id,
                                                event=StateMachineEvent.SmEvents.STATE_TRANSITION, text=text,
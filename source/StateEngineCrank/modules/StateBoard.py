@@ -0,0 +1,296 @@
+""" StateEngineCrank.modules.StateBoard
+
+Shared memory live state board.
+
+Every running state machine publishes its current state, last event, transition counter and
+event queue depth into a slot of a :mod:`multiprocessing.shared_memory` block. Monitors (in this
+or any other process) take lock free snapshots of the board without receiving any MVC notifications.
+
+The board is inactive unless it has been created, in which case state machines do not publish.
+
+Board layout, all fields are signed 64 bit integers::
+
+    header: magic, version, slots, high_water, reserved[4]
+    slot:   seq, sm_id, state, last_event, transitions, queue_depth, updated_ns, active
+
+Each slot is written by a single writer, the thread running the state machine, and is protected
+by a sequence lock. The writer makes *seq* odd before updating a slot and even again afterwards.
+A reader retries a slot whenever it sees an odd *seq* or *seq* changed while the slot was copied.
+
+Usage::
+
+    board = StateBoard()
+    board.create(name='crank-board', slots=1024)    # before the state machines are created
+    [...]
+    reader = StateBoardReader('crank-board')        # any process
+    for slot in reader.snapshot():
+        print(slot['sm_id'], slot['state'], slot['transitions'])
+"""
+
+# System imports
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+#: board identification
+MAGIC = 0x4352414E4B5342     # 'CRANKSB'
+VERSION = 1
+
+#: number of int64 fields in the header and in each slot
+HEADER_FIELDS = 8
+SLOT_FIELDS = 8
+FIELD_SIZE = 8
+
+#: slot field names, in board order
+FIELDS = ['seq', 'sm_id', 'state', 'last_event', 'transitions', 'queue_depth', 'updated_ns', 'active']
+SEQ, SM_ID, STATE, LAST_EVENT, TRANSITIONS, QUEUE_DEPTH, UPDATED_NS, ACTIVE = range(SLOT_FIELDS)
+
+#: value published for a field with no value (e.g. no event processed yet)
+NONE = -1
+
+#: number of times a reader retries a slot being written before giving up on it
+READ_RETRIES = 100
+
+
+class Borg(object):
+    """ The Borg class ensures that all instantiations refer to the same state and behavior. """
+
+    _shared_state = {}
+
+    def __init__(self):
+        self.__dict__ = self._shared_state
+
+
+def value(item):
+    """ Convert a state, event or id to the integer published on the board
+
+        :param item: Enum, integer or None
+        :returns: integer value
+    """
+    if item is None:
+        return NONE
+    if isinstance(item, int):
+        return item
+    item = getattr(item, 'value', None)
+    return item if isinstance(item, int) else NONE
+
+
+class BoardSlot(object):
+    """ A state machine's slot on the state board """
+
+    def __init__(self, fields, index, sm_id):
+        """ BoardSlot Class Constructor
+
+            :param fields: int64 memoryview of the board
+            :param index: Slot index
+            :param sm_id: State machine ID
+        """
+        self.fields = fields
+        self.index = index
+        self.base = HEADER_FIELDS + index * SLOT_FIELDS
+        self.reset(sm_id)
+
+    def reset(self, sm_id):
+        """ Reuse the slot for a state machine starting again
+
+            :param sm_id: State machine ID
+        """
+        fields = self.fields
+        self.transitions = 0
+        self.last_event = NONE
+        fields[self.base + SEQ] += 1
+        fields[self.base + SM_ID] = value(sm_id)
+        fields[self.base + STATE] = NONE
+        fields[self.base + LAST_EVENT] = NONE
+        fields[self.base + TRANSITIONS] = 0
+        fields[self.base + QUEUE_DEPTH] = 0
+        fields[self.base + UPDATED_NS] = time.time_ns()
+        fields[self.base + ACTIVE] = 1
+        fields[self.base + SEQ] += 1
+
+    def publish(self, state, event=None, queue_depth=0, transition=False):
+        """ Publish state machine status
+
+            :param state: Current state
+            :param event: Event being processed, None if unchanged
+            :param queue_depth: Number of events waiting in the state machine event queue
+            :param transition: True if a state transition was taken
+        """
+        fields = self.fields
+        base = self.base
+        if event is not None:
+            self.last_event = value(event)
+        if transition:
+            self.transitions += 1
+        fields[base + SEQ] += 1
+        fields[base + STATE] = value(state)
+        fields[base + LAST_EVENT] = self.last_event
+        fields[base + TRANSITIONS] = self.transitions
+        fields[base + QUEUE_DEPTH] = queue_depth
+        fields[base + UPDATED_NS] = time.time_ns()
+        fields[base + SEQ] += 1
+
+
+class StateBoard(Borg):
+    """ Shared memory state board, owned by the process running the state machines """
+
+    def __init__(self):
+        Borg.__init__(self)
+        if self._shared_state:
+            return
+        self.shm = None         #: shared memory block, None while the board is inactive
+        self.fields = None      #: int64 view of the shared memory block
+        self.slots = 0          #: number of slots on the board
+        self.free = []          #: free slot indices, lowest index allocated first
+        self.lock = threading.Lock()
+
+    def create(self, name=None, slots=1024):
+        """ Create and activate the state board
+
+            :param name: Shared memory block name, generated when not given
+            :param slots: Maximum number of state machines
+            :returns: Shared memory block name
+        """
+        with self.lock:
+            if self.shm is not None:
+                return self.shm.name
+            size = (HEADER_FIELDS + slots * SLOT_FIELDS) * FIELD_SIZE
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.fields = self.shm.buf.cast('q')
+            for i in range(len(self.fields)):
+                self.fields[i] = 0
+            self.fields[0] = MAGIC
+            self.fields[1] = VERSION
+            self.fields[2] = slots
+            self.slots = slots
+            self.free = list(range(slots - 1, -1, -1))
+            return self.shm.name
+
+    def close(self):
+        """ Deactivate the state board and release the shared memory block """
+        with self.lock:
+            if self.shm is None:
+                return
+            self.fields.release()
+            self.fields = None
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass    # already unlinked, e.g. by an outside tool
+            self.shm = None
+            self.free = []
+
+    def attach(self, sm_id=None):
+        """ Allocate a board slot for a state machine
+
+            :param sm_id: State machine ID
+            :returns: BoardSlot, None if the board is inactive or full
+        """
+        if self.shm is None:
+            return None
+        with self.lock:
+            if not self.free:
+                return None
+            index = self.free.pop()
+            if index >= self.fields[3]:
+                self.fields[3] = index + 1
+            return BoardSlot(self.fields, index, sm_id)
+
+    def detach(self, slot):
+        """ Release a state machine's board slot
+
+            :param slot: BoardSlot returned by attach()
+        """
+        if slot is None or self.shm is None:
+            return
+        with self.lock:
+            self.fields[slot.base + SEQ] += 1
+            self.fields[slot.base + ACTIVE] = 0
+            self.fields[slot.base + SEQ] += 1
+            self.free.append(slot.index)
+
+
+class StateBoardReader(object):
+    """ Lock free reader of a state board, usable from any process """
+
+    def __init__(self, name):
+        """ StateBoardReader Class Constructor
+
+            The board belongs to its owner, a reader never unlinks it. Before Python 3.13 attaching
+            registers the block with this process's resource tracker, which unlinks it when the
+            process exits, so a reader in another process unregisters it. POSIX block names are
+            tracked with a leading '/' which *SharedMemory.name* leaves out, Windows has no tracker.
+
+            :param name: Shared memory block name
+            :raises: ValueError if the block is not a state board
+        """
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            owner = StateBoard().shm
+            if os.name == 'posix' and (owner is None or owner.name != self.shm.name):
+                resource_tracker.unregister('/' + self.shm.name, 'shared_memory')
+        self.fields = self.shm.buf.cast('q')
+        if self.fields[0] != MAGIC or self.fields[1] != VERSION:
+            self.close()
+            raise ValueError('%s is not a state board' % name)
+        self.slots = self.fields[2]
+
+    def close(self):
+        """ Detach from the shared memory block """
+        self.fields.release()
+        self.shm.close()
+
+    def read(self, index):
+        """ Take a consistent copy of a board slot
+
+            :param index: Slot index
+            :returns: List of slot field values, None if the slot could not be read
+        """
+        fields = self.fields
+        base = HEADER_FIELDS + index * SLOT_FIELDS
+        for _ in range(READ_RETRIES):
+            seq = fields[base + SEQ]
+            if seq & 1:
+                continue
+            copy = fields[base:base + SLOT_FIELDS].tolist()
+            if fields[base + SEQ] == seq:
+                return copy
+        return None
+
+    def snapshot(self):
+        """ Take a snapshot of all active board slots
+
+            :returns: List of slot dictionaries, keyed by FIELDS plus 'slot'
+        """
+        active = []
+        for index in range(min(self.fields[3], self.slots)):
+            copy = self.read(index)
+            if copy is None or not copy[ACTIVE]:
+                continue
+            slot = dict(zip(FIELDS, copy))
+            slot['slot'] = index
+            active.append(slot)
+        return active
+
+
+if __name__ == '__main__':
+    """ Poll a state board from the command line """
+    import argparse
+    parser = argparse.ArgumentParser(description='StateEngineCrank state board monitor.')
+    parser.add_argument('name', help='shared memory block name')
+    parser.add_argument('--hz', type=float, default=1.0, help='snapshots per second')
+    args = parser.parse_args()
+    reader = StateBoardReader(args.name)
+    try:
+        while True:
+            for s in reader.snapshot():
+                print('slot {slot:5d} sm {sm_id:5d} state {state:4d} event {last_event:4d} '
+                      'transitions {transitions:8d} queue {queue_depth:4d}'.format(**s))
+            print()
+            time.sleep(1.0 / args.hz)
+    except KeyboardInterrupt:
+        reader.close()
@@ -88,11 +88,9 @@ logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 
 # Project imports
 import modules.ErrorHandling  # noqa 408
-import modules.FileSupport  # noqa 408
-import modules.Singleton  # noqa 408
 
 
-class UML(modules.Singleton.Singleton):
+class UML(object):
     """
         **Overview**
 
@@ -158,10 +156,14 @@ class UML(modules.Singleton.Singleton):
     FINAL_STATE_LABEL = 'FinalState'
 
     # =========================================================================
-    def __init__(self):
+    def __init__(self, context):
+        """ UML Class Constructor
+
+            :param context: CrankContext of the file being processed
+        """
         self.error = modules.ErrorHandling.Error()  #: establish error handling (errors)
         self.warn = modules.ErrorHandling.Warn()    #: establish error handling (warnings)
-        self.file = modules.FileSupport.File()      #: establish file handling
+        self.file = context.file                    #: file being processed
 
         self.seqid = -1             #: used during debug as a sequence ID for UML lines read
         self.uml_start_index = -1   #: source file index of uml start
@@ -511,7 +513,6 @@ class UML(modules.Singleton.Singleton):
             logging.debug('UML start/end: %s/%s' % (self.uml_start_index, self.uml_end_index))
         else:
             self.error.invalid_start_end(self.uml_start_index, self.uml_end_index)
-            exit()
 
         return found_status
 
@@ -798,5 +799,5 @@ class UML(modules.Singleton.Singleton):
         # failed to find a Match
         if len(text) > 0:
             logging.debug('FAILURE: %s' % text)
-            exit(1)
+            self.error.invalid_uml(text)
         return False
@@ -9,11 +9,7 @@ import logging
 logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 
 # Project specific imports
-import modules.ansi_c.CodeScan  # noqa 408
 import modules.ErrorHandling  # noqa 408
-import modules.FileSupport  # noqa 408
-import modules.ansi_c.Signature  # noqa 408
-import modules.UMLParse  # noqa 408
 
 
 class CodeGen(object):
@@ -135,9 +131,6 @@ class CodeGen(object):
     STATE_TAG = '{STATE_TAG}'
     EVT_HANDLER_CURSTATE_TEMPLATE = 'SET_CURRENT_STATE(id, {STATE_TAG});'
 
-    MissingPrototypes = []  # list of prototypes missing in source file
-    MissingFunctions = []   # list of functions missing in source file
-
     VOID_FUNC_TAG = '{VOID_FUNC_TAG}'
     VOID_FUNC_PROTO_TEMPLATE = 'static void {VOID_FUNC_TAG}(int id);'
     VOID_FUNC_HEADER_TEMPLATE = ['/**', ' * @todo FIXME', ' */']
@@ -153,14 +146,19 @@ class CodeGen(object):
     re_hook = re.compile(r'(?P<hook>[a-zA-Z_]+[a-zA-Z0-9_]*)')
 
     # =========================================================================
-    def __init__(self):
-        """ CodeGeneration module initialization. """
+    def __init__(self, context):
+        """ CodeGeneration module initialization.
+
+            :param context: CrankContext of the file being processed
+        """
         logging.debug('CodeGeneration ID: %s' % id(self))
-        self.code = modules.ansi_c.CodeScan.CodeScan()
+        self.code = context.scan
         self.error = modules.ErrorHandling.Error()
-        self.file = modules.FileSupport.File()
-        self.sig = modules.ansi_c.Signature.Signature()
-        self.uml = modules.UMLParse.UML()
+        self.file = context.file
+        self.sig = context.sig
+        self.uml = context.uml
+        self.MissingPrototypes = []     # list of prototypes missing in source file
+        self.MissingFunctions = []      # list of functions missing in source file
         self.current_line = 0
 
     # =========================================================================
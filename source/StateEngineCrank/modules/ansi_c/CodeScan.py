@@ -12,12 +12,9 @@ logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 import re                       # noqa 408
 
 import modules.ErrorHandling  # noqa 408
-import modules.FileSupport  # noqa 408
-import modules.ansi_c.Signature  # noqa 408
-import modules.Singleton  # noqa 408
 
 
-class CodeScan(modules.Singleton.Singleton):
+class CodeScan(object):
     """ Code Scanning for StateEngineCrank
         The purpose of this module is to scan code source files and
         generate a list of function prototypes and function instantiations.
@@ -28,20 +25,24 @@ class CodeScan(modules.Singleton.Singleton):
     # static BOOL guardName (int id);
     re_func_proto = re.compile(r'static void (?P<funcName>[a-zA-Z_]+[a-zA-Z0-9_]*)\(int id\);')
     re_guard_proto = re.compile(r'static BOOL_TYPE (?P<guardName>[a-zA-Z_]+[a-zA-Z0-9_]*)\(int id\);')
-    prototypes = []     # array of function prototypes found
 
     # Regular Expression - function declaration
     # static void funcName (int id)
     # static BOOL guardName (int id)
     re_func_declaration = re.compile(r'static void (?P<funcName>[a-zA-Z_]+[a-zA-Z0-9_]*)\(int id\)')
     re_guard_declaration = re.compile(r'static BOOL_TYPE (?P<guardName>[a-zA-Z_]+[a-zA-Z0-9_]*)\(int id\)')
-    functions = []      # array of functions found
 
     # =========================================================================
-    def __init__(self):
+    def __init__(self, context):
+        """ CodeScan Class Constructor
+
+            :param context: CrankContext of the file being processed
+        """
         self.error = modules.ErrorHandling.Error()
-        self.file = modules.FileSupport.File()
-        self.sig = modules.ansi_c.Signature.Signature()
+        self.file = context.file
+        self.sig = context.sig
+        self.prototypes = []    # array of function prototypes found
+        self.functions = []     # array of functions found
         logging.debug('CodeScan ID: %s' % id(self))
 
     # =========================================================================
@@ -8,11 +8,7 @@ import logging
 logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 
 # Project specific imports
-import modules.python.CodeScan   # noqa 408
 import modules.ErrorHandling  # noqa 408
-import modules.FileSupport  # noqa 408
-import modules.python.Signature  # noqa 408
-import modules.UMLParse  # noqa 408
 
 
 class CodeGen(object):
@@ -130,17 +126,19 @@ class CodeGen(object):
         '        return',
     ]
 
-    MissingFunctions = []   # list of functions missing in source file
-
     # =========================================================================
-    def __init__(self):
-        """ CodeGeneration module initialization. """
+    def __init__(self, context):
+        """ CodeGeneration module initialization.
+
+            :param context: CrankContext of the file being processed
+        """
         logging.debug('CodeGeneration ID: %s' % id(self))
-        self.code = modules.python.CodeScan.CodeScan()
+        self.code = context.scan
         self.error = modules.ErrorHandling.Error()
-        self.file = modules.FileSupport.File()
-        self.sig = modules.python.Signature.Signature()
-        self.uml = modules.UMLParse.UML()
+        self.file = context.file
+        self.sig = context.sig
+        self.uml = context.uml
+        self.MissingFunctions = []  # list of functions missing in source file
         self.current_line = 0
         self.user_code_start = 0
         self.user_code_end = 0
@@ -12,12 +12,9 @@ logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 import re                       # noqa 408
 
 import modules.ErrorHandling  # noqa 408
-import modules.FileSupport  # noqa 408
-import modules.python.Signature  # noqa 408
-import modules.Singleton  # noqa 408
 
 
-class CodeScan(modules.Singleton.Singleton):
+class CodeScan(object):
     """ Code Scanning for StateEngineCrank
         The purpose of this module is to scan code source files and
         generate a list of functions defined
@@ -28,13 +25,17 @@ class CodeScan(modules.Singleton.Singleton):
     #   def guard_guardName(id)
     re_func_declaration = re.compile(r'def (?P<funcName>[a-zA-Z_]+[a-zA-Z0-9_]*)\(self\)')
     re_guard_declaration = re.compile(r'def (?P<guardName>guard_[a-zA-Z_]+[a-zA-Z0-9_]*)\(self\)')
-    functions = []      # array of functions found
 
     # =========================================================================
-    def __init__(self):
+    def __init__(self, context):
+        """ CodeScan Class Constructor
+
+            :param context: CrankContext of the file being processed
+        """
         self.error = modules.ErrorHandling.Error()
-        self.file = modules.FileSupport.File()
-        self.sig = modules.python.Signature.Signature()
+        self.file = context.file
+        self.sig = context.sig
+        self.functions = []     # array of functions found
         logging.debug('CodeScan ID: %s' % id(self))
 
     # =========================================================================
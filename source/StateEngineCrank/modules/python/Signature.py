@@ -9,12 +9,10 @@ import logging
 logging.debug('Loading modules: %s as %s' % (__file__, __name__))
 
 import modules.ErrorHandling  # noqa 408
-import modules.FileSupport  # noqa 408
-import modules.Singleton  # noqa 408
 
 
 # =========================================================================
-class Signature(modules.Singleton.Singleton):
+class Signature(object):
     """
     Class for processing StateEngineCrank signatures in user source code.
     """
@@ -45,7 +43,11 @@ class Signature(modules.Singleton.Singleton):
     USER_CODE_END = ' USER STATE CODE = END '
 
     # =========================================================================
-    def __init__(self):
+    def __init__(self, context):
+        """ Signature Class Constructor
+
+            :param context: CrankContext of the file being processed
+        """
         # instantiate local instances of global support
         self.signatures = {}            # a dictionary of all signatures
         self.lines = []                 # each signature has '3' lines
@@ -54,7 +56,7 @@ class Signature(modules.Singleton.Singleton):
         self.lines.append(None)
 
         self.err = modules.ErrorHandling.Error()
-        self.file = modules.FileSupport.File()
+        self.file = context.file
 
         self.lines[0] = self.SIGNATURE_LINE_DELIM + \
                         "".join(self.SIGNATURE_LINE_CHAR for _ in range(self.SIGNATURE_LINE_NUM_CHARS))     # noqa e127
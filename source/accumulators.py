@@ -0,0 +1,176 @@
+""" StateEngineCrank Accumulators
+
+Online statistics, constant memory however many values are recorded.
+
+* Accumulator - count, total, mean and variance (Welford), min/max and a fixed bucket
+  histogram giving percentile estimates
+* ShardedAccumulator - an accumulator per recording thread, merged when read, so
+  recording threads never contend with each other. Monitors (e.g. metrics collectors)
+  peek without taking any locks, so they never contend with recording threads either
+
+Example::
+
+    waiting = ShardedAccumulator()
+    waiting.add(12)                 # from any thread
+    summary = waiting.snapshot()    # merged Accumulator
+    estimate = waiting.peek()       # merged Accumulator, without locking
+    summary.mean, summary.percentile(0.99)
+"""
+
+# System imports
+import bisect
+import math
+import threading
+
+#: default histogram bucket upper bounds (seconds), values above the last bound go in an overflow bucket
+BOUNDS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1800, 3600)
+
+
+class Accumulator(object):
+    """ Online statistics of a series of values """
+
+    def __init__(self, bounds=BOUNDS):
+        """ Accumulator Class Constructor
+
+            :param bounds: Ascending histogram bucket upper bounds
+        """
+        self.bounds = bounds                        #: histogram bucket upper bounds
+        self.buckets = [0] * (len(bounds) + 1)      #: histogram bucket counts, last is the overflow bucket
+        self.count = 0                              #: number of values
+        self.total = 0                              #: sum of values
+        self.mean = 0.0                             #: mean of values
+        self.m2 = 0.0                               #: sum of squared differences from the mean
+        self.min = None                             #: smallest value
+        self.max = None                             #: largest value
+
+    def add(self, value):
+        """ Record a value
+
+            :param value: Value to record
+        """
+        # min and max first, an unlocked reader seeing a count always sees them set
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+
+    def merge(self, other):
+        """ Merge another accumulator into this one (Chan et al. parallel variance)
+
+            Accumulators without values, or caught before their first value is complete,
+            are skipped.
+
+            :param other: Accumulator with the same bucket bounds
+            :returns: self
+        """
+        if not other.count or other.min is None:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        return self
+
+    @property
+    def variance(self):
+        """ Sample variance, 0.0 with fewer than 2 values """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        """ Sample standard deviation """
+        return math.sqrt(self.variance)
+
+    def percentile(self, fraction):
+        """ Estimate a percentile from the histogram
+
+            The value is interpolated within the bucket holding the requested rank
+            and is always within [min, max].
+
+            :param fraction: Percentile as a fraction (e.g. 0.99)
+            :returns: Estimated value, None if there are no values
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                low = self.bounds[i - 1] if i else self.min
+                high = self.bounds[i] if i < len(self.bounds) else self.max
+                low, high = max(low, self.min), min(high, self.max)
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+class ShardedAccumulator(object):
+    """ Accumulator with a shard per recording thread
+
+        Each thread records into its own shard, a shard lock is only contended by readers.
+        Reading merges all shards.
+    """
+
+    def __init__(self, bounds=BOUNDS):
+        """ ShardedAccumulator Class Constructor
+
+            :param bounds: Ascending histogram bucket upper bounds
+        """
+        self.bounds = bounds                    #: histogram bucket upper bounds
+        self.shards = []                        #: (lock, Accumulator) for each recording thread
+        self.shards_lock = threading.Lock()     #: protects *shards*
+        self.local = threading.local()          #: this thread's shard
+
+    def _shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = (threading.Lock(), Accumulator(self.bounds))
+            with self.shards_lock:
+                self.shards.append(shard)
+        return shard
+
+    def add(self, value):
+        """ Record a value in this thread's shard
+
+            :param value: Value to record
+        """
+        lock, accumulator = self._shard()
+        with lock:
+            accumulator.add(value)
+
+    def snapshot(self):
+        """ Merge all shards
+
+            :returns: Accumulator holding all values recorded so far
+        """
+        merged = Accumulator(self.bounds)
+        with self.shards_lock:
+            shards = list(self.shards)
+        for lock, accumulator in shards:
+            with lock:
+                merged.merge(accumulator)
+        return merged
+
+    def peek(self):
+        """ Merge all shards without taking any locks
+
+            Shards are read while their threads record, a value being recorded may be
+            partly counted. For monitoring, recording threads are never blocked.
+
+            :returns: Accumulator holding about all values recorded so far
+        """
+        merged = Accumulator(self.bounds)
+        for _, accumulator in tuple(self.shards):
+            merged.merge(accumulator)
+        return merged
@@ -0,0 +1,192 @@
+""" StateEngineCrank Distributions
+
+Seeded generators of simulation times, e.g. customer inter-arrival times and haircut times.
+
+* Exponential - exponentially distributed times, the inter-arrival times of a Poisson process
+* Uniform - uniformly distributed times
+* Empirical - times drawn from a list of observed times
+
+Every generator draws from its own seeded random number generator so a simulation run
+with the same seed draws the same times. Times are drawn in batches, from a NumPy
+*Generator* when NumPy is installed otherwise from a *random.Random*, and handed out
+one at a time. The two produce different (but each reproducible) sequences.
+
+Distributions are described as text, e.g. in configuration data or on a command line::
+
+    exponential:5           mean of 5
+    uniform:3:7             between 3 and 7
+    empirical:2,3,3,8       one of 2, 3, 3 or 8
+
+Example::
+
+    arrivals = create('exponential:5', seed=derive(42, 'arrivals'), integer=True)
+    arrivals.draw()
+"""
+
+# System imports
+import random
+import threading
+import zlib
+from abc import ABC, abstractmethod
+
+# Optional imports
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#: number of times drawn at once
+BATCH = 1024
+
+
+def derive(seed, name):
+    """ Derive the seed of a named generator from a simulation seed
+
+        Each generator of a simulation draws an independent sequence which does not
+        depend on the order generators are created or used in.
+
+        :param seed: Simulation seed, None for an unseeded generator
+        :param name: Name of the generator, e.g. 'arrivals'
+        :returns: Seed of the generator, None if *seed* is None
+    """
+    if seed is None:
+        return None
+    return (seed << 32) | zlib.crc32(name.encode())
+
+
+class Distribution(ABC):
+    """ Base class of a seeded, batched time generator """
+
+    def __init__(self, seed=None, integer=False):
+        """ Distribution Class Constructor
+
+            :param seed: Random number generator seed, None for an unseeded generator
+            :param integer: True to draw whole numbers of seconds
+        """
+        self.seed = seed            #: random number generator seed
+        self.integer = integer      #: True if times are rounded to whole seconds
+        self.rng = numpy.random.default_rng(seed) if numpy is not None else random.Random(seed)
+        self.batch = []             #: times drawn but not yet handed out
+        self.index = 0              #: next time in *batch* to hand out
+        self.lock = threading.Lock()
+
+    def draw(self):
+        """ Returns the next time """
+        with self.lock:
+            if self.index == len(self.batch):
+                self.batch = self.sample(BATCH)
+                self.index = 0
+            value = self.batch[self.index]
+            self.index += 1
+        return value
+
+    def sample(self, count):
+        """ Draw a batch of times
+
+            :param count: Number of times to draw
+            :returns: List of times
+        """
+        if numpy is not None:
+            values = self.sample_numpy(count)
+            return (numpy.rint(values).astype(int) if self.integer else values).tolist()
+        values = [self.sample_python() for _ in range(count)]
+        return [int(round(v)) for v in values] if self.integer else values
+
+    @abstractmethod
+    def sample_numpy(self, count):
+        """ Draw a batch of times from the NumPy generator, returns an array """
+        pass
+
+    @abstractmethod
+    def sample_python(self):
+        """ Draw a single time from the Python generator """
+        pass
+
+
+class Exponential(Distribution):
+    """ Exponentially distributed times """
+
+    def __init__(self, mean, **kwargs):
+        """ Exponential Class Constructor
+
+            :param mean: Mean time
+        """
+        if mean <= 0:
+            raise ValueError('exponential mean must be positive: %s' % mean)
+        super().__init__(**kwargs)
+        self.mean = mean
+
+    def sample_numpy(self, count):
+        return self.rng.exponential(self.mean, count)
+
+    def sample_python(self):
+        return self.rng.expovariate(1 / self.mean)
+
+
+class Uniform(Distribution):
+    """ Uniformly distributed times, inclusive of both bounds when drawing whole seconds """
+
+    def __init__(self, minimum, maximum, **kwargs):
+        """ Uniform Class Constructor
+
+            :param minimum: Minimum time
+            :param maximum: Maximum time
+        """
+        if minimum > maximum:
+            raise ValueError('uniform minimum exceeds maximum: %s:%s' % (minimum, maximum))
+        super().__init__(**kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def sample_numpy(self, count):
+        if self.integer:
+            return self.rng.integers(round(self.minimum), round(self.maximum) + 1, count)
+        return self.rng.uniform(self.minimum, self.maximum, count)
+
+    def sample_python(self):
+        if self.integer:
+            return self.rng.randint(round(self.minimum), round(self.maximum))
+        return self.rng.uniform(self.minimum, self.maximum)
+
+
+class Empirical(Distribution):
+    """ Times drawn, with replacement, from observed times """
+
+    def __init__(self, values, **kwargs):
+        """ Empirical Class Constructor
+
+            :param values: Observed times
+        """
+        if not values:
+            raise ValueError('empirical distribution has no values')
+        super().__init__(**kwargs)
+        self.values = list(values)
+
+    def sample_numpy(self, count):
+        return self.rng.choice(self.values, count)
+
+    def sample_python(self):
+        return self.rng.choice(self.values)
+
+
+def create(text, seed=None, integer=False):
+    """ Create a generator from its description
+
+        :param text: Distribution description, e.g. 'exponential:5', 'uniform:3:7' or 'empirical:2,3,3,8'
+        :param seed: Random number generator seed, None for an unseeded generator
+        :param integer: True to draw whole numbers of seconds
+        :returns: Distribution
+        :raises: ValueError if the description is not valid
+    """
+    name, _, args = text.partition(':')
+    try:
+        if name == 'exponential':
+            return Exponential(float(args), seed=seed, integer=integer)
+        if name == 'uniform':
+            minimum, maximum = (float(v) for v in args.split(':'))
+            return Uniform(minimum, maximum, seed=seed, integer=integer)
+        if name == 'empirical':
+            return Empirical([float(v) for v in args.split(',')], seed=seed, integer=integer)
+    except ValueError as e:
+        raise ValueError('%s: %s' % (text, e))
+    raise ValueError('unknown distribution: %s, choose from exponential, uniform or empirical' % text)
@@ -3,9 +3,6 @@
 # System imports
 import copy
 import threading
-from tkinter import *
-from tkinter import ttk
-import tkinter.font as tkFont
 
 import enum
 import time
@@ -15,6 +12,7 @@ import math
 import Defines
 import mvc
 import exceptions
+import render
 from StateEngineCrank.modules.PyState import StateMachineEvent as smEvent
 from DiningPhilosophers.main import WaiterEvents as WaiterEvents
 from DiningPhilosophers.main import Events as diningEvents
@@ -33,7 +31,7 @@ class AniButtonType(enum.Enum):
     START, STOP, STEP, PAUSE, RESUME = range(5)
 
 
-class AniButton(ttk.Button):
+class AniButton(object):
 
     def __init__(self, button_id, button_frame, button_text, button_handler):
         """ Animation Button Class
@@ -43,31 +41,110 @@ class AniButton(ttk.Button):
             :param button_text: Button text
             :param button_handler: Handler for button press events
         """
+        from tkinter import ttk
         self.button_id = button_id
         self.button_frame = button_frame
         self.button_text = button_text
         self.button_handler = button_handler
-        ttk.Button.__init__(self, self.button_frame, text=self.button_text, command=self.button_handler)
-        self.pack(expand=0, side=LEFT)
+        self.button = ttk.Button(self.button_frame, text=self.button_text, command=self.button_handler)
+        self.button.pack(expand=0, side='left')
         self.disable()
 
     def enable(self):
-        self.config(state=NORMAL)
+        self.button.config(state='normal')
 
     def disable(self):
-        self.config(state=DISABLED)
+        self.button.config(state='disabled')
 
 
 class Animation(mvc.View):
     """ Common definition of a GUI Animation View """
 
-    def __init__(self, root=None, mainframe=None, config=None, common=None, parent=None):
+    def __init__(self, root=None, mainframe=None, config=None, common=None, parent=None, backend=None):
+        """ Animation Class Constructor
+
+            :param root: Tk root, None with a headless backend
+            :param mainframe: Tk frame holding the animations, None with a headless backend
+            :param config: Animation configuration
+            :param common: Configuration common to all animations
+            :param parent: Parent view
+            :param backend: Render backend, a Tk canvas backend is created when not given
+        """
         mvc.View.__init__(self, name=('Animation[%s]' % config['model']), parent=parent)
         self.root = root
         self.mainframe = mainframe
         self.config = config
         self.common = common
 
+        # Create the animation frames and canvas, unless we have been given a (headless) backend
+        if backend is None:
+            self._create_frames()
+            backend = render.TkBackend(self.root, self.ani_canvas)
+        self.canvas = backend   #: render backend all animation graphics are drawn with
+
+        #: persistent canvas items, allocated on first use and updated in place
+        #: item key -> [canvas item id, coordinates, options]
+        self.items = {}
+
+        # Draw outer walls
+        self.draw_outer_walls(self.common['wall.thickness'], self.common['wall.color'])
+
+        # Calculate the center of the animation canvas
+        self.ani_center = (self.common['animation']['width']/2, self.common['animation']['height']/2)
+        self.canvas_x_mid, self.canvas_y_mid = self.ani_center
+
+        # Calculate the animation canvas iteration counter location
+        self.counter_x = 40
+        self.counter_y = self.common['animation']['height'] - 20
+        self.draw_counter(0)
+
+        # --------------------------------------------------------
+        # Frame-coalesced rendering
+        # Model events record the latest drawing for each item in the dirty table,
+        # the render loop applies them once per frame in the Tk thread.
+        # --------------------------------------------------------
+        self.dirty = {}                         #: item key -> (draw function, args), latest per item
+        self.dirty_lock = threading.Lock()      #: serializes access to the dirty table
+        self.frame_ms = int(1000 / self.common['fps'])
+        self.canvas.after(self.frame_ms, self.render)
+
+        # Buttons and console, a headless backend has no buttons and an in-memory console
+        self.ani_buttons = {}
+        if self.canvas.widgets:
+            self._create_buttons()
+            self._create_console()
+        else:
+            self.ani_console_text = render.ConsoleBuffer()
+
+        # --------------------------------------------------------
+        # Stuff some introductory text into the text display
+        # --------------------------------------------------------
+        self.ani_console_text.insert('2.0', config['console.text'])
+        self.ani_console_text.insert('end', '\n\n')
+
+        # --------------------------------------------------------
+        # Animation Button Events
+        # --------------------------------------------------------
+        self.mvc_events = mvc.Event()
+        try:
+            self.mvc_events.register_class(config['event.class'])
+        except exceptions.ClassAlreadyRegistered:
+            pass
+        self.mvc_events.register_actor(config['event.class'], self.name)
+        self.button_events = [
+            mvc.Event.Events.START,
+            mvc.Event.Events.STOP,
+            mvc.Event.Events.STEP,
+            mvc.Event.Events.PAUSE,
+            mvc.Event.Events.RESUME
+        ]
+        for event_ in self.button_events:
+            self.mvc_events.register_event(config['event.class'], event=event_, event_type='view', text=event_.name)
+
+    def _create_frames(self):
+        """ Create the Tk frames and canvas for this animation """
+        import tkinter as tk
+        from tkinter import ttk
         # Configure our column in mainframe
         self.ani_frame_column = self.config['column']
         self.mainframe.grid_columnconfigure(self.config['column'], weight=1)
@@ -76,7 +153,7 @@ class Animation(mvc.View):
         # Top level frame for this simulation
         # ani_frame lives in a column of the mainframe
         # --------------------------------------------------------
-        self.ani_frame = ttk.LabelFrame(self.mainframe, text=config['title'], padding='4 4 4 4')
+        self.ani_frame = ttk.LabelFrame(self.mainframe, text=self.config['title'], padding='4 4 4 4')
         self.ani_frame['relief'] = 'raised'
         self.ani_frame['borderwidth'] = 4
         # row=0, top-most row of the animation frame
@@ -92,31 +169,21 @@ class Animation(mvc.View):
         self.ani_graphics_frame.pack()
 
         # Define a canvas where animation graphics can be drawn
-        self.ani_canvas = Canvas(self.ani_graphics_frame,
-                                 width=self.common['animation']['width'],
-                                 height=self.common['animation']['height'])
+        self.ani_canvas = tk.Canvas(self.ani_graphics_frame,
+                                    width=self.common['animation']['width'],
+                                    height=self.common['animation']['height'])
         self.ani_canvas.pack()
 
-        # Draw outer walls
-        self.draw_outer_walls(self.common['wall.thickness'], self.common['wall.color'])
-
-        # Calculate the center of the animation canvas
-        self.ani_center = (self.common['animation']['width']/2, self.common['animation']['height']/2)
-        self.canvas_x_mid, self.canvas_y_mid = self.ani_center
-
-        # Calculate the animation canvas iteration counter location
-        self.counter_x = 40
-        self.counter_y = self.common['animation']['height'] - 20
-        self.counter_id = None
-        self.draw_counter(0)
-
+    def _create_buttons(self):
+        """ Create the animation control buttons """
+        from tkinter import ttk
         # --------------------------------------------------------
         # Buttons and controls start a new frame
         # --------------------------------------------------------
         self.ani_buttons_frame = ttk.Frame(self.ani_graphics_frame, padding="4 4 4 4")
         self.ani_buttons_frame['relief'] = 'raised'
         self.ani_buttons_frame['borderwidth'] = 4
-        self.ani_buttons_frame.pack(expand=0, fill=X, side=LEFT)
+        self.ani_buttons_frame.pack(expand=0, fill='x', side='left')
         self.ani_buttons = {
             AniButtonType.START: AniButton(AniButtonType.START, self.ani_buttons_frame, 'Start', self._button_start),
             AniButtonType.STOP: AniButton(AniButtonType.STOP, self.ani_buttons_frame, 'Stop', self._button_stop),
@@ -125,6 +192,11 @@ class Animation(mvc.View):
             AniButtonType.RESUME: AniButton(AniButtonType.RESUME, self.ani_buttons_frame, 'Resume', self._button_resume),
         }
 
+    def _create_console(self):
+        """ Create the console text widget """
+        import tkinter as tk
+        import tkinter.font as tkFont
+        from tkinter import ttk
         # --------------------------------------------------------------------------------------
         # Console for text and logging output starts a new frame
         # Organized as a frame within a frame to properly position the textbox and scrollbars.
@@ -138,7 +210,7 @@ class Animation(mvc.View):
         self.ani_console_frame = ttk.LabelFrame(self.ani_frame,
                                                 text='Console Log',
                                                 padding="4 4 4 4")
-        self.ani_console_frame.pack(expand=1, fill=BOTH)
+        self.ani_console_frame.pack(expand=1, fill='both')
         self.ani_console_frame['relief'] = 'raised'
         self.ani_console_frame['borderwidth'] = 4
 
@@ -147,52 +219,27 @@ class Animation(mvc.View):
         # --------------------------------------------------------
         # parent is ani_console_frame
         self.ani_console_vframe = ttk.Frame(self.ani_console_frame)
-        self.ani_console_vframe.pack(expand=1, fill=BOTH)
+        self.ani_console_vframe.pack(expand=1, fill='both')
         self.ani_console_font = tkFont.Font(family='Courier')
         self.ani_console_font.configure(size=8)
-        self.ani_console_text = Text(self.ani_console_vframe,
-                                     font=self.ani_console_font,
-                                     wrap=NONE,
-                                     height=self.common['console']['height'],
-                                     width=self.common['console']['width'])
-        self.ani_console_text.pack(side='left', expand=1, fill=BOTH)
+        self.ani_console_text = tk.Text(self.ani_console_vframe,
+                                        font=self.ani_console_font,
+                                        wrap='none',
+                                        height=self.common['console']['height'],
+                                        width=self.common['console']['width'])
+        self.ani_console_text.pack(side='left', expand=1, fill='both')
         # parent is ani_console_vframe
-        self.ani_console_vscrollbar = Scrollbar(self.ani_console_vframe, orient="vertical",
-                                                command=self.ani_console_text.yview)
+        self.ani_console_vscrollbar = tk.Scrollbar(self.ani_console_vframe, orient="vertical",
+                                                   command=self.ani_console_text.yview)
         self.ani_console_vscrollbar.pack(side='right', fill='y')
         # parent is ani_console_frame
-        self.ani_console_hscrollbar = Scrollbar(self.ani_console_frame, orient="horizontal",
-                                                command=self.ani_console_text.xview)
+        self.ani_console_hscrollbar = tk.Scrollbar(self.ani_console_frame, orient="horizontal",
+                                                   command=self.ani_console_text.xview)
         self.ani_console_hscrollbar.pack(side='bottom', fill='x')
 
         self.ani_console_text.config(yscrollcommand=self.ani_console_vscrollbar.set)
         self.ani_console_text.config(xscrollcommand=self.ani_console_hscrollbar.set)
 
-        # --------------------------------------------------------
-        # Stuff some introductory text into the text display
-        # --------------------------------------------------------
-        self.ani_console_text.insert('2.0', config['console.text'])
-        self.ani_console_text.insert(END, '\n\n')
-
-        # --------------------------------------------------------
-        # Animation Button Events
-        # --------------------------------------------------------
-        self.mvc_events = mvc.Event()
-        try:
-            self.mvc_events.register_class(config['event.class'])
-        except exceptions.ClassAlreadyRegistered:
-            pass
-        self.mvc_events.register_actor(config['event.class'], self.name)
-        self.button_events = [
-            mvc.Event.Events.START,
-            mvc.Event.Events.STOP,
-            mvc.Event.Events.STEP,
-            mvc.Event.Events.PAUSE,
-            mvc.Event.Events.RESUME
-        ]
-        for event_ in self.button_events:
-            self.mvc_events.register_event(config['event.class'], event=event_, event_type='view', text=event_.name)
-
     def run(self):
         """ Satisfy base class requirements """
         pass
@@ -201,13 +248,45 @@ class Animation(mvc.View):
         """ Satisfy base class requirements """
         pass
 
+    def mark(self, key, func, *args):
+        """ Mark an animation item dirty, it will be drawn at the next frame
+
+            Only the latest drawing of an item is kept, earlier drawings of the same item are discarded.
+
+            :param key: Item key (e.g. ('fork', 3))
+            :param func: Function to draw the item
+            :param args: Arguments for the drawing function
+        """
+        with self.dirty_lock:
+            self.dirty[key] = (func, args)
+
+    def render(self):
+        """ Render loop, draws the items marked dirty since the previous frame """
+        self.draw_frame()
+        self.canvas.after(self.frame_ms, self.render)
+
+    def draw_frame(self):
+        """ Draw the items marked dirty since the previous frame
+
+            :returns: Number of items drawn
+        """
+        with self.dirty_lock:
+            dirty, self.dirty = self.dirty, {}
+        for func, args in dirty.values():
+            func(*args)
+        return len(dirty)
+
     def _disable_buttons(self):
         for b in self.ani_buttons.keys():
             self.ani_buttons[b].disable()
 
-    def _button_start(self):
+    def start(self):
+        """ Post a START event for our simulation, as the START button does """
         self.parent.update(self.mvc_events.post(class_name=self.config['event.class'],
                                                 event=mvc.Event.Events.START, actor_name=self.name))
+
+    def _button_start(self):
+        self.start()
         self.ani_buttons[AniButtonType.START].disable()
         self.ani_buttons[AniButtonType.PAUSE].enable()
         self.ani_buttons[AniButtonType.STOP].enable()
@@ -266,8 +345,7 @@ class Animation(mvc.View):
         """
         canvas_x1, canvas_y1 = self.canvas_xy00(x - r, y + r)
         canvas_x2, canvas_y2 = self.canvas_xy00(x + r, y - r)
-        self.ani_canvas.create_oval(canvas_x1, canvas_y1, canvas_x2, canvas_y2, fill=c)
-        self.ani_canvas.pack()
+        self.canvas.create_oval(canvas_x1, canvas_y1, canvas_x2, canvas_y2, fill=c)
 
     def circle_at(self, x, y, r, c):
         """ Draw a circle at [x,y] coordinates, radius 'r'
@@ -280,16 +358,88 @@ class Animation(mvc.View):
             :param r: radius
             :param c: fill color
         """
-        self.ani_canvas.create_oval(x-r, y+r, x+r, y-r, fill=c)
-        self.ani_canvas.pack()
+        self.canvas.create_oval(x-r, y+r, x+r, y-r, fill=c)
+
+    def item(self, key, create, coords, **options):
+        """ Draw a persistent canvas item
+
+            The item is created the first time it is drawn. Thereafter it is updated in place,
+            and only when its coordinates or options have changed.
+
+            :param key: Item key (e.g. ('fork', 3))
+            :param create: Canvas function to create the item (e.g. create_oval)
+            :param coords: Item canvas coordinates (tuple)
+            :param options: Item options (e.g. fill)
+        """
+        item = self.items.get(key)
+        if item is None:
+            self.items[key] = [create(*coords, **options), coords, options]
+            return
+        if item[1] != coords:
+            self.canvas.coords(item[0], *coords)
+            item[1] = coords
+        if item[2] != options:
+            self.canvas.itemconfigure(item[0], **options)
+            item[2] = options
+
+    def circle_item00(self, key, x, y, r, c):
+        """ Draw a persistent circle at [x,y] coordinates, radius 'r'
+
+            This version of 'circle_item' assumes an origin of [0, 0] at the center of the canvas.
+
+            :param key: Item key
+            :param x: x-coordinate
+            :param y: y-coordinate
+            :param r: radius
+            :param c: fill color
+        """
+        canvas_x1, canvas_y1 = self.canvas_xy00(x - r, y + r)
+        canvas_x2, canvas_y2 = self.canvas_xy00(x + r, y - r)
+        self.item(key, self.canvas.create_oval, (canvas_x1, canvas_y1, canvas_x2, canvas_y2), fill=c)
+
+    def circle_item(self, key, x, y, r, c):
+        """ Draw a persistent circle at [x,y] coordinates, radius 'r'
+
+            This version of 'circle_item' assumes an origin of [0, 0] at the top left of the canvas.
+
+            :param key: Item key
+            :param x: x-coordinate
+            :param y: y-coordinate
+            :param r: radius
+            :param c: fill color
+        """
+        self.item(key, self.canvas.create_oval, (x-r, y+r, x+r, y-r), fill=c)
+
+    def text_item00(self, key, x, y, t, c):
+        """ Draw persistent text at [x, y] coordinates
+
+            This version of 'text_item' assumes an origin of [0, 0] at the center of the canvas.
+
+            :param key: Item key
+            :param x: x-coordinate
+            :param y: y-coordinate
+            :param t: text
+            :param c: color
+        """
+        self.item(key, self.canvas.create_text, self.canvas_xy00(x, y), text=t, fill=c)
+
+    def text_item(self, key, x, y, t, c):
+        """ Draw persistent text at [x, y] coordinates
+
+            This version of 'text_item' assumes an origin of [0, 0] at the top left of the canvas.
+
+            :param key: Item key
+            :param x: x-coordinate
+            :param y: y-coordinate
+            :param t: text
+            :param c: color
+        """
+        self.item(key, self.canvas.create_text, (x, y), text=t, fill=c)
 
     def draw_counter(self, count):
         text_ = 'Loops:{:5d}'.format(count)
         color = 'black'
-        if self.counter_id is not None:
-            self.ani_canvas.delete(self.counter_id)
-        self.counter_id = self.ani_canvas.create_text(self.counter_x, self.counter_y, text=text_, fill=color)
-        self.ani_canvas.pack()
+        self.text_item('counter', self.counter_x, self.counter_y, text_, color)
 
     def text_at00(self, x, y, t, c):
         """ Draw text at [x, y] coordinates
@@ -301,8 +451,7 @@ class Animation(mvc.View):
             :param t: text
             :param c: color
         """
-        self.ani_canvas.create_text(self.canvas_xy00(x, y), text=t, fill=c)
-        self.ani_canvas.pack()
+        self.canvas.create_text(self.canvas_xy00(x, y), text=t, fill=c)
 
     def text_at(self, x, y, t, c):
         """ Draw text at [x, y] coordinates
@@ -315,8 +464,7 @@ class Animation(mvc.View):
             :param t: text
             :param c: color
         """
-        self.ani_canvas.create_text(x, y, text=t, fill=c)
-        self.ani_canvas.pack()
+        self.canvas.create_text(x, y, text=t, fill=c)
 
     @staticmethod
     def transform_2xy(radius, angle):
@@ -339,7 +487,7 @@ class Animation(mvc.View):
             :param t: thickness
             :param c: color (fill)
         """
-        self.ani_canvas.create_rectangle(x, y+t/2, x+l, y-t/2, fill=c, width=0)
+        self.canvas.create_rectangle(x, y+t/2, x+l, y-t/2, fill=c, width=0)
 
     def draw_outer_walls(self, t, c):
         """ Draw outer walls
@@ -348,20 +496,20 @@ class Animation(mvc.View):
             :param c: color (fill)
         """
         # top wall
-        self.ani_canvas.create_rectangle(0, 0,
+        self.canvas.create_rectangle(0, 0,
                                          self.common['animation']['width'], t+1,
                                          fill=c, width=0)
         # bottom wall
-        self.ani_canvas.create_rectangle(0, self.common['animation']['height']-t+1,
+        self.canvas.create_rectangle(0, self.common['animation']['height']-t+1,
                                          self.common['animation']['width'],
                                          self.common['animation']['height']+1,
                                          fill=c, width=0)
         # left wall
-        self.ani_canvas.create_rectangle(0, 0,
+        self.canvas.create_rectangle(0, 0,
                                          t+1, self.common['animation']['height']+1,
                                          fill=c, width=0)
         # right wall
-        self.ani_canvas.create_rectangle(self.common['animation']['width']-t, 0,
+        self.canvas.create_rectangle(self.common['animation']['width']-t, 0,
                                          self.common['animation']['width'], self.common['animation']['height'],
                                          fill=c, width=0)
 
@@ -369,8 +517,8 @@ class Animation(mvc.View):
 class DiningPhilosophers(Animation):
     """ Logic to Manage Dining Philosophers Simulation Animation """
 
-    def __init__(self, root=None, mainframe=None, config=None, common=None, parent=None):
-        super().__init__(root=root, mainframe=mainframe, config=config, common=common, parent=self)
+    def __init__(self, root=None, mainframe=None, config=None, common=None, parent=None, backend=None):
+        super().__init__(root=root, mainframe=mainframe, config=config, common=common, parent=self, backend=backend)
         self.my_parent = parent
         self.my_model = self.config['model']
         self.num_philosophers = self.config['philosophers']
@@ -435,7 +583,8 @@ class DiningPhilosophers(Animation):
         self.add_philosophers()
         self.add_timers()
         # Only start button is enabled
-        self.ani_buttons[AniButtonType.START].enable()
+        if self.ani_buttons:
+            self.ani_buttons[AniButtonType.START].enable()
 
     def add_table(self):
         """ Add the main dining table """
@@ -444,7 +593,7 @@ class DiningPhilosophers(Animation):
     def draw_chair(self, chair, color):
         angle = chair * self.delta_angle_degrees
         cx, cy = self.transform_2xy(self.chair_circle_radius, angle)
-        self.circle_at00(cx, cy, self.chair_radius, color)
+        self.circle_item00(('chair', chair), cx, cy, self.chair_radius, color)
         return cx, cy
 
     def add_chairs(self):
@@ -458,8 +607,8 @@ class DiningPhilosophers(Animation):
         tx, ty = self.transform_2xy(self.timer_circle_radius, angle)
         if text is None:
             text = '0'
-        self.circle_at00(tx, ty, self.timer_radius, color[0])
-        self.text_at00(tx, ty, '%s' % text, color[1])
+        self.circle_item00(('timer', timer), tx, ty, self.timer_radius, color[0])
+        self.text_item00(('timer.text', timer), tx, ty, '%s' % text, color[1])
         return tx, ty
 
     def add_timers(self):
@@ -472,11 +621,21 @@ class DiningPhilosophers(Animation):
         angle = pid * self.delta_angle_degrees
         px, py = self.transform_2xy(self.chair_circle_radius, angle)
         if text is None:
-            self.text_at00(px, py, 'P%s' % pid, color)
+            self.text_item00(('philosopher', pid), px, py, 'P%s' % pid, color)
         else:
-            self.text_at00(px, py, ('P%s-%s' % (pid, text)), color)
+            self.text_item00(('philosopher', pid), px, py, ('P%s-%s' % (pid, text)), color)
         return px, py
 
+    def draw_seat(self, pid, color, text=None):
+        """ Draw a philosopher and their chair
+
+            :param pid: Philosopher ID
+            :param color: [chair color, text color]
+            :param text: Optional philosopher state text
+        """
+        self.draw_chair(pid, color[0])
+        self.draw_philosopher(pid, color[1], text=text)
+
     def add_philosophers(self):
         """ Add philosophers around the table """
         for p in range(self.num_philosophers):
@@ -486,10 +645,20 @@ class DiningPhilosophers(Animation):
     def draw_fork(self, fork):
         angle = self.fork_angle_offset + fork * self.delta_angle_degrees
         fx, fy = self.transform_2xy(self.fork_circle_radius, angle)
-        self.circle_at00(fx, fy, self.fork_radius, self.config['fork.color'])
-        self.text_at00(fx, fy, 'F', 'white')
+        self.circle_item00(('fork', fork), fx, fy, self.fork_radius, self.config['fork.color'])
+        self.text_item00(('fork.text', fork), fx, fy, 'F', 'white')
         return fx, fy
 
+    def draw_fork_owner(self, fork, philosopher_id):
+        """ Draw a fork labelled with the ID of the philosopher holding it
+
+            :param fork: Fork ID
+            :param philosopher_id: ID of the philosopher holding the fork
+        """
+        fx, fy = self.fork_coords[fork]
+        self.circle_item00(('fork', fork), fx, fy, self.fork_radius, self.config['fork.color'])
+        self.text_item00(('fork.text', fork), fx, fy, '%s' % philosopher_id, 'white')
+
     def add_forks(self):
         """ Add forks around the table, forks are situated between philosophers """
         for f in range(self.num_philosophers):
@@ -498,10 +667,18 @@ class DiningPhilosophers(Animation):
 
     def add_waiter(self):
         """ Add the waiter graphic to the simulation """
-        self.circle_at00(0, 0, self.config['waiter.chair.radius'], self.config['waiter.color'])
         self.waiter_coords.append([0, 0])
-        self.ani_canvas.create_text(self.ani_center, text='Waiter', fill='white')
-        self.ani_canvas.pack()
+        self.draw_waiter('Waiter', 'white')
+
+    def draw_waiter(self, text, color):
+        """ Draw the waiter
+
+            :param text: Waiter text
+            :param color: Text color
+        """
+        fx, fy = self.waiter_coords[0]
+        self.circle_item00('waiter', fx, fy, self.config['waiter.chair.radius'], self.config['waiter.color'])
+        self.text_item00('waiter.text', fx, fy, text, color)
 
     def update(self, event):
         """ Function to process all animation events
@@ -544,7 +721,7 @@ class DiningPhilosophers(Animation):
         time_ = event['data'][0]
         id_ = event['user.id']
         color = self.common['init.color']
-        self.draw_timer(id_, color, text=time_)
+        self.mark(('timer', id_), self.draw_timer, id_, color, time_)
 
     def dining_start(self, event):
         pass
@@ -569,35 +746,35 @@ class DiningPhilosophers(Animation):
 
     def dining_state_thinking(self, event):
         if event['event'] == smEvent.SmEvents.STATE_TRANSITION:
-            self.draw_chair(event['user.id'], self.config['thinking.color'][0])
-            self.draw_philosopher(event['user.id'], self.config['thinking.color'][1], text='T')
-            left, right = self.models['Philosophers'].forks(event['user.id'])
-            self.draw_fork(left)
-            self.draw_fork(right)
+            pid = event['user.id']
+            self.mark(('philosopher', pid), self.draw_seat, pid, self.config['thinking.color'], 'T')
+            left, right = self.models['Philosophers'].forks(pid)
+            self.mark(('fork', left), self.draw_fork, left)
+            self.mark(('fork', right), self.draw_fork, right)
         else:
             raise Exception('unexpected event handling')
 
     def dining_state_eating(self, event):
         if event['event'] == smEvent.SmEvents.STATE_TRANSITION:
-            self.draw_chair(event['user.id'], self.config['eating.color'][0])
-            self.draw_philosopher(event['user.id'], self.config['eating.color'][1], text='E')
+            pid = event['user.id']
+            self.mark(('philosopher', pid), self.draw_seat, pid, self.config['eating.color'], 'E')
         else:
             raise Exception('unexpected event handling')
 
     def dining_state_hungry(self, event):
         if event['event'] == smEvent.SmEvents.STATE_TRANSITION:
-            self.draw_chair(event['user.id'], self.config['hungry.color'][0])
-            self.draw_philosopher(event['user.id'], self.config['hungry.color'][1], text='H')
+            pid = event['user.id']
+            self.mark(('philosopher', pid), self.draw_seat, pid, self.config['hungry.color'], 'H')
         else:
             raise Exception('unexpected event handling')
 
     def dining_state_finish(self, event):
         if event['event'] == smEvent.SmEvents.STATE_TRANSITION:
-            self.draw_chair(event['user.id'], self.common['stop.color'][0])
-            self.draw_philosopher(event['user.id'], self.common['stop.color'][1])
-            left, right = self.models['Philosophers'].forks(event['user.id'])
-            self.draw_fork(left)
-            self.draw_fork(right)
+            pid = event['user.id']
+            self.mark(('philosopher', pid), self.draw_seat, pid, self.common['stop.color'])
+            left, right = self.models['Philosophers'].forks(pid)
+            self.mark(('fork', left), self.draw_fork, left)
+            self.mark(('fork', right), self.draw_fork, right)
         else:
             raise Exception('unexpected event handling')
 
@@ -612,14 +789,10 @@ class DiningPhilosophers(Animation):
 
     def waiter_acquire(self, event):
         philosopher_id = event['data']
-        fx, fy = self.waiter_coords[0]
-        self.circle_at00(fx, fy, self.config['waiter.chair.radius'], self.config['waiter.color'])
-        self.text_at00(fx, fy, 'Wait[%s]' % philosopher_id, 'yellow')
+        self.mark('waiter', self.draw_waiter, 'Wait[%s]' % philosopher_id, 'yellow')
 
     def waiter_release(self, event):
-        fx, fy = self.waiter_coords[0]
-        self.circle_at00(fx, fy, self.config['waiter.chair.radius'], self.config['waiter.color'])
-        self.text_at00(fx, fy, 'Waiter', 'white')
+        self.mark('waiter', self.draw_waiter, 'Waiter', 'white')
 
     def waiter_left_fork(self, event):
         self.waiter_fork_(event, ForkId.Left)
@@ -631,19 +804,15 @@ class DiningPhilosophers(Animation):
         philosopher_id = event['data']
         model = self.models[self.my_model]
         left, right = model.forks(philosopher_id)
-        if fork is ForkId.Left:
-            fx, fy = self.fork_coords[left]
-        else:
-            fx, fy = self.fork_coords[right]
-        self.circle_at00(fx, fy, self.fork_radius, self.config['fork.color'])
-        self.text_at00(fx, fy, '%s' % philosopher_id, 'white')
+        fork_id = left if fork is ForkId.Left else right
+        self.mark(('fork', fork_id), self.draw_fork_owner, fork_id, philosopher_id)
 
 
 class SleepingBarbers(Animation):
     """ Logic to Manage Sleeping Barber(s) Simulation Animation """
 
-    def __init__(self, root=None, mainframe=None, config=None, common=None, parent=None):
-        super().__init__(root=root, mainframe=mainframe, config=config, common=common, parent=self)
+    def __init__(self, root=None, mainframe=None, config=None, common=None, parent=None, backend=None):
+        super().__init__(root=root, mainframe=mainframe, config=config, common=common, parent=self, backend=backend)
         self.my_parent = parent
         self.my_model = self.config['model']
         self.num_barbers = self.config['barbers']
@@ -717,7 +886,8 @@ class SleepingBarbers(Animation):
         self.add_timers()
 
         # Only start button is enabled
-        self.ani_buttons[AniButtonType.START].enable()
+        if self.ani_buttons:
+            self.ani_buttons[AniButtonType.START].enable()
 
     def add_walls(self):
         for w in self.wall_data:
@@ -749,14 +919,14 @@ class SleepingBarbers(Animation):
 
     def draw_barber(self, bid, color, text=None):
         bx, by = self.barber_coords[bid]
-        self.circle_at(bx, by, self.barber_chair_radius, color[0])
+        self.circle_item(('barber', bid), bx, by, self.barber_chair_radius, color[0])
         if text is None:
-            self.text_at(bx, by, 'B%s' % bid, color[1])
+            self.text_item(('barber.text', bid), bx, by, 'B%s' % bid, color[1])
         else:
             text = text[-5:]
             if not text[0].isdigit():
                 text = text[-4:]
-            self.text_at(bx, by, ('B%s-%s' % (bid, text)), color[1])
+            self.text_item(('barber.text', bid), bx, by, ('B%s-%s' % (bid, text)), color[1])
 
     def add_waiting_room(self):
         """ Add waiting room chairs """
@@ -765,17 +935,17 @@ class SleepingBarbers(Animation):
 
     def draw_waiter(self, w, color, text=None):
         wx, wy = self.waiter_coords[w]
-        self.circle_at(wx, wy, self.waiter_chair_radius, color[0])
+        self.circle_item(('chair', w), wx, wy, self.waiter_chair_radius, color[0])
         if text is None:
-            self.text_at(wx, wy, 'Empty', color[1])
+            self.text_item(('chair.text', w), wx, wy, 'Empty', color[1])
         else:
-            self.text_at(wx, wy, ('%s' % text), color[1])
+            self.text_item(('chair.text', w), wx, wy, ('%s' % text), color[1])
 
     def draw_timer(self, t, color, text=None):
         tx, ty = t
-        self.circle_at(tx, ty, self.config['timer.radius'], color[0])
+        self.circle_item(('timer', tx, ty), tx, ty, self.config['timer.radius'], color[0])
         if text is not None:
-            self.text_at(tx, ty, ('%s' % text), color[1])
+            self.text_item(('timer.text', tx, ty), tx, ty, ('%s' % text), color[1])
 
     def update(self, event):
         """ Function to process all animation events
@@ -813,15 +983,14 @@ class SleepingBarbers(Animation):
         id_ = event['user.id']
         if event['data'][1] == barberStates.Sleeping:
             color = self.config['sleeping.color']
-            self.draw_timer(self.timer_coords['barber'][id_], color, text=time_)
+            self.mark(('timer', 'barber', id_), self.draw_timer, self.timer_coords['barber'][id_], color, time_)
         elif event['data'][1] == barberStates.Cutting:
             color = self.config['cutting.color']
-            self.draw_timer(self.timer_coords['barber'][id_], color, text=time_)
-            customer = event['data'][2]
-            self.draw_barber(id_, color, text='%s' % event['data'][2].id)
+            self.mark(('timer', 'barber', id_), self.draw_timer, self.timer_coords['barber'][id_], color, time_)
+            self.mark(('barber', id_), self.draw_barber, id_, color, '%s' % event['data'][2].id)
         elif event['data'][1] == barberStates.Stopping:
             color = self.config['cutting.color']
-            self.draw_timer(self.timer_coords['barber'][id_], color, text=time_)
+            self.mark(('timer', 'barber', id_), self.draw_timer, self.timer_coords['barber'][id_], color, time_)
         elif event['data'][1] == customerStates.Waiting:
             color = self.config['waiting.color']
             # get a copy of the waiting room list
@@ -834,8 +1003,8 @@ class SleepingBarbers(Animation):
             # just return if the customer is no longer occupying a chair
             if chair is None:
                 return
-            self.draw_timer(self.timer_coords['waiter'][chair], color, text=time_)
-            self.draw_waiter(chair, color, text=id_)
+            self.mark(('timer', 'waiter', chair), self.draw_timer, self.timer_coords['waiter'][chair], color, time_)
+            self.mark(('waiter', chair), self.draw_waiter, chair, color, id_)
         else:
             print(event)
 
@@ -876,13 +1045,13 @@ class SleepingBarbers(Animation):
         pass
 
     def barber_state_cutting(self, event):
-        self.draw_barber(event['user.id'], self.config['cutting.color'])
+        self.mark(('barber', event['user.id']), self.draw_barber, event['user.id'], self.config['cutting.color'])
 
     def barber_state_sleeping(self, event):
-        self.draw_barber(event['user.id'], self.config['sleeping.color'])
+        self.mark(('barber', event['user.id']), self.draw_barber, event['user.id'], self.config['sleeping.color'])
 
     def barber_state_finish(self, event):
-        self.draw_barber(event['user.id'], self.common['finish.color'])
+        self.mark(('barber', event['user.id']), self.draw_barber, event['user.id'], self.common['finish.color'])
 
     def customer_start(self, event):
         pass
@@ -903,8 +1072,8 @@ class SleepingBarbers(Animation):
         chair = self.waiting_customer_chair(event['user.id'])
         if chair is not None:
             color = self.common['init.color']
-            self.draw_timer(self.timer_coords['waiter'][chair], color, text=0)
-            self.draw_waiter(chair, color, text=None)
+            self.mark(('timer', 'waiter', chair), self.draw_timer, self.timer_coords['waiter'][chair], color, 0)
+            self.mark(('waiter', chair), self.draw_waiter, chair, color)
 
     def customer_state_waiting(self, event):
         self.waiting_chairs[self.next_waiting_chair()] = event['user.id']
@@ -913,8 +1082,47 @@ class SleepingBarbers(Animation):
         chair = self.waiting_customer_chair(event['user.id'])
         if chair is not None:
             color = self.common['finish.color']
-            self.draw_timer(self.timer_coords['waiter'][chair], color, text=0)
-            self.draw_waiter(chair, color, text=None)
+            self.mark(('timer', 'waiter', chair), self.draw_timer, self.timer_coords['waiter'][chair], color, 0)
+            self.mark(('waiter', chair), self.draw_waiter, chair, color)
+
+
+class ConsoleTimestamp(object):
+    """ Console timestamp formatter
+
+        Formats a *monotonic_ns* time as wall clock 'HH:MM:SS:uuuuuu'.
+        The 'HH:MM:SS' text is formatted once per second and cached.
+    """
+
+    def __init__(self):
+        self.offset_ns = time.time_ns() - time.monotonic_ns()  #: monotonic to wall clock offset
+        self.second = None      #: wall clock second of the cached text
+        self.text = None        #: cached 'HH:MM:SS' text
+
+    def __call__(self, ns=None):
+        """ Format a timestamp
+
+            :param ns: *monotonic_ns* time, now if not given
+            :returns: Timestamp text
+        """
+        if ns is None:
+            ns = time.monotonic_ns()
+        second, fraction = divmod(ns + self.offset_ns, 1000000000)
+        if second != self.second:
+            self.second = second
+            self.text = time.strftime('%H:%M:%S', time.localtime(second))
+        return '%s:%06d' % (self.text, fraction // 1000)
+
+    def event(self, event):
+        """ Format the time an event happened, not the time it reached the console
+
+            Events are routed to views in batches, some time after they were posted.
+
+            :param event: MVC event, its *datetime* is set when it is posted
+            :returns: Timestamp text, now if the event has no time
+        """
+        if 'datetime' not in event.keys():
+            return self()
+        return self(round(event['datetime'].timestamp() * 1000000) * 1000 - self.offset_ns)
 
 
 class GuiConsoleView(mvc.View):
@@ -937,17 +1145,23 @@ class GuiConsoleView(mvc.View):
             23:16:28:425131 [philosophers] 20 LOOPS
             [...]
 
+        Formatted lines are buffered and flushed to the console by the animation
+        render loop, one insert per frame. Only the last *console.lines* lines are kept.
     """
 
     def __init__(self, name, widget):
         super().__init__(name='%s_console' % name)
         self.widget = widget
+        self.max_lines = widget.common['console.lines']    #: number of console lines kept
+        self.timestamp = ConsoleTimestamp()                 #: console timestamp formatter
+        self.lines = []                                     #: lines waiting to be flushed
+        self.lines_lock = threading.Lock()                  #: protects *lines*
 
     def update(self, event):
         # don't log timer tick events to the console
         if event['event'] == mvc.Event.Events.TIMER:
             return
-        ts = event['datetime'].strftime('%H:%M:%S:%f')
+        ts = self.timestamp.event(event)
         if event['class'].lower() == 'waiter':
             msg = '{} [{}] {} {}'.format(ts, event['class'], event['data'], event['event'].name)
         elif event['event'] == mvc.Event.Events.LOOPS:
@@ -960,8 +1174,23 @@ class GuiConsoleView(mvc.View):
                 msg = '{} {}'.format(msg, event['text'])
             if 'data' in event.keys() and event['data'] is not None:
                 msg = '{} {}'.format(msg, event['data'])
-        self.widget.ani_console_text.insert(END, msg+'\n')
-        self.widget.ani_console_text.see(END)
+        with self.lines_lock:
+            self.lines.append(msg)
+        self.widget.mark(('console', self.name), self.flush)
+
+    def flush(self):
+        """ Flush buffered lines to the console, called from the animation render loop """
+        with self.lines_lock:
+            lines, self.lines = self.lines[-self.max_lines:], []
+        if not lines:
+            return
+        text = self.widget.ani_console_text
+        text.insert('end', '\n'.join(lines) + '\n')
+        # trim from the top, 'end-1c' is at the start of the (empty) last line
+        last = int(text.index('end-1c').split('.')[0])
+        if last > self.max_lines:
+            text.delete('1.0', '%d.0' % (last - self.max_lines))
+        text.see('end')
 
     def run(self):
         pass
@@ -974,18 +1203,20 @@ class GuiView(mvc.View):
     """ StateEngineCrank GUI View """
 
     common_config = {
-        'mainframe.stick': (N, S, E, W),
+        'mainframe.stick': ('n', 's', 'e', 'w'),
         'animation': {'width': 360, 'height': 360},
-        'animation.stick': N,
-        'buttons.stick': N,
+        'animation.stick': 'n',
+        'buttons.stick': 'n',
         'console': {'width': 40, 'height': 10},
-        'console.stick': (N, S, E, W),
-        'console.label.stick': N,
-        'console.frame.stick': (N, S, E, W),
-        'ani.frame.stick': (N, S, E, W),
-        'label.stick': N,
+        'console.stick': ('n', 's', 'e', 'w'),
+        'console.label.stick': 'n',
+        'console.frame.stick': ('n', 's', 'e', 'w'),
+        'ani.frame.stick': ('n', 's', 'e', 'w'),
+        'label.stick': 'n',
         'wall.thickness': 5,
         'wall.color': 'lightgray',
+        'fps': 30,
+        'console.lines': 1000,
 
         'timer.radius': 15,
 
@@ -1037,8 +1268,14 @@ class GuiView(mvc.View):
         'waiting.color': ['red', 'white'],
     }
 
-    def __init__(self):
+    def __init__(self, headless=False):
+        """ GuiView Class Constructor
+
+            :param headless: True, render with a headless backend, no display is required
+        """
         super().__init__(name='gui', target=self.run)
+        self.headless = headless    #: render with headless backends
+        self.backends = {}          #: animation name -> render backend
         self.root = None
         self.mainframe = None
         self.gui_thread = None
@@ -1089,7 +1326,7 @@ class GuiView(mvc.View):
             self.models['Philosophers'].update(event)
         if event['type'] == 'model' or event['type'] == '*':
             if event['event'] == mvc.Event.Events.LOOPS:
-                self.ani_dining.draw_counter(event['data'])
+                self.ani_dining.mark('counter', self.ani_dining.draw_counter, event['data'])
             elif event['event'] == mvc.Event.Events.ALLSTOPPED:
                 pass
             elif event['event'] == mvc.Event.Events.STATISTICS:
@@ -1104,7 +1341,7 @@ class GuiView(mvc.View):
             self.models['Barbers'].update(event)
         if event['type'] == 'model' or event['type'] == '*':
             if event['event'] == mvc.Event.Events.LOOPS:
-                self.ani_barbers.draw_counter(event['data'])
+                self.ani_barbers.mark('counter', self.ani_barbers.draw_counter, event['data'])
             elif event['event'] == mvc.Event.Events.ALLSTOPPED:
                 pass
             elif event['event'] == mvc.Event.Events.STATISTICS:
@@ -1131,7 +1368,10 @@ class GuiView(mvc.View):
             time.sleep(Defines.Times.Starting)
 
         # start the GUI thread
-        self.gui_thread = threading.Thread(target=self.tk_run, name='tk_gui')
+        if self.headless:
+            self.gui_thread = threading.Thread(target=self.headless_run, name='headless_gui')
+        else:
+            self.gui_thread = threading.Thread(target=self.tk_run, name='tk_gui')
         self.gui_thread.start()
 
         # loop until no longer running
@@ -1147,7 +1387,9 @@ class GuiView(mvc.View):
 
     def tk_run(self):
         """ GUI view running - setup basic framework """
-        self.root = Tk()
+        import tkinter as tk
+        from tkinter import ttk
+        self.root = tk.Tk()
         self.root.title(Defines.TITLE)
         self.root.config(bg='red')
         # root
@@ -1162,9 +1404,32 @@ class GuiView(mvc.View):
         #   * 'n' columns, weight=1
         #   * columns are configured by the animations that occupy them
         self.mainframe = ttk.Frame(self.root, relief='sunken', padding="8 8 8 8", name='mainframe')
-        self.mainframe.grid(row=0, column=0, sticky=(N, W, E, S))
+        self.mainframe.grid(row=0, column=0, sticky=('n', 'w', 'e', 's'))
         self.mainframe.grid_rowconfigure(0, weight=1)
 
+        self.create_animations()
+
+        # all setup so run
+        self.root.mainloop()
+
+    def headless_run(self):
+        """ GUI view running without a display
+
+            Animations draw into in-memory display lists, frames are drawn by this thread.
+        """
+        self.backends = {'philosophers': render.HeadlessBackend(), 'barbers': render.HeadlessBackend()}
+        self.create_animations()
+        # there are no buttons to press, start the simulations
+        self.ani_dining.start()
+        self.ani_barbers.start()
+        frame = 1.0 / self.common_config['fps']
+        while self.running:
+            self.ani_dining.draw_frame()
+            self.ani_barbers.draw_frame()
+            time.sleep(frame)
+
+    def create_animations(self):
+        """ Instantiate the animation and console views and register them with the models """
         # fill in some model configuration items
         self.model_config = {
             'philosophers': self.models['Philosophers'].config,
@@ -1176,11 +1441,13 @@ class GuiView(mvc.View):
 
         # instantiate our GUI animation views
         self.ani_dining = DiningPhilosophers(parent=self, root=self.root, mainframe=self.mainframe,
-                                             config=self.philosophers_config, common=self.common_config)
+                                             config=self.philosophers_config, common=self.common_config,
+                                             backend=self.backends.get('philosophers'))
         dining_gui_console = GuiConsoleView('philosophers', self.ani_dining)
 
         self.ani_barbers = SleepingBarbers(parent=self, root=self.root, mainframe=self.mainframe,
-                                           config=self.barbers_config, common=self.common_config)
+                                           config=self.barbers_config, common=self.common_config,
+                                           backend=self.backends.get('barbers'))
         barbers_gui_console = GuiConsoleView('barbers', self.ani_barbers)
 
         # register our animation views
@@ -1200,6 +1467,3 @@ class GuiView(mvc.View):
             self.ani_dining.register(self.models[self.philosophers_config['model']])
         if self.barbers_config['model'] in self.models:
             self.ani_barbers.register(self.models[self.barbers_config['model']])
-
-        # all setup so run
-        self.root.mainloop()
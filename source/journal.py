@@ -0,0 +1,518 @@
+""" StateEngineCrank.journal
+
+Event journaling and offline replay.
+
+The *JournalView* is an MVC view which appends every event delivered to it by the
+simulation models to a segmented, append-only journal on disk. The *JournalReplay*
+controller reads a journal back and feeds the recorded events to views (e.g. *GuiView*,
+*ConsoleView*) at real-time, accelerated or maximum speed, with support for seeking.
+
+Journal directory layout::
+
+    journal.meta            journal version, model names and model configuration
+    journal.idx             sparse index, one "timestamp segment offset" entry per line
+    segment-000000.jsonl    journal records, one JSON object per line
+    segment-000001.jsonl    a new segment is started when the current one is full
+    [...]
+
+Each journal record contains:
+
+    * t : event timestamp (seconds since the epoch)
+    * model : name of the model which posted the event
+    * event : the event, encoded as JSON
+
+Event payloads may contain enums, datetimes and live simulation objects (e.g. a *Customer*).
+Enums and datetimes are restored on replay, simulation objects are replaced by a *JournalRef*
+carrying the object type, id and name.
+"""
+
+# System imports
+import argparse
+import bisect
+import collections
+import datetime
+import enum
+import functools
+import importlib
+import json
+import os
+import queue
+import time
+
+# Project imports
+import mvc
+import Defines
+
+#: journal format version, recorded in the journal meta file
+JOURNAL_VERSION = 1
+
+META_FILE = 'journal.meta'
+INDEX_FILE = 'journal.idx'
+SEGMENT_FILE = 'segment-{:06d}.jsonl'
+
+#: stand-in for simulation objects found in journaled event payloads
+JournalRef = collections.namedtuple('JournalRef', 'type id name')
+
+
+def encode(value):
+    """ Encode an event (or any part of an event) as a JSON serializable value
+
+        :param value: Value to encode
+        :returns: JSON serializable value
+    """
+    if isinstance(value, enum.Enum):
+        class_ = type(value)
+        return {'__enum__': [class_.__module__, class_.__qualname__, value.name]}
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.timestamp()}
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return {'__ref__': [type(value).__name__, getattr(value, 'id', None), getattr(value, 'name', None)]}
+
+
+@functools.lru_cache(maxsize=None)
+def lookup_enum(module_name, qualname, member):
+    """ Lookup an enum member by module, class qualified name and member name
+
+        :param module_name: Module defining the enum
+        :param qualname: Qualified name of the enum class
+        :param member: Name of the enum member
+        :returns: Enum member
+    """
+    obj = importlib.import_module(module_name)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+    return obj[member]
+
+
+def decode(value):
+    """ Decode a value previously encoded by *encode()*
+
+        :param value: Value to decode
+        :returns: Decoded value
+    """
+    if isinstance(value, dict):
+        if '__enum__' in value:
+            return lookup_enum(*value['__enum__'])
+        if '__datetime__' in value:
+            return datetime.datetime.fromtimestamp(value['__datetime__'])
+        if '__ref__' in value:
+            return JournalRef(*value['__ref__'])
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+def config_snapshot(model):
+    """ Capture the simple configuration values of a model
+
+        :param model: Model whose configuration is captured
+        :returns: Dictionary of configuration values
+    """
+    if not hasattr(model, 'config'):
+        return {}
+    return {key: value for key, value in vars(model.config).items()
+            if isinstance(value, (str, int, float, bool))}
+
+
+class JournalView(mvc.View):
+    """ Journaling View
+
+        Events are encoded as the router thread delivers them (payloads are live objects which
+        keep changing) and queued. The journal thread writes queued events to the current segment.
+    """
+
+    #: event classes and actors which are not model names, mapped to the model which posts them
+    ORIGINS = {
+        'Waiter': 'Philosophers',
+        'Customers': 'Barbers',
+        'Waitingroom': 'Barbers',
+    }
+
+    def __init__(self, path, segment_bytes=16*1024*1024, index_every=256):
+        """ JournalView Class Constructor
+
+            :param path: Journal directory
+            :param segment_bytes: Segment size, a new segment is started when exceeded
+            :param index_every: Number of records between index entries
+        """
+        mvc.View.__init__(self, name='journal', target=self.run)
+        self.queue = queue.Queue()          #: encoded events awaiting the journal thread
+        self.path = path                    #: journal directory
+        self.segment_bytes = segment_bytes  #: maximum segment size
+        self.index_every = index_every      #: records between index entries
+        self.origins = {}                   #: event class/actor to model name lookup table
+        self.mvc_events = mvc.Event()       #: used to lookup the event classes of actors
+        self.segment = 0                    #: current segment number
+        self.segment_file = None            #: current segment file
+        self.index_file = None              #: index file
+        self.records = 0                    #: records written
+
+    def register(self, model):
+        """ Register a model with us
+
+            :param model: Model to be registered
+        """
+        mvc.View.register(self, model)
+        self.origins[model.name.title()] = model.name
+        for alias, origin in self.ORIGINS.items():
+            if origin == model.name:
+                self.origins[alias] = origin
+
+    def origin(self, event):
+        """ Determine the model which posted an event
+
+            :param event: Event to be journaled
+            :returns: Model name or None
+        """
+        actor = event.get('actor')
+        candidates = [event['class']]
+        if actor is not None:
+            candidates.append(actor.title())
+            candidates.extend(self.mvc_events.actors.get(actor, []))
+        for class_ in candidates:
+            if class_ in self.origins:
+                return self.origins[class_]
+        return None
+
+    def update(self, event):
+        """ Queue an event for journaling
+
+            :param event: Event to be journaled
+        """
+        self.queue.put_nowait({'t': event['datetime'].timestamp(), 'model': self.origin(event), 'event': encode(event)})
+
+    def write_meta(self):
+        """ Write the journal meta file """
+        meta = {
+            'version': JOURNAL_VERSION,
+            'created': time.time(),
+            'models': {name: config_snapshot(model) for name, model in self.models.items()},
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as meta_file:
+            json.dump(meta, meta_file, indent=2)
+
+    def open_segment(self, segment):
+        """ Open a journal segment for appending
+
+            :param segment: Segment number
+        """
+        if self.segment_file is not None:
+            self.segment_file.close()
+        self.segment = segment
+        self.segment_file = open(os.path.join(self.path, SEGMENT_FILE.format(segment)), 'ab')
+
+    def append(self, record):
+        """ Append a record to the journal
+
+            *NB: not named write(), views supporting write() receive logger text.*
+
+            :param record: Record to be written
+        """
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+        offset = self.segment_file.tell()
+        if offset and offset + len(line) > self.segment_bytes:
+            self.open_segment(self.segment + 1)
+            offset = 0
+        if offset == 0 or self.records % self.index_every == 0:
+            self.index_file.write('{:.6f} {} {}\n'.format(record['t'], self.segment, offset))
+        self.segment_file.write(line)
+        self.records += 1
+
+    def flush(self):
+        """ Write all queued events and flush the journal files """
+        while not self.queue.empty():
+            self.append(self.queue.get_nowait())
+        self.segment_file.flush()
+        self.index_file.flush()
+
+    def run(self):
+        """ Journal view running """
+        # wait until we are running, events queued by a view stopped before running are still journaled
+        while not self.running and not self.stopping:
+            time.sleep(Defines.Times.Starting)
+
+        # start a new journal or append to an existing one
+        os.makedirs(self.path, exist_ok=True)
+        self.write_meta()
+        segments = [f for f in os.listdir(self.path) if f.startswith('segment-')]
+        self.open_segment(len(segments))
+        self.index_file = open(os.path.join(self.path, INDEX_FILE), 'a')
+
+        # loop until no longer running
+        while self.running and not self._stop_event.is_set():
+            time.sleep(Defines.Times.Running)
+            self.flush()
+        self.flush()
+        self.segment_file.close()
+        self.index_file.close()
+
+
+class Journal(object):
+    """ Journal reader """
+
+    def __init__(self, path):
+        """ Journal Class Constructor
+
+            :param path: Journal directory
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE), 'r') as meta_file:
+            self.meta = json.load(meta_file)
+        self.index = []
+        with open(os.path.join(path, INDEX_FILE), 'r') as index_file:
+            for line in index_file:
+                t, segment, offset = line.split()
+                self.index.append((float(t), int(segment), int(offset)))
+        self.index.sort()
+        self.index_times = [entry[0] for entry in self.index]
+
+    def start_time(self):
+        """ Timestamp of the first journal record """
+        return self.index_times[0] if self.index else None
+
+    def records(self, start=None):
+        """ Generator of journal records
+
+            :param start: Optional timestamp, records before *start* are skipped
+            :returns: Generator of (timestamp, model, event)
+        """
+        if not self.index:
+            return
+        position = 0
+        if start is not None:
+            position = max(bisect.bisect_right(self.index_times, start) - 1, 0)
+        _, segment, offset = self.index[position]
+        while True:
+            filename = os.path.join(self.path, SEGMENT_FILE.format(segment))
+            if not os.path.isfile(filename):
+                return
+            with open(filename, 'rb') as segment_file:
+                segment_file.seek(offset)
+                for line in segment_file:
+                    record = json.loads(line)
+                    if start is not None and record['t'] < start:
+                        continue
+                    yield record['t'], record['model'], decode(record['event'])
+            segment += 1
+            offset = 0
+
+
+class ReplayConfig(object):
+    """ Model configuration restored from a journal """
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def get_philosophers(self):
+        """ Number of philosophers dining """
+        return self.philosophers
+
+    def get_barbers(self):
+        """ Number of barbers """
+        return self.barbers
+
+    def get_barbers_max(self):
+        """ Maximum number of barbers """
+        return self.barbers_max
+
+    def get_waiters(self):
+        """ Number of waiting room chairs """
+        return self.waiting_chairs
+
+    def get_waiters_max(self):
+        """ Maximum number of waiting room chairs """
+        return self.waiting_chairs_max
+
+
+class ReplayModel(mvc.Model):
+    """ Stand-in for a journaled model
+
+        Views register with a ReplayModel just as they would with the original model.
+        View events (e.g. GUI buttons) are used to control the replay.
+    """
+
+    def __init__(self, name, config, replay):
+        """ ReplayModel Class Constructor
+
+            :param name: Name of the journaled model
+            :param config: Journaled model configuration
+            :param replay: Replay controller
+        """
+        super().__init__(name=name)
+        self.config = ReplayConfig(config)
+        self.replay = replay
+
+    def forks(self, philosopher_id):
+        """ Returns the forks associated with a specific philosopher
+
+            :param philosopher_id: Philosopher ID whose forks are being requested
+            :returns: Tuple representing the *left* and *right* forks
+        """
+        return philosopher_id, (philosopher_id + 1) % self.config.philosophers
+
+    def update(self, event):
+        """ Called by views to control the replay
+
+            :param event: View event
+        """
+        if event['event'] is mvc.Event.Events.START:
+            self.replay.set_running()
+        elif event['event'] is mvc.Event.Events.STOP:
+            self.replay.set_stopping()
+        elif event['event'] is mvc.Event.Events.PAUSE:
+            self.replay.set_pause()
+        elif event['event'] is mvc.Event.Events.RESUME:
+            self.replay.set_resume()
+        elif event['event'] is mvc.Event.Events.STEP:
+            self.replay.set_step()
+
+    def run(self):
+        pass
+
+
+class JournalReplay(mvc.Controller):
+    """ Replay a journal into views
+
+        Replay speed is a multiplier of the recorded event timing (e.g. 1.0, 10.0).
+        A speed of None replays as fast as possible.
+    """
+
+    #: named replay speeds
+    SPEEDS = {'1x': 1.0, '10x': 10.0, 'max': None}
+
+    def __init__(self, path, speed=1.0, start=None, echo=False):
+        """ JournalReplay Class Constructor
+
+            :param path: Journal directory
+            :param speed: Replay speed multiplier, None for maximum speed
+            :param start: Optional timestamp to start the replay from
+            :param echo: True, write a line for each replayed event to views supporting *write*
+        """
+        super().__init__(name='Journal Replay', target=self.run)
+        self.journal = Journal(path)
+        self.speed = speed          #: replay speed multiplier
+        self.position = start       #: timestamp of the last replayed event
+        self.echo = echo            #: echo replayed events as text
+        self.seek_to = None         #: pending seek request
+        self.anchor = None          #: (journal time, wall time) used to pace the replay
+        self.models = {name: ReplayModel(name, config, self)
+                       for name, config in self.journal.meta['models'].items()}
+
+    def register(self, view):
+        """ Register a view, the view is registered with all replayed models
+
+            :param view: View to be registered
+        """
+        self.views[view.name] = view
+        for model in self.models.values():
+            view.register(model)
+            model.register(view)
+
+    def update(self, event):
+        """ Called to initiate an update of all views
+
+            :param event: event to be processed
+        """
+        for view in self.views.values():
+            view.update(event)
+
+    def seek(self, timestamp):
+        """ Continue the replay from *timestamp*
+
+            :param timestamp: Journal timestamp to seek to
+        """
+        self.seek_to = timestamp
+
+    def set_speed(self, speed):
+        """ Change the replay speed
+
+            :param speed: Replay speed multiplier, None for maximum speed
+        """
+        self.speed = speed
+        self.anchor = None
+
+    def deliver(self, model, event):
+        """ Deliver a replayed event to the views
+
+            :param model: Name of the model which posted the event
+            :param event: Replayed event
+        """
+        if model in self.models:
+            self.models[model].notify(event)
+        else:
+            self.update(event)
+        if self.echo and event['event'] is not mvc.Event.Events.TIMER:
+            self.logger('[{}] {} {}'.format(event['class'], event.get('text'), event.get('data')))
+
+    def replay(self):
+        """ Replay the journal from the current position until the end, a seek or a stop
+
+            :returns: True if the end of the journal was reached
+        """
+        self.anchor = None
+        for t, model, event in self.journal.records(self.position):
+            if self.seek_to is not None or not self.running:
+                return False
+            if self.pause:
+                while self.pause and self.running and not self.step():
+                    time.sleep(Defines.Times.Pausing)
+                self.anchor = None
+            if self.speed is not None:
+                if self.anchor is None:
+                    self.anchor = (t, time.time())
+                delay = self.anchor[1] + (t - self.anchor[0]) / self.speed - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            self.position = t
+            self.deliver(model, event)
+        return True
+
+    def run(self):
+        """ Replay running """
+        while not self.running:
+            time.sleep(Defines.Times.Starting)
+        while self.running:
+            if self.replay():
+                self.logger('Replay complete')
+                self.running = False
+            elif self.seek_to is not None:
+                self.position, self.seek_to = self.seek_to, None
+
+
+if __name__ == '__main__':
+    """ Replay a journal from the command line """
+    parser = argparse.ArgumentParser(description='Replay a StateEngineCrank simulation journal.')
+    parser.add_argument('journal', help='journal directory')
+    parser.add_argument('--speed', choices=JournalReplay.SPEEDS.keys(), default='1x', help='replay speed')
+    parser.add_argument('--seek', type=float, default=0.0, help='seconds from the start of the journal')
+    parser.add_argument('--views', default='console', help='comma separated list of views [console,gui]')
+    args = parser.parse_args()
+
+    view_names = args.views.split(',')
+    replay = JournalReplay(args.journal, speed=JournalReplay.SPEEDS[args.speed], echo='gui' not in view_names)
+    if args.seek:
+        replay.position = replay.journal.start_time() + args.seek
+    views = []
+    if 'console' in view_names:
+        from console import ConsoleView
+        views.append(ConsoleView())
+    if 'gui' in view_names:
+        from gui import GuiView
+        views.append(GuiView())
+    for view in views:
+        replay.register(view)
+        view.thread.start()
+        view.set_running()
+
+    replay.start()
+    replay.set_running()
+    while replay.running:
+        time.sleep(Defines.Times.Running)
+    for view in views:
+        view.set_stopping()
@@ -8,9 +8,12 @@ Provides control for:
 * DiningPhilosophers simulation
 * SleepingBarber simulation
 
+Views are imported only when selected, console-only and headless runs do not import Tk.
+
 """
 
 # System imports
+import argparse
 import time
 
 # Project imports
@@ -19,9 +22,10 @@ import DiningPhilosophers.main as philosophers
 import SleepingBarber.main as barbers
 
 # import view
-from console import ConsoleView
-from gui import GuiView
+from journal import JournalView
+from metrics import Metrics
 from mvc import Controller
+from StateEngineCrank.modules.StateBoard import StateBoard
 
 
 class Unimplemented(Exception):
@@ -31,36 +35,58 @@ class Unimplemented(Exception):
 class Main(Controller):
     """ Main code """
 
-    def __init__(self):
-        super().__init__(name='State Engine Main', target=self.run)
-
-        # dictionary of models
-        self.models = {
-            'philosophers': philosophers.DiningPhilosophers(exit_when_done=False),
-            'barbers': barbers.SleepingBarber(exit_when_done=False)
-        }
+    #: views which may be selected
+    VIEWS = ['console', 'gui']
 
-        # dictionary of views, instantiated
-        self.views = {
-            'console': ConsoleView(),
-            'gui': GuiView()
-        }
+    def __init__(self, journal=None, views=None, headless=False):
+        """ Main Class Constructor
 
-        # register models and views
+            :param journal: Optional directory, all model events are journaled when given
+            :param views: Names of the views to run, default is all *VIEWS*
+            :param headless: True, the GUI view renders without a display
+        """
+        super().__init__(name='State Engine Main', target=self.run)
+        if views is None:
+            views = self.VIEWS
+
+        # models
+        models = [
+            philosophers.DiningPhilosophers(exit_when_done=False),
+            barbers.SleepingBarber(exit_when_done=False)
+        ]
+
+        # views, imported and instantiated only when selected
+        view_names = views
+        views = []
+        if 'console' in view_names:
+            from console import ConsoleView
+            views.append(ConsoleView())
+        if 'gui' in view_names:
+            from gui import GuiView
+            views.append(GuiView(headless=headless))
+        if journal is not None:
+            views.append(JournalView(journal))
+
+        # add model metrics collectors when metrics are being served
+        if Metrics().active:
+            for m in models:
+                Metrics().add_collector(m.metrics)
+
+        # register models and views, model events are routed to views by our router
+        for m in models:
+            self.register(m)
+        for v in views:
+            self.register(v)
         self._register_models()
-        self._register_views()
+
+        # without an interactive GUI there is no start button, we start the models ourselves
+        self.autostart = 'gui' not in view_names
 
         # start our thread of execution
         self.start()
 
-    def _register_views(self):
-        """ register views with models """
-        for m in self.models.keys():
-            for v in self.views.values():
-                self.models[m].register(v)
-
     def _register_models(self):
-        """ register models with views """
+        """ register models with views, view events are sent directly to models """
         for v in self.views.keys():
             for m in self.models.values():
                 self.views[v].register(m)
@@ -93,6 +119,9 @@ class Main(Controller):
         # Models are started running from the Views
         for v in self.views.keys():
             self.views[v].set_running()
+        if self.autostart:
+            for m in self.models.keys():
+                self.models[m].set_running()
 
         # main loop of execution
         while self.running:
@@ -100,6 +129,7 @@ class Main(Controller):
 
         # Tell all views and models to stop
         self.stopping = True
+        self.router.stop()
         for v in self.views.keys():
             self.views[v].thread.stop()
         for m in self.models.keys():
@@ -108,5 +138,16 @@ class Main(Controller):
 
 if __name__ == '__main__':
     """ Run from the command line """
-    main = Main()
+    parser = argparse.ArgumentParser(description='StateEngineCrank simulations.')
+    parser.add_argument('--journal', help='journal all model events to this directory')
+    parser.add_argument('--board', help='publish state machine status to this shared memory state board')
+    parser.add_argument('--metrics', type=int, metavar='PORT', help='serve metrics on localhost at this port')
+    parser.add_argument('--views', default=','.join(Main.VIEWS), help='comma separated list of views [console,gui]')
+    parser.add_argument('--headless', action='store_true', help='run without a display, the GUI view renders headless')
+    args = parser.parse_args()
+    if args.board:
+        StateBoard().create(name=args.board)
+    if args.metrics is not None:
+        Metrics().serve(port=args.metrics)
+    main = Main(journal=args.journal, views=args.views.split(','), headless=args.headless)
     main.running = True
@@ -0,0 +1,300 @@
+""" StateEngineCrank Metrics
+
+Optional metrics exposition endpoint for state machines and simulations.
+
+When enabled, every PyState state machine maintains a small set of counters (events, transitions,
+current state, event queue depth and guard function latency). The counters are written only by the
+thread running the state machine and are pre-aggregated, a scrape reads them without taking any
+state machine or simulation locks and never perturbs the state machine hot path.
+
+Simulations add collectors for their own pre-aggregated values (e.g. SleepingBarber statistics).
+
+The endpoint is served by a local :mod:`http.server` thread in Prometheus text format::
+
+    metrics = Metrics()
+    metrics.enable()                # before the state machines are created
+    host, port = metrics.serve(port=9100)
+
+    curl http://127.0.0.1:9100/metrics
+"""
+
+# System imports
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#: metric name prefix
+PREFIX = 'crank_'
+
+#: content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Borg(object):
+    """ The Borg class ensures that all instantiations refer to the same state and behavior. """
+
+    _shared_state = {}
+
+    def __init__(self):
+        self.__dict__ = self._shared_state
+
+
+class MachineMetrics(object):
+    """ Counters maintained by a single state machine
+
+        All updates are made by the thread running the state machine.
+    """
+
+    def __init__(self, machine, state):
+        """ MachineMetrics Class Constructor
+
+            :param machine: State machine class name
+            :param state: State machine startup state
+        """
+        self.machine = machine          #: state machine class name
+        self.state = state              #: current state
+        self.events = 0                 #: number of events processed
+        self.transitions = 0            #: number of state transitions taken
+        self.queue_depth = 0            #: event queue depth when the last event was processed
+        self.guard_calls = 0            #: number of guard function calls
+        self.guard_ns = 0               #: total guard function time (nanoseconds)
+
+    def event(self, queue_depth):
+        """ Count an event
+
+            :param queue_depth: Number of events waiting in the event queue
+        """
+        self.events += 1
+        self.queue_depth = queue_depth
+
+    def transition(self, state):
+        """ Count a state transition
+
+            :param state: New state
+        """
+        self.transitions += 1
+        self.state = state
+
+    def guard(self, guard_func, sm):
+        """ Call and time a guard function
+
+            :param guard_func: Guard function
+            :param sm: State machine passed to the guard function
+            :returns: Guard function result
+        """
+        t0 = time.perf_counter_ns()
+        result = guard_func(sm)
+        self.guard_ns += time.perf_counter_ns() - t0
+        self.guard_calls += 1
+        return result
+
+
+class Metrics(Borg):
+    """ Metrics registry and exposition endpoint """
+
+    def __init__(self):
+        Borg.__init__(self)
+        if self._shared_state:
+            return
+        self.active = False         #: True when state machines maintain counters
+        self.lock = threading.Lock()
+        self.machines = set()       #: counters of the live state machines
+        self.retired = {}           #: totals of state machines no longer running, keyed by class name
+        self.registry = None        #: (machines, retired) copied for scrapes, None when out of date
+        self.collectors = []        #: functions returning additional metric families
+        self.last_scrape = None     #: (time, transitions) at the previous scrape
+        self.server = None          #: HTTP server, None when not serving
+        self.thread = None          #: HTTP server thread
+
+    def enable(self):
+        """ Enable metrics, state machines created from now on maintain counters """
+        self.active = True
+
+    def machine(self, machine, state):
+        """ Allocate counters for a state machine
+
+            :param machine: State machine class name
+            :param state: State machine startup state
+            :returns: MachineMetrics, None when metrics are not enabled
+        """
+        if not self.active:
+            return None
+        metrics = MachineMetrics(machine, state)
+        with self.lock:
+            self.machines.add(metrics)
+            self.registry = None
+        return metrics
+
+    def retire(self, metrics):
+        """ Fold the counters of a state machine which is no longer running into the totals
+
+            :param metrics: MachineMetrics returned by machine()
+        """
+        if metrics is None:
+            return
+        with self.lock:
+            if metrics not in self.machines:
+                return
+            self.machines.remove(metrics)
+            self.registry = None
+            totals = self.retired.setdefault(metrics.machine, [0, 0, 0, 0])
+            totals[0] += metrics.events
+            totals[1] += metrics.transitions
+            totals[2] += metrics.guard_calls
+            totals[3] += metrics.guard_ns
+
+    def add_collector(self, collector):
+        """ Add a collector of additional metrics
+
+            A collector returns a list of metric families, each a tuple of
+            (name, type, help, [(labels dictionary, value), ...]). A summary family is a tuple of
+            (name, 'summary', help, sums, counts[, quantiles]), each a list of (labels dictionary, value),
+            quantile samples being labelled with their *quantile*.
+            Collectors must only read pre-aggregated values and not take any locks.
+
+            :param collector: Collector function
+        """
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def snapshot(self):
+        """ Live state machines and retired totals, copied only when machines have come or gone
+
+            :returns: Tuple of (machines, retired)
+        """
+        registry = self.registry
+        if registry is None:
+            with self.lock:
+                if self.registry is None:
+                    self.registry = (tuple(self.machines), {k: tuple(v) for k, v in self.retired.items()})
+                registry = self.registry
+        return registry
+
+    def families(self):
+        """ Collect all metric families
+
+            :returns: List of (name, type, help, samples) tuples
+        """
+        machines, retired = self.snapshot()
+
+        events = {}
+        transitions = {}
+        guard_calls = {}
+        guard_ns = {}
+        for machine, totals in retired.items():
+            events[machine], transitions[machine], guard_calls[machine], guard_ns[machine] = totals
+        occupancy = {}
+        queue_depth = {}
+        for m in machines:
+            events[m.machine] = events.get(m.machine, 0) + m.events
+            transitions[m.machine] = transitions.get(m.machine, 0) + m.transitions
+            guard_calls[m.machine] = guard_calls.get(m.machine, 0) + m.guard_calls
+            guard_ns[m.machine] = guard_ns.get(m.machine, 0) + m.guard_ns
+            state = (m.machine, getattr(m.state, 'name', str(m.state)))
+            occupancy[state] = occupancy.get(state, 0) + 1
+            queue_depth[m.machine] = queue_depth.get(m.machine, 0) + m.queue_depth
+
+        total = sum(transitions.values())
+        rate = 0.0
+        with self.lock:
+            now = time.monotonic()
+            if self.last_scrape is not None and now > self.last_scrape[0]:
+                rate = (total - self.last_scrape[1]) / (now - self.last_scrape[0])
+            self.last_scrape = (now, total)
+
+        families = [
+            ('events_total', 'counter', 'State machine events processed',
+             [({'machine': k}, v) for k, v in events.items()]),
+            ('transitions_total', 'counter', 'State machine state transitions taken',
+             [({'machine': k}, v) for k, v in transitions.items()]),
+            ('transitions_per_second', 'gauge', 'State transitions per second since the previous scrape',
+             [({}, rate)]),
+            ('state_occupancy', 'gauge', 'Number of state machines in each state',
+             [({'machine': k[0], 'state': k[1]}, v) for k, v in occupancy.items()]),
+            ('queue_depth', 'gauge', 'State machine event queue depth',
+             [({'machine': k}, v) for k, v in queue_depth.items()]),
+            ('guard_seconds', 'summary', 'State machine guard function latency',
+             [({'machine': k}, v / 1e9) for k, v in guard_ns.items()],
+             [({'machine': k}, v) for k, v in guard_calls.items()]),
+        ]
+        for collector in list(self.collectors):
+            families.extend(collector())
+        return families
+
+    def exposition(self):
+        """ Format all metrics in Prometheus text exposition format
+
+            :returns: Exposition text
+        """
+        lines = []
+        for family in self.families():
+            name, type_, help_, samples = family[:4]
+            name = PREFIX + name
+            lines.append('# HELP %s %s' % (name, help_))
+            lines.append('# TYPE %s %s' % (name, type_))
+            if type_ == 'summary':
+                if len(family) > 5:
+                    lines.extend(sample(name, labels, v) for labels, v in family[5])
+                lines.extend(sample(name + '_sum', labels, v) for labels, v in samples)
+                lines.extend(sample(name + '_count', labels, v) for labels, v in family[4])
+            else:
+                lines.extend(sample(name, labels, v) for labels, v in samples)
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, host='127.0.0.1', port=0):
+        """ Start serving metrics on a local HTTP server thread
+
+            :param host: Interface to listen on
+            :param port: Port to listen on, 0 to choose a free port
+            :returns: (host, port) being served
+        """
+        self.enable()
+        if self.server is None:
+            self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+            self.server.daemon_threads = True
+            self.thread = threading.Thread(name='metrics', target=self.server.serve_forever, daemon=True)
+            self.thread.start()
+        return self.server.server_address[:2]
+
+    def shutdown(self):
+        """ Stop serving metrics """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+            self.thread = None
+
+
+def sample(name, labels, value):
+    """ Format a metric sample
+
+        :param name: Metric name
+        :param labels: Dictionary of labels
+        :param value: Sample value
+        :returns: Exposition line
+    """
+    if labels:
+        text = ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                        for k, v in labels.items())
+        return '%s{%s} %s' % (name, text, value)
+    return '%s %s' % (name, value)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """ Serves GET /metrics """
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = Metrics().exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format_, *args):
+        """ Do not log scrapes """
+        pass
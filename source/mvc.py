@@ -6,6 +6,8 @@ import threading
 import datetime
 import copy
 import enum
+import collections
+from concurrent import futures
 
 # Project Imports
 import Defines
@@ -282,6 +284,168 @@ class Event(Borg):
         return event_
 
 
+class Router(object):
+    """ Event router owned by a Controller
+
+        The router owns the routing table, a map of topics to subscribed views.
+        Models publish events to their topic without knowing their views. Publishing
+        is O(1), events are queued and delivered by the router thread once per tick,
+        each subscribed view receiving all of its events for the tick as a single batch.
+
+        Events are queued in a single FIFO. Each view's batch holds its events in the
+        order they were published, whichever topics they were published to. An event
+        is delivered at most one tick after it was published.
+    """
+
+    def __init__(self, name='Router', tick=None):
+        """ Router Class Constructor
+
+            :param name: Router (thread) name
+            :param tick: Delivery interval (seconds), defaults to Defines.Times.Routing
+        """
+        self.name = name                        #: name of this router
+        self.tick = Defines.Times.Routing if tick is None else tick
+        self.routes = {}                        #: topic -> tuple of subscribed views
+        self.pending = collections.deque()      #: published (topic, event) awaiting delivery
+        self.lock = threading.Lock()            #: serializes routing table updates
+        self.thread = None                      #: router thread, created when started
+        self._stop_event = threading.Event()    #: event used to stop our thread
+
+    def subscribe(self, topic, view):
+        """ Subscribe a view to a topic, subscribing more than once has no effect
+
+            :param topic: Topic (model name)
+            :param view: View to receive the topic events
+        """
+        with self.lock:
+            views = self.routes.get(topic, ())
+            if view not in views:
+                self.routes[topic] = views + (view,)
+
+    def unsubscribe(self, topic, view):
+        """ Unsubscribe a view from a topic
+
+            :param topic: Topic (model name)
+            :param view: View to be removed
+        """
+        with self.lock:
+            views = self.routes.get(topic, ())
+            if view in views:
+                self.routes[topic] = tuple(v for v in views if v is not view)
+
+    def publish(self, topic, event):
+        """ Queue an event for delivery to the topic subscribers
+
+            :param topic: Topic (model name)
+            :param event: Prepared event
+        """
+        self.pending.append((topic, event))
+
+    def dispatch(self):
+        """ Deliver all pending events, batched per view in the order they were published
+
+            :returns: Number of events delivered
+        """
+        batches = {}
+        pending = self.pending
+        routes = self.routes
+        count = 0
+        while pending:
+            topic, event = pending.popleft()
+            for view in routes.get(topic, ()):
+                batch = batches.get(view)
+                if batch is None:
+                    batches[view] = batch = []
+                batch.append(event)
+            count += 1
+        for view, events in batches.items():
+            try:
+                view.update_batch(events)
+            except Exception as e:
+                Logger.print_('router[%s]: %s update failed: %r' % (self.name, view.name, e))
+        return count
+
+    def start(self):
+        """ Start the router thread, starting more than once has no effect """
+        if self.thread is None:
+            self._stop_event.clear()
+            self.thread = threading.Thread(name=self.name, target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        """ Router thread, delivers pending events once per tick """
+        while not self._stop_event.wait(self.tick):
+            self.dispatch()
+        self.dispatch()
+
+    def stop(self):
+        """ Stop the router thread after delivering any pending events """
+        if self.thread is not None:
+            self._stop_event.set()
+            self.thread.join(timeout=Defines.Times.Stopping)
+            self.thread = None
+        self.dispatch()
+
+
+class Cancellation(object):
+    """ Cancellation token shared by a model and the models which adopt it
+
+        Cancelling wakes everyone sleeping on the token and calls the registered callbacks.
+        Simulated time then passes without delay, so models run through to their final
+        states and stop in milliseconds.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()  #: set when cancelled
+        self.callbacks = []             #: functions called when cancelled
+        self.lock = threading.Lock()    #: protects *callbacks*
+
+    @property
+    def cancelled(self):
+        """ True when cancelled """
+        return self.event.is_set()
+
+    def cancel(self):
+        """ Cancel, waking sleepers and calling the registered callbacks """
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """ Register a function to be called when cancelled, it is called at once if already cancelled
+
+            :param callback: Function (no arguments)
+        """
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def sleep(self, seconds):
+        """ Sleep, returning early when cancelled
+
+            :param seconds: Seconds to sleep
+            :returns: True if cancelled
+        """
+        return self.event.wait(seconds)
+
+
+def wait(models, timeout=None):
+    """ Wait for the threads of models to complete, see *MVC.completion*
+
+        :param models: List of models
+        :param timeout: Maximum seconds to wait, None to wait forever
+        :returns: List of models whose threads have not completed
+    """
+    futures.wait([m.completion for m in models], timeout=timeout)
+    return [m for m in models if not m.completion.done()]
+
+
 class MVC(ABC):
     """ Base class definition of an MVC Model, View or Controller
 
@@ -293,8 +457,9 @@ class MVC(ABC):
 
     def __init__(self, name=None, **kwargs):
 
+        self.completion = futures.Future()      #: completes when a thread created from *target* returns
         if 'target' in kwargs:
-            self.thread = threading.Thread(name=name, target=kwargs.pop('target'))
+            self.thread = threading.Thread(name=name, target=self._complete, args=(kwargs.pop('target'),))
         elif 'thread' in kwargs:
             self.thread = kwargs.pop('thread')  #: optional thread for execution
         else:
@@ -312,6 +477,24 @@ class MVC(ABC):
         self.resuming = True                    #: resuming status
         self._step_event = threading.Event()    #: event used to step our thread
         self._stop_event = threading.Event()    #: event used to stop our thread
+        self.cancellation = Cancellation()      #: cancellation token, shared with models adopting us
+
+    def _complete(self, target):
+        """ Thread function, runs *target* and completes *completion* """
+        try:
+            target()
+        except BaseException as e:
+            self.completion.set_exception(e)
+            raise
+        self.completion.set_result(None)
+
+    def sleep(self, seconds):
+        """ Sleep for a number of simulated seconds (see *Defines.time_scale*), returning early when cancelled
+
+            :param seconds: Simulated seconds
+            :returns: True if cancelled
+        """
+        return self.cancellation.sleep(seconds * Defines.time_scale)
 
     def start(self):
         """ Function to start thread execution """
@@ -409,11 +592,12 @@ class MVC(ABC):
         pass
 
     def stop(self):
-        """ Initiate stopping """
+        """ Initiate stopping, cancelling our cancellation token, and join our thread """
         self.stopping = True
         self.running = False
         self.pause = False
         self.clr_step()
+        self.cancellation.cancel()
         self.thread.join(timeout=Defines.Times.Stopping)
         self.stopping = False
 
@@ -456,19 +640,29 @@ class Controller(MVC, Logger):
     def __init__(self, name=None, **kwargs):
         MVC.__init__(self, name=name, **kwargs)
         Logger.__init__(self, self)
-        self.models = {}    #: dictionary of models under our control
-        self.views = {}     #: dictionary of views to be updated
+        self.models = {}        #: dictionary of models under our control
+        self.views = {}         #: dictionary of views to be updated
+        self.router = Router(name='%s Router' % name)  #: routes model events to views
 
     def register(self, mv):
         """ Called to register a model or view with the controller
 
+            * Models are attached to the router and publish to a topic of their own name.
+            * Views are registered with, and subscribed to the topics of, all models.
+
             :param mv: model/view to be registered
             :raises: InvalidMVC
         """
         if isinstance(mv, View):
             self.views[mv.name] = mv
-        if isinstance(mv, Model):
+            for m in self.models.values():
+                m.register(mv)
+        elif isinstance(mv, Model):
             self.models[mv.name] = mv
+            mv.attach(self.router)
+            for v in self.views.values():
+                mv.register(v)
+            self.router.start()
         else:
             raise exceptions.InvalidMVC
 
@@ -488,10 +682,10 @@ class Controller(MVC, Logger):
         event_ = self.prepare(event, **kwargs)
         event_type = event_['type'].lower()
         if event_type == 'model' or event_type == '*':
-            for v in self.views:
+            for v in self.views.values():
                 v.update(event_)
         if event_type == 'view' or event_type == '*':
-            for m in self.models:
+            for m in self.models.values():
                 m.update(event_)
 
     @abstractmethod
@@ -507,12 +701,17 @@ class Model(MVC, Logger):
         Communications of model events and state is accomplished via events.
         Model events are communicated to registered views via the *notify* function.
         View events are communicated to the model via the *update* function.
+
+        A model attached to a Controller's router publishes its events to the router,
+        otherwise events are delivered directly to each registered view.
     """
 
     def __init__(self, name=None, **kwargs):
         MVC.__init__(self, name=name, **kwargs)
         Logger.__init__(self, self)
         self.views = {}         #: dictionary of views we update
+        self.router = None      #: router we publish to, None to update views directly
+        self.topic = name       #: router topic we publish to
 
     def register(self, view):
         """ Register a view with us
@@ -522,9 +721,44 @@ class Model(MVC, Logger):
         """
         if isinstance(view, View):
             self.views[view.name] = view
+            if self.router is not None:
+                self.router.subscribe(self.topic, view)
         else:
             raise exceptions.InvalidView(view)
 
+    def attach(self, router, topic=None):
+        """ Attach us, and our children, to a router
+
+            :param router: Router to publish to
+            :param topic: Topic to publish to, defaults to our name
+        """
+        self.router = router
+        self.topic = topic if topic is not None else self.name
+        for v in self.views.values():
+            router.subscribe(self.topic, v)
+        for child in self.children():
+            child.attach(router, self.topic)
+
+    def adopt(self, parent):
+        """ Adopt the views, router, topic and cancellation token of a parent model
+
+            Child models (e.g. simulation actors) share their parent's views
+            rather than registering with each view individually.
+
+            :param parent: Parent model
+        """
+        self.views = parent.views
+        self.router = parent.router
+        self.topic = parent.topic
+        self.cancellation = parent.cancellation
+
+    def children(self):
+        """ Child models which publish to our topic
+
+            :returns: List of child models
+        """
+        return []
+
     def notify(self, event, **kwargs):
         """ Called to send notification of a Model event
 
@@ -533,6 +767,9 @@ class Model(MVC, Logger):
             :param event: Model event to be sent
         """
         event_ = self.prepare(event, **kwargs)
+        if self.router is not None:
+            self.router.publish(self.topic, event_)
+            return
         for vk in self.views.keys():
             self.views[vk].update(event_)
 
@@ -592,6 +829,16 @@ class View(MVC, Logger):
         """
         pass
 
+    def update_batch(self, events):
+        """ Called by a router to notify us about a batch of events.
+
+            Views may override this to process a batch more efficiently.
+
+            :param events: List of events to be processed, in order of occurrence
+        """
+        for event in events:
+            self.update(event)
+
     @abstractmethod
     def run(self):
         """ Called to initiate running """
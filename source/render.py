@@ -0,0 +1,209 @@
+""" StateEngineCrank GUI Render Backends
+
+The GUI animations draw through a render backend rather than directly on a Tk canvas.
+
+* TkBackend draws on a Tk canvas.
+* HeadlessBackend records draw operations into an in-memory display list, no display is required.
+  The GUI views can be run and profiled without a display and render cost can be measured.
+
+The backend interface follows the subset of the Tk canvas interface used by the animations.
+"""
+
+# System imports
+from abc import ABC, abstractmethod
+
+
+class Backend(ABC):
+    """ Render backend interface """
+
+    #: True if the backend displays Tk widgets (frames, buttons, console)
+    widgets = False
+
+    @abstractmethod
+    def create_oval(self, x1, y1, x2, y2, **options):
+        """ Create an oval item
+
+            :returns: item ID
+        """
+        pass
+
+    @abstractmethod
+    def create_text(self, x, y, **options):
+        """ Create a text item
+
+            :returns: item ID
+        """
+        pass
+
+    @abstractmethod
+    def create_rectangle(self, x1, y1, x2, y2, **options):
+        """ Create a rectangle item
+
+            :returns: item ID
+        """
+        pass
+
+    @abstractmethod
+    def coords(self, item, *coords):
+        """ Move an item
+
+            :param item: item ID
+            :param coords: new item coordinates
+        """
+        pass
+
+    @abstractmethod
+    def itemconfigure(self, item, **options):
+        """ Change item options
+
+            :param item: item ID
+            :param options: item options to change
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, item):
+        """ Delete an item
+
+            :param item: item ID
+        """
+        pass
+
+    @abstractmethod
+    def find_all(self):
+        """ All items
+
+            :returns: tuple of item IDs
+        """
+        pass
+
+    @abstractmethod
+    def after(self, ms, func):
+        """ Schedule a function to be called in the render thread
+
+            :param ms: delay in milliseconds
+            :param func: function to call
+        """
+        pass
+
+
+class TkBackend(Backend):
+    """ Render backend drawing on a Tk canvas """
+
+    widgets = True
+
+    def __init__(self, root, canvas):
+        """ TkBackend Class Constructor
+
+            :param root: Tk root
+            :param canvas: Tk canvas to draw on
+        """
+        self.root = root
+        self.canvas = canvas
+
+    def create_oval(self, x1, y1, x2, y2, **options):
+        return self.canvas.create_oval(x1, y1, x2, y2, **options)
+
+    def create_text(self, x, y, **options):
+        return self.canvas.create_text(x, y, **options)
+
+    def create_rectangle(self, x1, y1, x2, y2, **options):
+        return self.canvas.create_rectangle(x1, y1, x2, y2, **options)
+
+    def coords(self, item, *coords):
+        self.canvas.coords(item, *coords)
+
+    def itemconfigure(self, item, **options):
+        self.canvas.itemconfigure(item, **options)
+
+    def delete(self, item):
+        self.canvas.delete(item)
+
+    def find_all(self):
+        return self.canvas.find_all()
+
+    def after(self, ms, func):
+        self.root.after(ms, func)
+
+
+class HeadlessBackend(Backend):
+    """ Render backend recording draw operations into an in-memory display list
+
+        The display list maps item IDs to [kind, coordinates, options].
+        Every draw operation is counted so render cost per event can be measured.
+    """
+
+    def __init__(self):
+        self.display_list = {}      #: item ID -> [kind, coordinates, options]
+        self.next_id = 0            #: last item ID allocated
+        self.operations = 0         #: number of draw operations performed
+        self.scheduled = None       #: last function scheduled by after()
+
+    def _create(self, kind, coords, options):
+        self.operations += 1
+        self.next_id += 1
+        self.display_list[self.next_id] = [kind, coords, dict(options)]
+        return self.next_id
+
+    def create_oval(self, x1, y1, x2, y2, **options):
+        return self._create('oval', (x1, y1, x2, y2), options)
+
+    def create_text(self, x, y, **options):
+        return self._create('text', (x, y), options)
+
+    def create_rectangle(self, x1, y1, x2, y2, **options):
+        return self._create('rectangle', (x1, y1, x2, y2), options)
+
+    def coords(self, item, *coords):
+        self.operations += 1
+        self.display_list[item][1] = coords
+
+    def itemconfigure(self, item, **options):
+        self.operations += 1
+        self.display_list[item][2].update(options)
+
+    def delete(self, item):
+        self.operations += 1
+        self.display_list.pop(item, None)
+
+    def find_all(self):
+        return tuple(self.display_list.keys())
+
+    def after(self, ms, func):
+        """ Frames are driven by the caller (see gui.Animation.draw_frame), the function is only recorded """
+        self.scheduled = func
+
+
+class ConsoleBuffer(object):
+    """ In-memory stand-in for the Tk console text widget, used with the HeadlessBackend
+
+        Supports the subset of the Tk Text interface used by the GUI console views.
+        Indices are 'end' or Tk style 'line.column' strings.
+    """
+
+    def __init__(self):
+        self.lines = ['']       #: console text, one entry per line
+
+    def insert(self, index, text):
+        """ Insert text, only insertion at the end is supported """
+        parts = text.split('\n')
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+
+    def delete(self, first, last=None):
+        """ Delete whole lines from *first* up to, but not including, *last* """
+        first = int(str(first).split('.')[0]) - 1
+        last = first + 1 if last is None else int(str(last).split('.')[0]) - 1
+        del self.lines[first:last]
+        if not self.lines:
+            self.lines = ['']
+
+    def index(self, index):
+        """ Only 'end-1c' is supported, returns the 'line.column' of the last character """
+        return '%d.%d' % (len(self.lines), len(self.lines[-1]))
+
+    def see(self, index):
+        pass
+
+    def get(self, first='1.0', last='end'):
+        return '\n'.join(self.lines)
@@ -0,0 +1,210 @@
+""" StateEngineCrank Shards
+
+Runs a number of independent simulations, Sleeping Barber shops or Dining Philosophers
+tables, in one invocation and merges their statistics.
+
+* Each shard executes in a fresh worker process of a process pool (see *sweep.pool()*),
+  simulation configuration, waiting room, waiter and statistics are process wide (Borg)
+  so every shard has its own and shards use all cores
+* Shard *n* is seeded with *seed + n*
+* Shard statistics are returned as online accumulators (see *accumulators*) and merged,
+  the merged report covers every customer or philosopher of every shard
+
+Run from the *source* directory::
+
+    python shards.py barbers --shards 16 --set barbers=3 --set customer_rate=2 --scale 0.005
+    python shards.py philosophers --shards 8 --set philosophers=7 --jobs 4 --output shards.json
+"""
+
+# System imports
+import argparse
+import json
+import os
+import random
+import time
+
+# Project imports
+import Defines
+import distributions
+import sweep
+from accumulators import Accumulator
+
+
+def shop(params, seed):
+    """ Run a Sleeping Barber shop
+
+        :param params: Configuration parameters
+        :param seed: Shard seed
+        :returns: Dictionary of shop statistics
+    """
+    s = sweep.barber_shop(params, seed).statistics
+    return {
+        'customers': s.customers(),
+        'served': s.barber_total_customers,
+        'lost_customers': s.lost_customers,
+        'max_waiters': s.max_waiters,
+        'elapsed': s.customers_elapsed.snapshot(),
+        'cutting': s.customers_cutting.snapshot(),
+        'waiting': s.customers_waiting.snapshot(),
+    }
+
+
+def table(params, seed):
+    """ Run a Dining Philosophers table
+
+        :param params: Configuration parameters
+        :param seed: Shard seed, the global random number generator is seeded with it
+        :returns: Dictionary of table statistics
+    """
+    model = sweep.dining_table(params)
+    fairness = model.waiter.fairness_snapshot()
+    hungry = Accumulator()
+    starvation = Accumulator()
+    for p, longest in zip(model.philosophers, fairness['starvation']):
+        hungry.add(p.hungry_seconds)
+        starvation.add(longest)
+    return {
+        'philosophers': len(model.philosophers),
+        'eating_seconds': sum(p.eating_seconds for p in model.philosophers),
+        'thinking_seconds': sum(p.thinking_seconds for p in model.philosophers),
+        'meals': sum(fairness['meals']),
+        'hungry': hungry,
+        'starvation': starvation,
+    }
+
+
+#: simulation -> function running a shard of the simulation
+SHARDS = {
+    'barbers': shop,
+    'philosophers': table,
+}
+
+#: statistics merged by taking the maximum rather than the sum
+MAXIMUM = ('max_waiters', 'wall_seconds')
+
+
+def simulate(run):
+    """ Execute a single shard, called in a worker process
+
+        :param run: Shard dictionary, simulation, params, shard, seed and scale
+        :returns: Dictionary of shard statistics
+    """
+    random.seed(run['seed'])
+    Defines.time_scale = run['scale']
+    start = time.perf_counter()
+    stats = SHARDS[run['simulation']](run['params'], run['seed'])
+    stats['shard'] = run['shard']
+    stats['wall_seconds'] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def merge(results):
+    """ Merge shard statistics
+
+        :param results: List of shard statistics
+        :returns: Dictionary of merged statistics
+    """
+    merged = {}
+    for stats in results:
+        for name, value in stats.items():
+            if name == 'shard':
+                continue
+            if isinstance(value, Accumulator):
+                merged.setdefault(name, Accumulator(value.bounds)).merge(value)
+            elif name in MAXIMUM:
+                merged[name] = max(merged.get(name, value), value)
+            else:
+                merged[name] = merged.get(name, 0) + value
+    merged['shards'] = len(results)
+    return merged
+
+
+def summary(stats):
+    """ Format statistics on a single line
+
+        :param stats: Shard or merged statistics
+        :returns: Text
+    """
+    fields = []
+    for name, value in stats.items():
+        if isinstance(value, Accumulator):
+            fields.append('%s: n=%d mean=%.1f p50=%.1f p99=%.1f max=%.1f' % (
+                name, value.count, value.mean, value.percentile(0.5) or 0, value.percentile(0.99) or 0, value.max or 0))
+        else:
+            fields.append('%s: %s' % (name, value))
+    return '  '.join(fields)
+
+
+def plain(stats):
+    """ Statistics as JSON serializable values, accumulators are summarized
+
+        :param stats: Shard or merged statistics
+        :returns: Dictionary
+    """
+    values = {}
+    for name, value in stats.items():
+        if isinstance(value, Accumulator):
+            value = {'count': value.count, 'mean': value.mean, 'stddev': value.stddev, 'min': value.min,
+                     'max': value.max, 'p50': value.percentile(0.5), 'p90': value.percentile(0.9),
+                     'p99': value.percentile(0.99)}
+        values[name] = value
+    return values
+
+
+def execute(simulation, params, shards, seed, scale, jobs, log=print):
+    """ Execute shards on a process pool
+
+        :param simulation: Simulation name
+        :param params: Configuration parameters, the same for every shard
+        :param shards: Number of shards
+        :param seed: Seed of the first shard
+        :param scale: Time scale, real seconds per simulated second
+        :param jobs: Number of worker processes
+        :param log: Function called with a line for every completed shard
+        :returns: List of shard statistics, in shard order
+    """
+    run_list = [{'simulation': simulation, 'params': params, 'shard': n, 'seed': seed + n, 'scale': scale}
+                for n in range(shards)]
+    results = []
+    executor, method = sweep.pool(jobs)
+    with executor:
+        for stats in getattr(executor, method)(simulate, run_list):
+            results.append(stats)
+            log('[%d/%d] %s' % (len(results), shards, summary(stats)))
+    return results
+
+
+if __name__ == '__main__':
+    """ Run from the command line """
+    parser = argparse.ArgumentParser(description='Run sharded StateEngineCrank simulations.')
+    parser.add_argument('simulation', choices=SHARDS.keys(), help='simulation to run')
+    parser.add_argument('--shards', type=int, default=os.cpu_count(), help='number of shops or tables')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='parameter value, may be repeated')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first shard')
+    parser.add_argument('--scale', type=float, default=0.01, help='real seconds per simulated second')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--output', help='write shard and merged statistics to this JSON file')
+    args = parser.parse_args()
+
+    parameters = {}
+    for setting in args.set:
+        name, _, text = setting.partition('=')
+        if name not in sweep.PARAMETERS[args.simulation]:
+            parser.error('unknown %s parameter: %s, choose from %s' % (
+                args.simulation, name, ', '.join(sweep.PARAMETERS[args.simulation])))
+        try:
+            if name in sweep.DISTRIBUTIONS:
+                distributions.create(text)
+                parameters[name] = text
+            else:
+                parameters[name] = int(text)
+        except ValueError as e:
+            parser.error('%s: %s' % (name, e))
+
+    shard_results = execute(args.simulation, parameters, args.shards, args.seed, args.scale, args.jobs)
+    totals = merge(shard_results)
+    print('merged %s' % summary(totals))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'shards': [plain(r) for r in shard_results], 'merged': plain(totals)}, f, indent=2)
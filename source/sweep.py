@@ -0,0 +1,260 @@
+""" StateEngineCrank Parameter Sweep
+
+Runs a simulation over ranges of configuration parameters and collects the statistics
+of every run into a result table.
+
+* Each run is seeded and executes in a fresh worker process of a process pool,
+  simulation configuration and statistics are process wide (Borg) so runs never share them
+* Sleeping Barber arrival and haircut times are drawn from generators seeded by the run seed
+  (see *distributions*), a run is replayed exactly by running its parameters and seed again
+* Simulated time runs faster than real time, see *Defines.time_scale*
+* Results are written as CSV, or as JSON when the output file name ends in '.json'
+
+Parameter ranges are given as *name=values*, values are a single integer,
+a comma separated list of integers or an inclusive range *start:stop[:step]*.
+Distribution parameters take one or more distributions separated by ';'.
+
+Run from the *source* directory::
+
+    python sweep.py philosophers --set philosophers=3:9:2 --set eat_max=5,10 --seeds 3 --output sweep.csv
+    python sweep.py barbers --set barbers=1:4 --set customer_rate=2:6:2 --scale 0.005 --jobs 8
+    python sweep.py barbers --set "arrivals=exponential:3;exponential:5" --set service=uniform:2:8 --seeds 5
+"""
+
+# System imports
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Project imports
+import Defines
+import distributions
+
+#: simulation -> configuration parameters (*ConfigData* attributes) which may be swept
+PARAMETERS = {
+    'philosophers': ['philosophers', 'eat_min', 'eat_max', 'think_min', 'think_max', 'dining_loops'],
+    'barbers': ['barbers', 'waiting_chairs', 'customer_rate', 'customer_variance',
+                'haircut_min', 'haircut_max', 'simulation_loops', 'arrivals', 'service'],
+}
+
+#: parameters whose values are distributions (see *distributions.create()*)
+DISTRIBUTIONS = ['arrivals', 'service']
+
+
+def dining_table(params):
+    """ Run a Dining Philosophers simulation to completion
+
+        :param params: Configuration parameters
+        :returns: The DiningPhilosophers model
+    """
+    import DiningPhilosophers.main as dining
+    config = dining.ConfigData()
+    for name, value in params.items():
+        setattr(config, name, value)
+    model = dining.DiningPhilosophers(exit_when_done=True)
+    model.thread.start()
+    model.set_running()
+    model.thread.join()
+    return model
+
+
+def barber_shop(params, seed):
+    """ Run a Sleeping Barber simulation to completion
+
+        :param params: Configuration parameters
+        :param seed: Seeds the arrival and haircut time generators
+        :returns: The SleepingBarber model
+    """
+    import SleepingBarber.main as barber
+    config = barber.ConfigData()
+    config.seed = seed
+    for name, value in params.items():
+        setattr(config, name, value)
+    model = barber.SleepingBarber(exit_when_done=True)
+    model.thread.start()
+    model.set_running()
+    model.thread.join()
+    return model
+
+
+def philosophers(params, seed):
+    """ Run a Dining Philosophers simulation
+
+        :param params: Configuration parameters
+        :param seed: Run seed, the global random number generator is seeded with it
+        :returns: Dictionary of simulation statistics
+    """
+    model = dining_table(params)
+    hungry = [p.hungry_seconds for p in model.philosophers]
+    fairness = model.waiter.fairness_snapshot()
+    return {
+        'eating_seconds': sum(p.eating_seconds for p in model.philosophers),
+        'thinking_seconds': sum(p.thinking_seconds for p in model.philosophers),
+        'hungry_seconds': round(sum(hungry), 3),
+        'hungry_seconds_max': round(max(hungry), 3),
+        'meals': sum(fairness['meals']),
+        'jain_index': round(fairness['jain_index'], 4),
+        'starvation_seconds_max': round(max(fairness['starvation']), 3),
+    }
+
+
+def barbers(params, seed):
+    """ Run a Sleeping Barber simulation
+
+        :param params: Configuration parameters
+        :param seed: Run seed, seeds the arrival and haircut time generators
+        :returns: Dictionary of simulation statistics
+    """
+    s = barber_shop(params, seed).statistics
+    return {
+        'customers': s.customers(),
+        'served': s.barber_total_customers,
+        'lost_customers': s.lost_customers,
+        'max_waiters': s.max_waiters,
+        'barber_sleeping_time': s.barber_sleeping_time,
+        'barber_cutting_time': s.barber_cutting_time,
+        'customers_waiting_time': s.customers_waiting_time,
+    }
+
+
+#: simulation -> function running the simulation
+SIMULATIONS = {
+    'philosophers': philosophers,
+    'barbers': barbers,
+}
+
+
+def values(text):
+    """ Parse parameter values
+
+        :param text: An integer, a comma separated list of integers or a range 'start:stop[:step]'
+        :returns: List of values
+        :raises: ValueError if the values are not valid
+    """
+    if ':' in text:
+        bounds = [int(v) for v in text.split(':')]
+        if len(bounds) not in (2, 3):
+            raise ValueError('range is start:stop[:step]: %s' % text)
+        start, stop, step = bounds if len(bounds) == 3 else bounds + [1]
+        return list(range(start, stop + 1, step))
+    return [int(v) for v in text.split(',')]
+
+
+def runs(simulation, sweep, seeds, seed, scale):
+    """ Expand parameter ranges into the list of runs
+
+        Every parameter combination is run once per seed, the same seeds are used for
+        every combination.
+
+        :param simulation: Simulation name
+        :param sweep: Dictionary of parameter name -> list of values
+        :param seeds: Number of seeded runs per parameter combination
+        :param seed: First seed
+        :param scale: Time scale, real seconds per simulated second
+        :returns: List of run dictionaries
+    """
+    names = sorted(sweep.keys())
+    return [{'simulation': simulation, 'params': dict(zip(names, combination)), 'seed': seed + n, 'scale': scale}
+            for combination in itertools.product(*[sweep[name] for name in names])
+            for n in range(seeds)]
+
+
+def simulate(run):
+    """ Execute a single run, called in a worker process
+
+        :param run: Run dictionary (see *runs()*)
+        :returns: Result table row
+    """
+    random.seed(run['seed'])
+    Defines.time_scale = run['scale']
+    start = time.perf_counter()
+    stats = SIMULATIONS[run['simulation']](run['params'], run['seed'])
+    row = dict(run['params'], seed=run['seed'])
+    row.update(stats)
+    row['wall_seconds'] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def pool(jobs):
+    """ Process pool running each simulation in a fresh process
+
+        :param jobs: Number of worker processes
+        :returns: Tuple of (pool, name of its ordered map method)
+    """
+    if sys.version_info >= (3, 11):
+        return ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1), 'map'
+    # worker processes are only recycled by multiprocessing pools before Python 3.11
+    return multiprocessing.Pool(jobs, maxtasksperchild=1), 'imap'
+
+
+def execute(run_list, jobs, log=print):
+    """ Execute runs on a process pool
+
+        :param run_list: List of runs (see *runs()*)
+        :param jobs: Number of worker processes
+        :param log: Function called with a progress line for every completed run
+        :returns: List of result table rows, in run order
+    """
+    rows = []
+    executor, method = pool(jobs)
+    with executor:
+        for row in getattr(executor, method)(simulate, run_list):
+            rows.append(row)
+            log('[%d/%d] %s' % (len(rows), len(run_list), ' '.join('%s=%s' % kv for kv in row.items())))
+    return rows
+
+
+def write(rows, path):
+    """ Write the result table
+
+        :param rows: List of result table rows
+        :param path: Output file, JSON if the name ends in '.json' otherwise CSV
+    """
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.json'):
+            json.dump(rows, f, indent=2)
+            return
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    """ Run from the command line """
+    parser = argparse.ArgumentParser(description='Sweep StateEngineCrank simulation parameters.')
+    parser.add_argument('simulation', choices=SIMULATIONS.keys(), help='simulation to run')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUES',
+                        help='parameter values, may be repeated')
+    parser.add_argument('--seeds', type=int, default=1, help='seeded runs per parameter combination')
+    parser.add_argument('--seed', type=int, default=0, help='first seed')
+    parser.add_argument('--scale', type=float, default=0.01, help='real seconds per simulated second')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--output', default='sweep.csv', help='result table, .csv or .json')
+    args = parser.parse_args()
+
+    parameters = {}
+    for setting in args.set:
+        name, _, text = setting.partition('=')
+        if name not in PARAMETERS[args.simulation]:
+            parser.error('unknown %s parameter: %s, choose from %s' % (
+                args.simulation, name, ', '.join(PARAMETERS[args.simulation])))
+        try:
+            if name in DISTRIBUTIONS:
+                parameters[name] = text.split(';')
+                for description in parameters[name]:
+                    distributions.create(description)
+            else:
+                parameters[name] = values(text)
+        except ValueError as e:
+            parser.error('%s: %s' % (name, e))
+
+    results = execute(runs(args.simulation, parameters, args.seeds, args.seed, args.scale), args.jobs)
+    write(results, args.output)
+    print('%d runs written to %s' % (len(results), args.output))
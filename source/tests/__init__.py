@@ -0,0 +1,19 @@
+""" StateEngineCrank tests
+
+Run from the repository root (see *tox.ini*)::
+
+    python -m unittest discover
+
+Simulation modules are imported from the *source* directory, which is put on the module
+search path here.
+"""
+
+# System imports
+import os
+import sys
+
+#: the source directory, tests which run code in a fresh interpreter run it here
+SOURCE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if SOURCE not in sys.path:
+    sys.path.insert(0, SOURCE)
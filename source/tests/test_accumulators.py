@@ -0,0 +1,103 @@
+""" StateEngineCrank.tests.test_accumulators
+
+Online statistics, single and sharded accumulators.
+"""
+
+# System imports
+import statistics
+import threading
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+from accumulators import Accumulator, ShardedAccumulator
+
+#: histogram bucket bounds of the tests
+BOUNDS = (10, 20, 50, 100)
+
+
+class TestAccumulator(unittest.TestCase):
+
+    def test_add(self):
+        """ Count, total, mean, variance and extremes match the values added """
+        values = [3, 14, 15, 92, 65, 35]
+        a = Accumulator(BOUNDS)
+        for v in values:
+            a.add(v)
+        self.assertEqual(a.count, 6)
+        self.assertEqual(a.total, sum(values))
+        self.assertAlmostEqual(a.mean, statistics.mean(values))
+        self.assertAlmostEqual(a.variance, statistics.variance(values))
+        self.assertEqual((a.min, a.max), (3, 92))
+        self.assertEqual(a.buckets, [1, 2, 1, 2, 0])
+
+    def test_merge(self):
+        """ Merging accumulators gives the statistics of all their values """
+        values = [1, 7, 12, 40, 55, 99, 150, 3]
+        a, b = Accumulator(BOUNDS), Accumulator(BOUNDS)
+        for v in values[:3]:
+            a.add(v)
+        for v in values[3:]:
+            b.add(v)
+        a.merge(b).merge(Accumulator(BOUNDS))
+        self.assertEqual(a.count, len(values))
+        self.assertAlmostEqual(a.mean, statistics.mean(values))
+        self.assertAlmostEqual(a.variance, statistics.variance(values))
+        self.assertEqual((a.min, a.max), (1, 150))
+        self.assertEqual(a.buckets, [3, 1, 1, 2, 1])
+
+    def test_merge_partial(self):
+        """ An accumulator read part way through its first value is skipped """
+        partial = Accumulator(BOUNDS)
+        partial.count = 1
+        merged = Accumulator(BOUNDS).merge(partial)
+        self.assertEqual(merged.count, 0)
+        self.assertIsNone(merged.percentile(0.5))
+
+    def test_percentile(self):
+        """ Percentiles are interpolated within their bucket and bounded by min and max """
+        a = Accumulator(BOUNDS)
+        self.assertIsNone(a.percentile(0.5))
+        for v in range(1, 101):
+            a.add(v)
+        self.assertEqual(a.percentile(0.10), 10)
+        self.assertEqual(a.percentile(0.50), 50)
+        self.assertEqual(a.percentile(0.99), 99)
+        self.assertEqual(a.percentile(1.0), 100)
+        a.add(500)
+        self.assertEqual(a.percentile(1.0), 500)
+        single = Accumulator(BOUNDS)
+        single.add(30)
+        self.assertEqual(single.percentile(0.5), 30)
+
+
+class TestShardedAccumulator(unittest.TestCase):
+
+    def test_snapshot(self):
+        """ Values recorded by several threads are merged by snapshot() and peek() """
+        sharded = ShardedAccumulator(BOUNDS)
+
+        def record(offset):
+            for v in range(100):
+                sharded.add(v + offset)
+
+        threads = [threading.Thread(target=record, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(sharded.shards), 4)
+        for merged in (sharded.snapshot(), sharded.peek()):
+            self.assertEqual(merged.count, 400)
+            self.assertEqual((merged.min, merged.max), (0, 102))
+            self.assertAlmostEqual(merged.mean, 51.0)
+
+    def test_empty(self):
+        """ An accumulator nothing was recorded in has no values """
+        sharded = ShardedAccumulator(BOUNDS)
+        self.assertEqual(sharded.snapshot().count, 0)
+        self.assertIsNone(sharded.peek().percentile(0.99))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+""" StateEngineCrank.tests.test_customers
+
+Sleeping Barber customers recycled by the customer generator's customer pool.
+"""
+
+# System imports
+import contextlib
+import io
+import threading
+import time
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+import mvc
+import Defines
+import SleepingBarber.Barber    # noqa: F401, imported ahead of the customers it imports
+from SleepingBarber.Customer import Events, States
+from SleepingBarber.CustomerGen import CustomerGenerator
+from SleepingBarber.WaitingRoom import WaitingRoom
+
+
+class Tally(mvc.View):
+    """ View of a customer """
+
+    def update(self, event):
+        pass
+
+    def run(self):
+        pass
+
+
+class TestCustomerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.time_scale, Defines.time_scale = Defines.time_scale, 0.01
+        self.output = io.StringIO()
+        with contextlib.redirect_stdout(self.output):
+            WaitingRoom().reset()
+            self.cg = CustomerGenerator(customer_rate=5, customer_variance=2, barbers=[])
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(self.output):
+            self.cg.cleanup()
+        Defines.time_scale = self.time_scale
+
+    def visit(self, id_):
+        """ A customer arrives, waits for a barber, leaves when told to stop and is retired
+
+            :param id_: customer ID of the arrival
+            :returns: Customer which visited
+        """
+        with contextlib.redirect_stdout(self.output):
+            customer = self.cg.customers.acquire(id_)
+            self.assertEqual(customer.current_state, States.StartUp)
+            self.assertEqual(customer.waiting_time, 0)
+            customer.running = True
+            self.cg.customer_list.append(customer)
+            thread = threading.Thread(target=self.cg.serve, args=(customer,))
+            thread.start()
+            while customer.waiting_time < 2:
+                time.sleep(0.01)
+            customer.post_event(Events.EvStop)
+            thread.join(timeout=5)
+            self.cg.retire()
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(customer.current_state, States.Finish)
+        return customer
+
+    def test_recycled(self):
+        """ A finished customer runs again under its new customer ID with fresh statistics """
+        actors = mvc.Event().actors
+        first = self.visit(1)
+        self.assertEqual((first.id, first.name), (1, 'Customer001'))
+        self.assertNotIn('Customer001', actors)
+        second = self.visit(17)
+        self.assertIs(second, first)
+        self.assertEqual((second.id, second.name), (17, 'Customer017'))
+        self.assertNotIn('Customer017', actors)
+        self.assertEqual(len(self.cg.customers.customers), 1)
+        with contextlib.redirect_stdout(self.output):
+            self.assertIs(self.cg.customers.acquire(18), first)
+        self.assertIn('Customer018', actors)
+        self.assertEqual(first.waiting_time, 0)
+        self.assertIsNone(first.arrival)
+
+    def test_views(self):
+        """ Registering a customer as an actor leaves views registering with it as a model """
+        with contextlib.redirect_stdout(self.output):
+            customer = self.cg.customers.acquire(1)
+        view = Tally(name='Tally')
+        customer.register(view)
+        self.assertIs(customer.views['Tally'], view)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+""" StateEngineCrank.tests.test_distributions
+
+Seeded time generators and their text descriptions.
+"""
+
+# System imports
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+import distributions
+from distributions import BATCH, Distribution, Empirical, Exponential, Uniform, create, derive
+from SleepingBarber.Common import ConfigData
+
+
+def draws(distribution, count=BATCH + 10):
+    """ Times drawn from a generator, across more than one batch """
+    return [distribution.draw() for _ in range(count)]
+
+
+class TestCreate(unittest.TestCase):
+
+    def test_exponential(self):
+        d = create('exponential:5', seed=1)
+        self.assertIsInstance(d, Exponential)
+        self.assertEqual(d.mean, 5.0)
+
+    def test_uniform(self):
+        d = create('uniform:3:7', seed=1, integer=True)
+        self.assertIsInstance(d, Uniform)
+        self.assertEqual((d.minimum, d.maximum, d.integer), (3.0, 7.0, True))
+
+    def test_empirical(self):
+        d = create('empirical:2,3,3,8')
+        self.assertIsInstance(d, Empirical)
+        self.assertEqual(d.values, [2.0, 3.0, 3.0, 8.0])
+        self.assertIsNone(d.seed)
+
+    def test_invalid(self):
+        """ Invalid descriptions raise ValueError naming the description """
+        for text in ('normal:5', 'exponential', 'exponential:0', 'exponential:x', 'uniform:7:3',
+                     'uniform:3', 'empirical:', 'empirical:1,a'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError) as context:
+                    create(text)
+                self.assertIn(text, str(context.exception))
+
+    def test_abstract(self):
+        """ The base class draws nothing itself """
+        with self.assertRaises(TypeError):
+            Distribution()
+
+
+class TestSeeded(unittest.TestCase):
+
+    def test_reproducible(self):
+        """ Generators created with the same seed draw the same times """
+        for text in ('exponential:5', 'uniform:3:7', 'empirical:2,3,3,8'):
+            for integer in (False, True):
+                with self.subTest(text=text, integer=integer):
+                    first = draws(create(text, seed=42, integer=integer))
+                    self.assertEqual(first, draws(create(text, seed=42, integer=integer)))
+                    self.assertNotEqual(first, draws(create(text, seed=43, integer=integer)))
+
+    def test_bounds(self):
+        """ Whole seconds drawn uniformly include both bounds and nothing outside them """
+        times = draws(create('uniform:3:7', seed=1, integer=True))
+        self.assertTrue(all(isinstance(t, int) for t in times))
+        self.assertEqual(set(times), {3, 4, 5, 6, 7})
+
+    def test_derive(self):
+        """ Named generators of a simulation seed are independent, unseeded stays unseeded """
+        self.assertIsNone(derive(None, 'arrivals'))
+        self.assertNotEqual(derive(42, 'arrivals'), derive(42, 'service1'))
+        self.assertEqual(derive(42, 'arrivals'), derive(42, 'arrivals'))
+
+    def test_simulation(self):
+        """ A seeded Sleeping Barber simulation draws the same arrival and haircut times """
+        config = ConfigData()
+        saved = config.seed
+        try:
+            config.seed = 7
+            arrivals = draws(config.arrival_times(5, 2))
+            haircuts = [draws(config.service_times(b)) for b in range(3)]
+            self.assertEqual(arrivals, draws(config.arrival_times(5, 2)))
+            self.assertEqual(haircuts, [draws(config.service_times(b)) for b in range(3)])
+            self.assertNotEqual(haircuts[0], haircuts[1])
+            self.assertTrue(all(3 <= t <= 7 for t in arrivals))
+        finally:
+            config.seed = saved
+
+
+@unittest.skipIf(distributions.numpy is None, 'NumPy is not installed')
+class TestNumpy(unittest.TestCase):
+
+    def test_python(self):
+        """ Without NumPy the same seed draws from a random.Random, reproducibly """
+        numpy, distributions.numpy = distributions.numpy, None
+        try:
+            self.assertEqual(draws(create('exponential:5', seed=3)), draws(create('exponential:5', seed=3)))
+        finally:
+            distributions.numpy = numpy
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+""" StateEngineCrank.tests.test_fairness
+
+Dining Philosophers starvation and fairness statistics.
+"""
+
+# System imports
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+from DiningPhilosophers.Fairness import Fairness
+
+
+class TestFairness(unittest.TestCase):
+
+    def setUp(self):
+        self.fairness = Fairness(4)
+
+    def meal(self, philosopher_id, hungry, fed):
+        """ A philosopher asks for forks and is granted them """
+        self.fairness.hungry(philosopher_id, hungry)
+        self.fairness.fed(philosopher_id, fed)
+
+    def test_jain_index(self):
+        """ The incremental Jain index matches (sum meals)^2 / (n * sum meals^2) """
+        self.assertEqual(self.fairness.jain_index, 1.0)
+        for philosopher_id in (0, 3, 0, 1, 3, 0):
+            self.meal(philosopher_id, 0, 1)
+        self.assertEqual(self.fairness.meals, [3, 1, 0, 2])
+        # meals 3, 1, 0, 2: 6^2 / (4 * (9 + 1 + 0 + 4)) = 36 / 56
+        self.assertAlmostEqual(self.fairness.jain_index, 36 / 56)
+        self.assertEqual(self.fairness.summary(10)['jain_index'], self.fairness.jain_index)
+
+    def test_jain_bounds(self):
+        """ The Jain index is 1.0 when all eat equally often and 1/n when one eats every meal """
+        for philosopher_id in range(4):
+            self.meal(philosopher_id, 0, 1)
+        self.assertAlmostEqual(self.fairness.jain_index, 1.0)
+        self.fairness.reset(4)
+        for _ in range(5):
+            self.meal(2, 0, 1)
+        self.assertAlmostEqual(self.fairness.jain_index, 1 / 4)
+
+    def test_starvation(self):
+        """ Starvation is the longest hunger, counting hunger still in progress """
+        self.meal(0, 10, 14)
+        self.meal(0, 20, 21)
+        self.fairness.hungry(1, 30)
+        self.assertEqual(self.fairness.longest[0], 4)
+        self.assertEqual(self.fairness.starvation(32), [4, 2, 0, 0])
+        self.assertEqual(self.fairness.starvation(40), [4, 10, 0, 0])
+        self.meal(0, 40, 42)
+        self.assertEqual(self.fairness.starvation(40)[0], 4)
+        hunger = self.fairness.hunger[0]
+        self.assertEqual((hunger.count, hunger.min, hunger.max), (3, 1, 4))
+
+    def test_snapshot(self):
+        """ A snapshot is unaffected by meals served after it was taken """
+        self.meal(1, 0, 2)
+        snapshot = self.fairness.snapshot(5)
+        self.meal(1, 5, 6)
+        self.assertEqual(snapshot['meals'], [0, 1, 0, 0])
+        self.assertEqual(snapshot['hunger'][1].count, 1)
+        self.assertEqual(self.fairness.hunger[1].count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
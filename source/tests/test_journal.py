@@ -0,0 +1,149 @@
+""" StateEngineCrank.tests.test_journal
+
+Event journal written by the journal view, read back, replayed and seeked.
+"""
+
+# System imports
+import contextlib
+import datetime
+import io
+import tempfile
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+import mvc
+from journal import Journal, JournalRef, JournalReplay, JournalView
+
+#: number of events journaled
+EVENTS = 12
+
+
+class Settings(object):
+    """ Configuration of the journaled model """
+
+    def __init__(self):
+        self.barbers = 3
+        self.waiting_chairs = 5
+        self.name = 'shop'
+
+
+class Shop(mvc.Model):
+    """ Journaled model """
+
+    def __init__(self):
+        super().__init__(name='Barbers')
+        self.config = Settings()
+
+    def update(self, event):
+        pass
+
+    def run(self):
+        pass
+
+
+class Customer(object):
+    """ Simulation object carried in an event payload """
+
+    def __init__(self, id_):
+        self.id = id_
+        self.name = 'Customer%03d' % id_
+
+
+class Recorder(mvc.View):
+    """ View recording the replayed events """
+
+    def __init__(self):
+        super().__init__(name='recorder')
+        self.events = []
+
+    def update(self, event):
+        self.events.append(event)
+
+    def run(self):
+        pass
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        self.output = io.StringIO()
+        start = datetime.datetime(2024, 5, 1, 12, 0, 0)
+        self.events = [{'class': 'Barbers', 'event': mvc.Event.Events.TIMER, 'actor': 'Barbers',
+                        'datetime': start + datetime.timedelta(seconds=n), 'text': 'tick %d' % n,
+                        'data': [n, Customer(n)]} for n in range(EVENTS)]
+        self.times = [event['datetime'].timestamp() for event in self.events]
+        self.write()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self):
+        """ Journal the events in small segments with a sparse index """
+        with contextlib.redirect_stdout(self.output):
+            view = JournalView(self.path, segment_bytes=512, index_every=4)
+            view.register(Shop())
+            view.thread.start()
+            view.set_running()
+            for event in self.events:
+                view.update(event)
+            view.set_stopping()
+            view.completion.result(timeout=5)
+
+    def assertReplayed(self, replayed, events):
+        """ Replayed events match the journaled events, simulation objects replaced by references """
+        self.assertEqual(len(replayed), len(events))
+        for got, event in zip(replayed, events):
+            self.assertIs(got['event'], event['event'])
+            self.assertEqual(got['datetime'], event['datetime'])
+            self.assertEqual(got['text'], event['text'])
+            customer = event['data'][1]
+            self.assertEqual(got['data'], [event['data'][0], JournalRef('Customer', customer.id, customer.name)])
+
+    def test_round_trip(self):
+        """ Journaled events are read back in order with their model and configuration """
+        journal = Journal(self.path)
+        self.assertEqual(journal.meta['models'], {'Barbers': {'barbers': 3, 'waiting_chairs': 5, 'name': 'shop'}})
+        self.assertGreater(len({segment for _, segment, _ in journal.index}), 1)
+        self.assertEqual(journal.start_time(), self.times[0])
+        records = list(journal.records())
+        self.assertEqual([t for t, _, _ in records], self.times)
+        self.assertEqual({model for _, model, _ in records}, {'Barbers'})
+        self.assertReplayed([event for _, _, event in records], self.events)
+
+    def test_records_start(self):
+        """ Reading from a timestamp between index entries skips the earlier records """
+        records = list(Journal(self.path).records(self.times[6]))
+        self.assertEqual([t for t, _, _ in records], self.times[6:])
+
+    def test_replay(self):
+        """ A replay delivers the journaled events to views through the model's stand-in """
+        with contextlib.redirect_stdout(self.output):
+            replay = JournalReplay(self.path, speed=None)
+            view = Recorder()
+            replay.register(view)
+            self.assertEqual(replay.models['Barbers'].config.get_barbers(), 3)
+            self.assertEqual(replay.models['Barbers'].config.get_waiters(), 5)
+            replay.running = True
+            self.assertTrue(replay.replay())
+        self.assertReplayed(view.events, self.events)
+        self.assertEqual(replay.position, self.times[-1])
+
+    def test_seek(self):
+        """ A replay seeked to a timestamp continues from the event at that timestamp """
+        with contextlib.redirect_stdout(self.output):
+            replay = JournalReplay(self.path, speed=None)
+            view = Recorder()
+            replay.register(view)
+            replay.seek(self.times[9])
+            replay.start()
+            replay.set_running()
+            replay.completion.result(timeout=5)
+        self.assertReplayed(view.events, self.events[9:])
+        self.assertIsNone(replay.seek_to)
+
+
+if __name__ == '__main__':
+    unittest.main()
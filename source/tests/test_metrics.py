@@ -0,0 +1,154 @@
+""" StateEngineCrank.tests.test_metrics
+
+Metrics exposition endpoint, scraped over HTTP on localhost.
+"""
+
+# System imports
+import contextlib
+import enum
+import io
+import unittest
+import urllib.error
+import urllib.request
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+from metrics import CONTENT_TYPE, Metrics
+from StateEngineCrank.modules.PyState import StateMachine
+
+
+class Lamp(StateMachine):
+    """ Two state machine, switched on and off by a guarded toggle """
+
+    class States(enum.Enum):
+        OFF, ON = range(2)
+
+    class Events(enum.Enum):
+        TOGGLE = 0
+
+    def __init__(self, sm_id):
+        super().__init__(sm_id=sm_id, name='Lamp%d' % sm_id, startup_state=Lamp.States.OFF,
+                         function_table={state: {'enter': None, 'do': None, 'exit': None} for state in Lamp.States},
+                         transition_table={
+                             Lamp.States.OFF: {Lamp.Events.TOGGLE: {'state2': Lamp.States.ON, 'guard': self.powered,
+                                                                    'transition': None}},
+                             Lamp.States.ON: {Lamp.Events.TOGGLE: {'state2': Lamp.States.OFF, 'guard': None,
+                                                                   'transition': None}},
+                         })
+
+    @staticmethod
+    def powered(sm):
+        return True
+
+    def update(self, event):
+        pass
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        host, port = self.metrics.serve(port=0)
+        self.url = 'http://%s:%d' % (host, port)
+        self.before, _ = self.scrape()     # totals of state machines retired by earlier tests
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.lamps = [Lamp(n) for n in range(3)]
+        for lamp in self.lamps:
+            lamp.event(Lamp.Events.TOGGLE)
+        self.lamps[0].event(Lamp.Events.TOGGLE)
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for lamp in self.lamps:
+                lamp.cleanup()
+        self.metrics.shutdown()
+
+    def scrape(self, path='/metrics'):
+        """ Fetch the exposition
+
+            :returns: Dictionary of sample line -> value, list of comment lines
+        """
+        with urllib.request.urlopen(self.url + path, timeout=5) as response:
+            self.assertEqual(response.headers['Content-Type'], CONTENT_TYPE)
+            text = response.read().decode('utf-8')
+        self.assertTrue(text.endswith('\n'))
+        samples = {}
+        comments = []
+        for line in text.splitlines():
+            if line.startswith('#'):
+                comments.append(line)
+            else:
+                name, value = line.rsplit(' ', 1)
+                samples[name] = float(value)
+        return samples, comments
+
+    def counted(self, samples, name):
+        """ Counter value since the test started
+
+            :param samples: Samples returned by *scrape()*
+            :param name: Sample name and labels
+            :returns: Value counted by this test's state machines
+        """
+        return samples[name] - self.before.get(name, 0)
+
+    def test_exposition(self):
+        """ Every family has HELP and TYPE lines, state machine samples are labelled by class """
+        samples, comments = self.scrape()
+        for name, type_ in (('events_total', 'counter'), ('transitions_total', 'counter'),
+                            ('transitions_per_second', 'gauge'), ('state_occupancy', 'gauge'),
+                            ('queue_depth', 'gauge'), ('guard_seconds', 'summary')):
+            self.assertIn('# HELP crank_%s' % name, ' '.join(c for c in comments if c.startswith('# HELP')))
+            self.assertIn('# TYPE crank_%s %s' % (name, type_), comments)
+        self.assertEqual(self.counted(samples, 'crank_events_total{machine="Lamp"}'), 4)
+        self.assertEqual(self.counted(samples, 'crank_transitions_total{machine="Lamp"}'), 4)
+        self.assertEqual(self.counted(samples, 'crank_guard_seconds_count{machine="Lamp"}'), 3)
+        self.assertGreaterEqual(samples['crank_guard_seconds_sum{machine="Lamp"}'], 0)
+        self.assertEqual(samples['crank_state_occupancy{machine="Lamp",state="ON"}'], 2)
+        self.assertEqual(samples['crank_state_occupancy{machine="Lamp",state="OFF"}'], 1)
+        self.assertEqual(samples['crank_queue_depth{machine="Lamp"}'], 0)
+
+    def test_retired(self):
+        """ Counters of state machines which stopped are kept in the totals """
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.lamps.pop(1).cleanup()
+        samples, _ = self.scrape()
+        self.assertEqual(self.counted(samples, 'crank_events_total{machine="Lamp"}'), 4)
+        self.assertEqual(samples['crank_state_occupancy{machine="Lamp",state="ON"}'], 1)
+
+    def test_collector(self):
+        """ Collector families are added to the exposition """
+        def collector():
+            return [('test_total', 'counter', 'Test collector', [({'shop': 'a"b'}, 7)])]
+        self.metrics.add_collector(collector)
+        try:
+            samples, comments = self.scrape('/')
+        finally:
+            self.metrics.collectors.remove(collector)
+        self.assertIn('# TYPE crank_test_total counter', comments)
+        self.assertEqual(samples['crank_test_total{shop="a\\"b"}'], 7)
+
+    def test_summary(self):
+        """ Summary families expose their quantiles, sum and count """
+        def collector():
+            return [('test_seconds', 'summary', 'Test summary', [({}, 12.5)], [({}, 5)],
+                     [({'quantile': q}, v) for q, v in ((0.5, 2), (0.99, 4))])]
+        self.metrics.add_collector(collector)
+        try:
+            samples, comments = self.scrape()
+        finally:
+            self.metrics.collectors.remove(collector)
+        self.assertIn('# TYPE crank_test_seconds summary', comments)
+        self.assertEqual(samples['crank_test_seconds{quantile="0.5"}'], 2)
+        self.assertEqual(samples['crank_test_seconds{quantile="0.99"}'], 4)
+        self.assertEqual(samples['crank_test_seconds_sum'], 12.5)
+        self.assertEqual(samples['crank_test_seconds_count'], 5)
+
+    def test_not_found(self):
+        """ Only the metrics path is served """
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(self.url + '/other', timeout=5)
+        self.assertEqual(context.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+""" StateEngineCrank.tests.test_router
+
+Controller router delivery of model events to the views subscribed to their topics.
+"""
+
+# System imports
+import contextlib
+import io
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+import mvc
+
+
+class Recorder(mvc.View):
+    """ View recording the batches of events delivered to it """
+
+    def __init__(self, name):
+        super().__init__(name=name)
+        self.batches = []
+
+    def update(self, event):
+        self.batches.append([event])
+
+    def update_batch(self, events):
+        self.batches.append(list(events))
+
+    def run(self):
+        pass
+
+
+class Failing(Recorder):
+    """ View failing to process its events """
+
+    def update_batch(self, events):
+        raise RuntimeError('update failed')
+
+
+class TestRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = mvc.Router(name='TestRouter')
+
+    def events(self, view):
+        """ Events delivered to a view, across all of its batches """
+        return [event for batch in view.batches for event in batch]
+
+    def test_topics(self):
+        """ Events are delivered only to the views subscribed to their topic """
+        barbers, philosophers, both = Recorder('barbers'), Recorder('philosophers'), Recorder('both')
+        self.router.subscribe('Barbers', barbers)
+        self.router.subscribe('Philosophers', philosophers)
+        for topic in ('Barbers', 'Philosophers'):
+            self.router.subscribe(topic, both)
+        self.router.subscribe('Barbers', both)
+        self.router.publish('Barbers', 'b1')
+        self.router.publish('Philosophers', 'p1')
+        self.router.publish('Nobody', 'n1')
+        self.assertEqual(self.router.dispatch(), 3)
+        self.assertEqual(self.events(barbers), ['b1'])
+        self.assertEqual(self.events(philosophers), ['p1'])
+        self.assertEqual(self.events(both), ['b1', 'p1'])
+
+    def test_unsubscribe(self):
+        """ An unsubscribed view is delivered no more events """
+        view = Recorder('view')
+        self.router.subscribe('Barbers', view)
+        self.router.unsubscribe('Barbers', view)
+        self.router.publish('Barbers', 'b1')
+        self.router.dispatch()
+        self.assertEqual(view.batches, [])
+
+    def test_batch(self):
+        """ A view is delivered all of its events of a tick as a single batch """
+        view = Recorder('view')
+        self.router.subscribe('Barbers', view)
+        self.router.subscribe('Philosophers', view)
+        for n in range(3):
+            self.router.publish('Barbers', 'b%d' % n)
+            self.router.publish('Philosophers', 'p%d' % n)
+        self.router.dispatch()
+        self.assertEqual(len(view.batches), 1)
+        self.router.publish('Barbers', 'b3')
+        self.router.dispatch()
+        self.assertEqual(view.batches[1], ['b3'])
+        self.assertEqual(self.router.dispatch(), 0)
+        self.assertEqual(len(view.batches), 2)
+
+    def test_order(self):
+        """ Events are delivered in the order they were published, within and across topics """
+        view = Recorder('view')
+        self.router.subscribe('Barbers', view)
+        self.router.subscribe('Philosophers', view)
+        published = [('Barbers', 'b1'), ('Philosophers', 'p1'), ('Barbers', 'b2'),
+                     ('Barbers', 'b3'), ('Philosophers', 'p2'), ('Barbers', 'b4')]
+        for topic, event in published:
+            self.router.publish(topic, event)
+        self.router.dispatch()
+        self.assertEqual(view.batches, [[event for _, event in published]])
+
+    def test_failing_view(self):
+        """ A view failing to process its batch does not stop delivery to other views """
+        failing, view = Failing('failing'), Recorder('view')
+        self.router.subscribe('Barbers', failing)
+        self.router.subscribe('Barbers', view)
+        self.router.publish('Barbers', 'b1')
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.router.dispatch()
+        self.assertIn('failing update failed', output.getvalue())
+        self.assertEqual(self.events(view), ['b1'])
+
+    def test_stop(self):
+        """ Events pending when the router thread is stopped are delivered """
+        view = Recorder('view')
+        self.router.subscribe('Barbers', view)
+        self.router.tick = 60
+        self.router.start()
+        self.router.publish('Barbers', 'b1')
+        self.router.stop()
+        self.assertIsNone(self.router.thread)
+        self.assertEqual(self.events(view), ['b1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
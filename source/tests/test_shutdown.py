@@ -0,0 +1,65 @@
+""" StateEngineCrank.tests.test_shutdown
+
+Shutdown of a running simulation, from cancelling it to all of its threads being joined.
+"""
+
+# System imports
+import json
+import subprocess
+import sys
+import unittest
+
+# Project imports
+from tests import SOURCE
+from Benchmarks.Shutdown import SETUP
+
+#: seconds allowed from cancelling a simulation to its threads being joined,
+#: shutdown takes milliseconds, the bound leaves room for a loaded machine
+BOUND = 1.0
+
+#: runs the simulation until it is busy, cancels it and prints the shutdown as JSON
+SCRIPT = '''
+import json, os, threading, time, mvc, Defines
+Defines.time_scale = 0.1
+%s
+model.thread.start()
+model.set_running()
+time.sleep(2)
+start = time.perf_counter()
+model.cancellation.cancel()
+left = mvc.wait([model], timeout=%r)
+print(json.dumps({'elapsed': time.perf_counter() - start, 'left': len(left),
+                  'threads': [t.name for t in threading.enumerate() if t is not threading.main_thread()]}))
+os._exit(0)
+'''
+
+
+class TestShutdown(unittest.TestCase):
+
+    def shutdown(self, name):
+        """ Run, then cancel, a simulation in a fresh interpreter
+
+            :param name: Simulation, a *Benchmarks.Shutdown.SETUP* key
+            :returns: Dictionary of seconds to shut down, models not completed and threads left
+        """
+        output = subprocess.run([sys.executable, '-c', SCRIPT % (SETUP[name], BOUND * 10)], cwd=SOURCE,
+                                check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def assertShutdown(self, name):
+        result = self.shutdown(name)
+        self.assertEqual(result['left'], 0)
+        self.assertLess(result['elapsed'], BOUND)
+        self.assertEqual(result['threads'], [])
+
+    def test_barbers(self):
+        """ The Sleeping Barber simulation joins its barbers, customer generator and customers """
+        self.assertShutdown('shutdown.barbers')
+
+    def test_philosophers(self):
+        """ The Dining Philosophers simulation joins its philosophers """
+        self.assertShutdown('shutdown.philosophers')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+""" StateEngineCrank.tests.test_stateboard
+
+Shared memory state board, read from the owning process and from other processes.
+"""
+
+# System imports
+import json
+import os
+import subprocess
+import sys
+import unittest
+from multiprocessing import shared_memory
+
+# Project imports
+from tests import SOURCE
+from StateEngineCrank.modules.StateBoard import StateBoard, StateBoardReader
+
+#: opens the board, prints a snapshot as JSON and closes the board, run in a fresh interpreter
+READER = '''
+import json
+from StateEngineCrank.modules.StateBoard import StateBoardReader
+reader = StateBoardReader(%r)
+print(json.dumps(reader.snapshot()))
+reader.close()
+'''
+
+
+class TestStateBoard(unittest.TestCase):
+
+    def setUp(self):
+        self.board = StateBoard()
+        self.name = self.board.create(name='crank-test-%d' % os.getpid(), slots=8)
+        self.slot = self.board.attach(sm_id=3)
+        self.slot.publish(state=2, event=5, queue_depth=1, transition=True)
+
+    def tearDown(self):
+        self.board.close()
+
+    def read_in_process(self):
+        """ Snapshot the board from another process
+
+            :returns: List of slot dictionaries
+        """
+        output = subprocess.run([sys.executable, '-c', READER % self.name], cwd=SOURCE, check=True,
+                                stdout=subprocess.PIPE, text=True).stdout
+        return json.loads(output)
+
+    def test_reader_process(self):
+        """ A reader exiting leaves the board for other readers and for its owner """
+        for _ in range(3):
+            slots = self.read_in_process()
+            self.assertEqual(len(slots), 1)
+            self.assertEqual(slots[0]['sm_id'], 3)
+            self.assertEqual(slots[0]['state'], 2)
+            self.assertEqual(slots[0]['last_event'], 5)
+            self.assertEqual(slots[0]['transitions'], 1)
+        reader = StateBoardReader(self.name)
+        self.assertEqual(reader.snapshot()[0]['queue_depth'], 1)
+        reader.close()
+
+    def test_detach(self):
+        """ A detached slot is no longer reported """
+        self.board.detach(self.slot)
+        self.assertEqual(self.read_in_process(), [])
+
+    def test_close_unlinked(self):
+        """ The owner closes a board already unlinked by someone else """
+        shm = shared_memory.SharedMemory(name=self.name)
+        shm.close()
+        shm.unlink()
+        self.board.close()
+        self.assertIsNone(self.board.shm)
+
+
+if __name__ == '__main__':
+    unittest.main()
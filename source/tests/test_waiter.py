@@ -0,0 +1,88 @@
+""" StateEngineCrank.tests.test_waiter
+
+Dining Philosophers waiter fork allocation policies.
+"""
+
+# System imports
+import contextlib
+import io
+import threading
+import time
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+from DiningPhilosophers.main import ForkStatus, Waiter
+
+
+class TestWaiter(unittest.TestCase):
+
+    def setUp(self):
+        self.output = io.StringIO()
+        with contextlib.redirect_stdout(self.output):
+            self.waiter = Waiter()
+        self.policy = self.waiter.config.waiter_policy
+        self.assertTrue(all(fork is ForkStatus.Free for fork in self.waiter.forks))
+        self.granted = []
+        self.threads = []
+
+    def tearDown(self):
+        self.waiter.config.waiter_policy = self.policy
+
+    def call(self, function, *args):
+        with contextlib.redirect_stdout(self.output):
+            return function(*args)
+
+    def diner(self, philosopher_id, left_fork, right_fork):
+        """ Start a philosopher asking for forks, recording when they are granted """
+        def dine():
+            self.call(self.waiter.request, philosopher_id, left_fork, right_fork)
+            self.granted.append(philosopher_id)
+        thread = threading.Thread(target=dine)
+        thread.start()
+        self.threads.append(thread)
+        return thread
+
+    def until(self, condition):
+        """ Wait for a condition to become true """
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+
+    def test_fifo(self):
+        """ Forks are granted in order of request, a later request waits although its forks are free """
+        self.waiter.config.waiter_policy = 'fifo'
+        self.call(self.waiter.request, 0, 0, 1)
+        self.diner(1, 1, 2)
+        self.until(lambda: 1 in self.waiter.waiting)
+        self.diner(2, 2, 3)
+        self.until(lambda: 2 in self.waiter.waiting)
+        self.assertEqual(self.granted, [])
+        self.call(self.waiter.release, 0, 0, 1)
+        self.threads[0].join(timeout=5)
+        self.assertEqual(self.granted, [1])
+        self.assertIn(2, self.waiter.waiting)
+        self.call(self.waiter.release, 1, 1, 2)
+        self.threads[1].join(timeout=5)
+        self.assertEqual(self.granted, [1, 2])
+        self.call(self.waiter.release, 2, 2, 3)
+
+    def test_greedy(self):
+        """ Forks are granted whenever both are free, whatever the order of request """
+        self.waiter.config.waiter_policy = 'greedy'
+        self.call(self.waiter.request, 0, 0, 1)
+        self.diner(1, 1, 2)
+        self.until(lambda: 1 in self.waiter.waiting)
+        self.diner(2, 2, 3).join(timeout=5)
+        self.assertEqual(self.granted, [2])
+        self.call(self.waiter.release, 0, 0, 1)
+        self.assertIn(1, self.waiter.waiting)
+        self.call(self.waiter.release, 2, 2, 3)
+        self.threads[0].join(timeout=5)
+        self.assertEqual(self.granted, [2, 1])
+        self.call(self.waiter.release, 1, 1, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
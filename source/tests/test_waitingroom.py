@@ -0,0 +1,80 @@
+""" StateEngineCrank.tests.test_waitingroom
+
+Sleeping Barber waiting room hand-off of customers to sleeping barbers.
+"""
+
+# System imports
+import contextlib
+import io
+import unittest
+
+# Project imports
+import tests    # noqa: F401, puts the source directory on the module search path
+import mvc
+from SleepingBarber.WaitingRoom import Arrival, WaitingRoom
+
+
+class Patron(object):
+    """ Customer arriving at the waiting room """
+
+    def __init__(self, id_):
+        self.id = id_
+        self.barber = None
+
+    def set_barber(self, barber):
+        self.barber = barber
+
+
+class Chair(object):
+    """ Barber taking customers from the waiting room """
+
+    def __init__(self, cancellation):
+        self.current_customer = None
+        self.cancellation = cancellation
+
+
+class TestWaitingRoom(unittest.TestCase):
+
+    def setUp(self):
+        self.output = io.StringIO()
+        with contextlib.redirect_stdout(self.output):
+            self.room = WaitingRoom()
+            self.room.reset()
+        self.cancellation = mvc.Cancellation()
+        self.barber = Chair(self.cancellation)
+
+    def call(self, function, *args):
+        with contextlib.redirect_stdout(self.output):
+            return function(*args)
+
+    def test_handoff(self):
+        """ An arriving customer is handed to the sleeping barber, who is then served by nobody else """
+        self.assertIsNone(self.call(self.room.next_customer, self.barber))
+        customer = Patron(1)
+        self.assertIs(self.call(self.room.arrive, customer), Arrival.Barber)
+        self.assertIs(customer.barber, self.barber)
+        self.assertIs(self.barber.current_customer, customer)
+        self.assertTrue(self.room.wait_customer(self.barber, 0))
+        self.assertIs(self.call(self.room.arrive, Patron(2)), Arrival.Chair)
+
+    def test_cancelled(self):
+        """ Once the simulation is cancelled a sleeping barber is handed no customers """
+        self.call(self.room.next_customer, self.barber)
+        self.cancellation.cancel()
+        customer = Patron(1)
+        self.assertIs(self.call(self.room.arrive, customer), Arrival.Chair)
+        self.assertIsNone(customer.barber)
+        self.assertIsNone(self.call(self.room.leave, self.barber))
+
+    def test_leave_unserved(self):
+        """ A customer handed to a barber which stops before serving it is returned by leave() """
+        self.call(self.room.next_customer, self.barber)
+        customer = Patron(1)
+        self.call(self.room.arrive, customer)
+        self.assertIs(self.call(self.room.leave, self.barber), customer)
+        self.assertIsNone(self.barber.current_customer)
+        self.assertIs(self.call(self.room.arrive, Patron(2)), Arrival.Chair)
+
+
+if __name__ == '__main__':
+    unittest.main()